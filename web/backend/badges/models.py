@@ -35,6 +35,9 @@ class UserBadge(TimeStampedModel):
 
     class Meta:
         unique_together = ('user', 'badge')
+        indexes = [
+            models.Index(fields=['user', 'earned_at', 'id']),  # Keyset sayfalama
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.badge.name}"
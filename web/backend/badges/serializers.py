@@ -1,7 +1,8 @@
 # badges/serializers.py
 
 from rest_framework import serializers
-from .models import BadgeTrade, TradeBadge, UserBadge
+from .models import Badge, BadgeTrade, TradeBadge, UserBadge
+from users.models import User
 from django.utils.translation import gettext_lazy as _
 
 class BadgeSerializer(serializers.ModelSerializer):
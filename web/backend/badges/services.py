@@ -1,11 +1,66 @@
 # badges/services.py
 
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
 from .models import Badge, UserBadge
+from users.models import UserActivityCounter
 from .strategies import (
     ActivityCountStrategy,
     EventBasedStrategy,
 )
 
+class BadgeRuleIndex:
+    """
+    Rozet kriterlerinin süreç içi derlenmiş indeksi.
+    Anahtar: (criteria.type, activity_type veya event). Böylece bir olay yalnızca
+    etkileyebileceği rozetleri değerlendirir. Badge kaydedilince/silinince
+    sinyallerle geçersiz kılınır; diğer süreçler için BADGE_RULE_INDEX_TTL
+    saniye sonra kendiliğinden yenilenir.
+    """
+
+    def __init__(self):
+        self._index = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'BADGE_RULE_INDEX_TTL', 60)
+
+    @staticmethod
+    def rule_key(criteria):
+        criteria_type = criteria.get("type")
+        if criteria_type == "activity_based":
+            return criteria_type, criteria.get("activity_type")
+        return criteria_type, criteria.get("event")
+
+    def _build(self):
+        index = defaultdict(list)
+        for badge in Badge.objects.only('id', 'name', 'criteria'):
+            if isinstance(badge.criteria, dict):
+                index[self.rule_key(badge.criteria)].append(badge)
+        return dict(index)
+
+    def _current(self):
+        with self._lock:
+            if self._index is None or time.monotonic() - self._built_at > self.ttl:
+                self._index = self._build()
+                self._built_at = time.monotonic()
+            return self._index
+
+    def badges_for(self, criteria_type, key):
+        return self._current().get((criteria_type, key), [])
+
+    def invalidate(self):
+        with self._lock:
+            self._index = None
+
+rule_index = BadgeRuleIndex()
+
 class BadgeAwardService:
     STRATEGY_MAPPING = {
         "activity_based": ActivityCountStrategy(),
@@ -17,12 +72,15 @@ class BadgeAwardService:
         # Context'e göre filtreleme yap
         activity_type = context.get("activity_type")
         
-        # Eğer activity_type varsa, sadece "activity_based" kriterli rozetleri getir
+        # activity_type varsa yalnızca o türe bağlı "activity_based" rozetler;
+        # sayaçlar tüm rozetler için tek sorguda okunur
         if activity_type:
-            badges = Badge.objects.filter(criteria__type="activity_based")
-        # Yoksa "event_based" rozetleri getir (ör: kullanıcı oluşturma)
+            badges = rule_index.badges_for("activity_based", activity_type)
+            if badges:
+                context.setdefault("activity_counts", UserActivityCounter.counts_for(user))
+        # Yoksa olaya bağlı "event_based" rozetler (ör: kullanıcı oluşturma)
         else:
-            badges = Badge.objects.filter(criteria__type="event_based")
+            badges = rule_index.badges_for("event_based", context.get("event", "user_created"))
         
         # Filtrelenmiş rozetleri kontrol et
         eligible_badges = []
@@ -33,10 +91,31 @@ class BadgeAwardService:
         
         return eligible_badges
 
+    @staticmethod
+    def _grant(user, badges):
+        """Rozetleri tek INSERT ile verir; zaten sahip olunanlar yoksayılır."""
+        if badges:
+            UserBadge.objects.bulk_create(
+                [UserBadge(user=user, badge=badge) for badge in badges],
+                ignore_conflicts=True
+            )
+
+    @classmethod
+    def award_activity_badges(cls, user, activity_types):
+        """Birden çok aktivite türünden etkilenebilecek rozetleri tek seferde değerlendirir."""
+        strategy = cls.STRATEGY_MAPPING["activity_based"]
+        badges = [
+            badge
+            for activity_type in set(activity_types)
+            for badge in rule_index.badges_for("activity_based", activity_type)
+        ]
+        if not badges:
+            return
+        counts = UserActivityCounter.counts_for(user)
+        cls._grant(user, [badge for badge in badges if strategy.is_eligible(user, badge, activity_counts=counts)])
+
     @classmethod
     def award_badges(cls, user, activity_type=None):
         # Context'i activity_type ile birlikte ilet
         context = {"activity_type": activity_type} if activity_type else {}
-        
-        for badge in cls.get_eligible_badges(user, **context):
-            UserBadge.objects.get_or_create(user=user, badge=badge)
\ No newline at end of file
+        cls._grant(user, cls.get_eligible_badges(user, **context))
@@ -1,10 +1,12 @@
 # badges/signals.py
 
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from users.models import User, Profile
+from users.signals import activities_recorded
 from badges.models import Badge, UserBadge
-from badges.services import BadgeAwardService
+from badges.services import BadgeAwardService, rule_index
 from django.apps import apps
 
 Activity = apps.get_model('users', 'Activity')
@@ -25,7 +27,22 @@ def handle_activity_based_badges(sender, instance, **kwargs):
     finally:
         del instance._from_badge_check
 
+@receiver(activities_recorded)
+def handle_buffered_activity_badges(sender, types_by_user, **kwargs):
+    # Toplu yazımda rozetler kullanıcı başına bir kez değerlendirilir
+    users = User.objects.in_bulk(list(types_by_user))
+    for user_id, activity_types in types_by_user.items():
+        if user_id in users:
+            BadgeAwardService.award_activity_badges(users[user_id], activity_types)
+
 @receiver(post_save, sender=User)
 def handle_event_based_badges(sender, instance, created, **kwargs):
     if created:
-        BadgeAwardService.award_badges(user=instance)
\ No newline at end of file
+        BadgeAwardService.award_badges(user=instance)
+
+@receiver(post_save, sender=Badge)
+@receiver(post_delete, sender=Badge)
+def invalidate_badge_rules(sender, **kwargs):
+    # Transaction içinde yeniden kurulan indeks commit sonrası da temizlenir
+    rule_index.invalidate()
+    transaction.on_commit(rule_index.invalidate)
@@ -2,6 +2,7 @@
 
 from abc import ABC, abstractmethod
 from django.db.models import Q
+from users.models import UserActivityCounter
 
 class BadgeCriteriaStrategy(ABC):
     @abstractmethod
@@ -12,10 +13,11 @@ class ActivityCountStrategy(BadgeCriteriaStrategy):
     def is_eligible(self, user, badge, **kwargs) -> bool:  # **kwargs eklendi
         required_activity = badge.criteria.get("activity_type")
         required_count = badge.criteria.get("count", 0)
-        return (
-            user.activities.filter(activity_type=required_activity).count() 
-            >= required_count
-        )
+        # Sayaçlar önceden yüklendiyse (activity_counts) sorgu yapılmaz
+        counts = kwargs.get("activity_counts")
+        if counts is None:
+            counts = UserActivityCounter.counts_for(user)
+        return counts.get(required_activity, 0) >= required_count
 
 class EventBasedStrategy(BadgeCriteriaStrategy):
     def is_eligible(self, user, badge, **kwargs) -> bool:  # **kwargs eklendi
@@ -0,0 +1,34 @@
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from badges.models import Badge, UserBadge
+from badges.views import UserBadgeListAPIView
+from plan_go.testing import assert_max_queries, query_counts
+from users.models import User
+
+class UserBadgeListQueryTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+
+    def setup_badges(self, count):
+        UserBadge.objects.filter(user=self.user).delete()
+        badges = Badge.objects.bulk_create([
+            Badge(name=f'Rozet {index}', image='badges/rozet.png', criteria={'type': 'event_based', 'event': 'test'})
+            for index in range(count)
+        ])
+        UserBadge.objects.bulk_create([UserBadge(user=self.user, badge=badge) for badge in badges])
+
+    def get(self):
+        request = APIRequestFactory().get('/api/user/badges/')
+        force_authenticate(request, user=self.user)
+        response = UserBadgeListAPIView.as_view()(request)
+        response.render()
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_count_is_constant(self):
+        counts = query_counts(self.get, (1, 20), self.setup_badges)
+        self.assertEqual(counts[1], counts[20], counts)
+        with assert_max_queries(counts[1]):
+            self.assertEqual(len(self.get().data['results']), 20)
@@ -4,31 +4,42 @@ from rest_framework import generics, permissions, status, viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from .models import BadgeTrade, TradeBadge, UserBadge
-from .serializers import 
+from django.utils.translation import gettext_lazy as _
+from plan_go.pagination import KeysetPagination
+from plan_go.query_optimizer import QueryOptimizerMixin
 from .serializers import (
     UserBadgeSerializer,
     BadgeTradeSerializer)
 
-class UserBadgeListView(generics.ListAPIView):
+class UserBadgePagination(KeysetPagination):
+    ordering = ('-earned_at', '-id')
+
+class UserBadgeListView(QueryOptimizerMixin, generics.ListAPIView):
+    queryset = UserBadge.objects.all()
     serializer_class = UserBadgeSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = UserBadgePagination
 
     def get_queryset(self):
-        return UserBadge.objects.filter(user=self.request.user)
+        # super(): QueryOptimizerMixin ilişkileri ön yükler
+        return super().get_queryset().filter(user=self.request.user)
 
-class UserBadgeListAPIView(generics.ListAPIView):
+class UserBadgeListAPIView(QueryOptimizerMixin, generics.ListAPIView):
+    queryset = UserBadge.objects.all()
     serializer_class = UserBadgeSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = UserBadgePagination
 
     def get_queryset(self):
-        return UserBadge.objects.filter(user=self.request.user)
+        return super().get_queryset().filter(user=self.request.user)
 
-class UserBadgeDetailAPIView(generics.RetrieveAPIView):
+class UserBadgeDetailAPIView(QueryOptimizerMixin, generics.RetrieveAPIView):
+    queryset = UserBadge.objects.all()
     serializer_class = UserBadgeSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return UserBadge.objects.filter(user=self.request.user)
+        return super().get_queryset().filter(user=self.request.user)
 
 class BadgeTradeViewSet(viewsets.ModelViewSet):
     queryset = BadgeTrade.objects.all()
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ChatHistory
+from .models import ChatHistory, Conversation
 
 @admin.register(ChatHistory)
 class ChatHistoryAdmin(admin.ModelAdmin):
@@ -7,4 +7,9 @@ class ChatHistoryAdmin(admin.ModelAdmin):
     
     def truncated_prompt(self, obj):
         return obj.prompt[:50] + '...' if len(obj.prompt) > 50 else obj.prompt
-    truncated_prompt.short_description = 'Prompt'
\ No newline at end of file
+    truncated_prompt.short_description = 'Prompt'
+
+@admin.register(Conversation)
+class ConversationAdmin(admin.ModelAdmin):
+    list_display = ('user', 'title', 'created_at', 'updated_at')
+    readonly_fields = ('summarized_until',)
@@ -0,0 +1,249 @@
+# llm/cache.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+def normalize_prompt(prompt):
+    """
+    Anlamı değiştirmeyen farkları siler: Unicode biçimi, büyük/küçük harf,
+    noktalama ve fazla boşluklar. "Roma'da ne yenir?" ile "roma da ne yenir"
+    aynı anahtara düşer.
+    """
+    # casefold 'İ' harfini 'i' + birleşik nokta yapar; Türkçe için düz 'i'ye indir
+    text = unicodedata.normalize('NFKC', prompt).casefold().replace('i\u0307', 'i')
+    text = ''.join(' ' if unicodedata.category(char).startswith('P') else char for char in text)
+    return ' '.join(text.split())
+
+def cache_key(model, prompt):
+    normalized = normalize_prompt(prompt)
+    return 'llm:' + hashlib.sha256(f'{model}\x00{normalized}'.encode()).hexdigest()
+
+class BaseCacheBackend(ABC):
+    """Yanıt önbelleği arka uçlarının ortak arayüzü."""
+    blocking = True  # True ise async görünümlerde thread'de çalıştırılır
+
+    def __init__(self, ttl, max_entries, **options):
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    @abstractmethod
+    def get(self, key):
+        pass
+
+    @abstractmethod
+    def set(self, key, value):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+class LocMemCacheBackend(BaseCacheBackend):
+    """Süreç içi LRU + TTL önbellek; en hızlı seçenek, süreçler arasında paylaşılmaz."""
+    blocking = False
+
+    def __init__(self, ttl, max_entries, **options):
+        super().__init__(ttl, max_entries)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+class DjangoCacheBackend(BaseCacheBackend):
+    """
+    CACHES'teki bir önbelleği kullanır (ör. Redis); süreçler arasında paylaşılır.
+    Kapasite taşmasında hangi kaydın atılacağına o önbellek karar verir.
+    """
+
+    def __init__(self, ttl, max_entries, alias='default', **options):
+        super().__init__(ttl, max_entries)
+        self.cache = caches[alias]
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value):
+        self.cache.set(key, value, timeout=self.ttl)
+
+    def clear(self):
+        self.cache.clear()
+
+class SQLiteCacheBackend(BaseCacheBackend):
+    """
+    Ayrı bir SQLite dosyasında kalıcı LRU + TTL önbellek.
+    Yeniden başlatmalardan etkilenmez ve aynı makinedeki süreçlerce paylaşılır.
+    """
+
+    def __init__(self, ttl, max_entries, path=None, **options):
+        super().__init__(ttl, max_entries)
+        self.path = str(path or os.path.join(settings.BASE_DIR, 'llm_cache.sqlite3'))
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS llm_cache ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'expires_at REAL NOT NULL, used_at REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS llm_cache_used_at ON llm_cache (used_at)')
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        now = time.time()
+        row = self.connection.execute(
+            'SELECT value FROM llm_cache WHERE key = ? AND expires_at > ?', (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        self.connection.execute('UPDATE llm_cache SET used_at = ? WHERE key = ?', (now, key))
+        return row[0]
+
+    def set(self, key, value):
+        now = time.time()
+        connection = self.connection
+        connection.execute(
+            'INSERT OR REPLACE INTO llm_cache (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)',
+            (key, value, now + self.ttl, now)
+        )
+        # Süresi dolanları ve kapasiteyi aşan en eski kullanılanları at
+        connection.execute('DELETE FROM llm_cache WHERE expires_at <= ?', (now,))
+        connection.execute(
+            'DELETE FROM llm_cache WHERE key IN ('
+            'SELECT key FROM llm_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+
+    def clear(self):
+        self.connection.execute('DELETE FROM llm_cache')
+
+BACKENDS = {
+    'locmem': LocMemCacheBackend,
+    'django': DjangoCacheBackend,
+    'sqlite': SQLiteCacheBackend,
+}
+
+class ResponseCache:
+    """
+    Ollama çağrısının önündeki yanıt önbelleği; anahtar (model, normalize prompt).
+    Arka uç LLM_CACHE_BACKEND ile seçilir ('locmem', 'django', 'sqlite'
+    ya da sınıf yolu); 'none' önbelleği kapatır. İsabet/ıska sayıları tutulur.
+    """
+
+    def __init__(self):
+        self._backend = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'LLM_CACHE_BACKEND', 'locmem') != 'none'
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            name = getattr(settings, 'LLM_CACHE_BACKEND', 'locmem')
+            backend_class = BACKENDS.get(name) or import_string(name)
+            self._backend = backend_class(
+                ttl=getattr(settings, 'LLM_CACHE_TTL', 86400),
+                max_entries=getattr(settings, 'LLM_CACHE_MAX_ENTRIES', 1000),
+                **getattr(settings, 'LLM_CACHE_OPTIONS', {})
+            )
+        return self._backend
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, model, prompt):
+        if not self.enabled:
+            return None
+        value = self.backend.get(cache_key(model, prompt))
+        self._count(value is not None)
+        return value
+
+    def set(self, model, prompt, response):
+        if self.enabled and response:
+            self.backend.set(cache_key(model, prompt), response)
+
+    async def aget(self, model, prompt):
+        if self.enabled and self.backend.blocking:
+            return await sync_to_async(self.get)(model, prompt)
+        return self.get(model, prompt)
+
+    async def aset(self, model, prompt, response):
+        if self.enabled and self.backend.blocking:
+            return await sync_to_async(self.set)(model, prompt, response)
+        return self.set(model, prompt, response)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'backend': getattr(settings, 'LLM_CACHE_BACKEND', 'locmem'),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def reset(self):
+        """Arka ucu yeniden kurar ve sayaçları sıfırlar (ayar değişiklikleri için)."""
+        with self._lock:
+            self._backend = None
+            self.hits = self.misses = 0
+
+    def seed_from_history(self, queryset, model):
+        """
+        ChatHistory kayıtlarından önbelleği doldurur; aynı prompt için en yeni yanıt kalır.
+        Sohbet turları bağlama bağlı olduğundan (görünümler de önbelleklemez) atlanır.
+        """
+        count = 0
+        queryset = queryset.filter(conversation__isnull=True).order_by('created_at')
+        for prompt, response in queryset.values_list('prompt', 'response').iterator():
+            if response:
+                self.set(model, prompt, response)
+                count += 1
+        return count
+
+response_cache = ResponseCache()
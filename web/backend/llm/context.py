@@ -0,0 +1,177 @@
+# llm/context.py
+
+import logging
+import math
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import scheduler
+from .models import ChatHistory, Conversation
+
+logger = logging.getLogger(__name__)
+
+def estimate_tokens(text):
+    """Kaba token tahmini (~4 karakter/token); tokenizer gerektirmez."""
+    return math.ceil(len(text) / 4) if text else 0
+
+def truncate_to_tokens(text, tokens):
+    limit = tokens * 4
+    return text if len(text) <= limit else text[:limit].rsplit(' ', 1)[0] + '…'
+
+def format_turn(prompt, response):
+    return f"Kullanıcı: {prompt}\nAsistan: {response}"
+
+class ContextBuilder:
+    """
+    Sohbetin son turlarını token bütçesine sığacak kadar seçip modele gidecek
+    prompt'u kurar. Yalnızca en fazla LLM_CONTEXT_MAX_TURNS tur okunur; sohbet
+    uzadıkça sorgu ve prompt boyutu büyümez. Pencereye girmeyen eski turlar
+    özet (Conversation.summary) olarak eklenir.
+    """
+
+    @property
+    def budget(self):
+        return getattr(settings, 'LLM_CONTEXT_TOKEN_BUDGET', 2048)
+
+    @property
+    def max_turns(self):
+        return getattr(settings, 'LLM_CONTEXT_MAX_TURNS', 20)
+
+    def recent_turns(self, conversation):
+        return (
+            ChatHistory.objects
+            .filter(conversation=conversation)
+            .order_by('-created_at', '-id')
+            .values('id', 'prompt', 'response', 'created_at')[:self.max_turns]
+        )
+
+    def select(self, conversation, prompt, turns):
+        """Yeniden eskiye giderek bütçeye sığan turları seçer; (turlar, taşma var mı)."""
+        remaining = self.budget - estimate_tokens(prompt) - estimate_tokens(conversation.summary)
+        selected = []
+        for turn in turns:
+            cost = estimate_tokens(format_turn(turn['prompt'], turn['response']))
+            if cost > remaining:
+                break
+            remaining -= cost
+            selected.append(turn)
+        overflow = len(selected) < len(turns) or len(turns) == self.max_turns
+        selected.reverse()
+        return selected, overflow
+
+    def render(self, conversation, prompt, turns):
+        parts = []
+        if conversation.summary:
+            parts.append(f"Önceki konuşmanın özeti: {conversation.summary}")
+        parts.extend(format_turn(turn['prompt'], turn['response']) for turn in turns)
+        parts.append(f"Kullanıcı: {prompt}\nAsistan:")
+        return "\n\n".join(parts)
+
+    def build(self, conversation, prompt):
+        """Modele gönderilecek prompt; eski turlar taşıyorsa özetleme planlanır."""
+        if conversation is None:
+            return prompt
+        turns, overflow = self.select(conversation, prompt, list(self.recent_turns(conversation)))
+        if overflow:
+            summarizer.submit(conversation.pk)
+        return self.render(conversation, prompt, turns)
+
+    async def abuild(self, conversation, prompt):
+        if conversation is None:
+            return prompt
+        turns = [turn async for turn in self.recent_turns(conversation)]
+        turns, overflow = self.select(conversation, prompt, turns)
+        if overflow:
+            summarizer.submit(conversation.pk)
+        return self.render(conversation, prompt, turns)
+
+context_builder = ContextBuilder()
+
+class SummaryWorker:
+    """
+    Pencereden taşan turları istek dışında özete katan arka plan işçisi.
+    Özetlenmemiş taşan tur sayısı LLM_CONTEXT_SUMMARY_BATCH'e ulaşınca modelden
+    yeni özet istenir; böylece her istek bir özet çağrısı beklemez.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, conversation_id):
+        with self._lock:
+            if conversation_id in self._pending:
+                return
+            self._pending.add(conversation_id)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='llm-summary-worker', daemon=True)
+                self._thread.start()
+        self._queue.put(conversation_id)
+
+    def join(self):
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            conversation_id = self._queue.get()
+            try:
+                summarize_conversation(conversation_id)
+            except scheduler.SchedulerBusy:
+                # Kuyruk dolu; taşan turlar sonraki istekte yeniden gönderilir
+                logger.info("Özet ertelendi, LLM kuyruğu dolu (sohbet %s)", conversation_id)
+            except Exception:
+                logger.exception("Sohbet özetlenemedi (sohbet %s)", conversation_id)
+            finally:
+                with self._lock:
+                    self._pending.discard(conversation_id)
+                close_old_connections()
+                self._queue.task_done()
+
+summarizer = SummaryWorker()
+
+SUMMARY_PROMPT = (
+    "Aşağıda bir seyahat asistanı ile kullanıcı arasındaki konuşma var. "
+    "Önceki özeti de koruyarak kullanıcının tercihlerini, planlarını ve alınan kararları "
+    "en fazla {words} kelimeyle özetle. Yalnızca özeti yaz.\n\n"
+    "Önceki özet: {summary}\n\n{turns}"
+)
+
+# Özet çağrıları kullanıcı isteklerinden ayrı bir kuyrukta sıraya girer
+SUMMARY_QUEUE_KEY = 'system:summary'
+
+def summarize_conversation(conversation_id):
+    """Penceredeki turlardan daha eski, henüz özetlenmemiş turları özete katar."""
+    from .gateway import gateway
+
+    conversation = Conversation.objects.get(pk=conversation_id)
+    window = list(context_builder.recent_turns(conversation))
+    if not window:
+        return False
+    # En kötü durumda pencerenin tamamı bütçeye sığar; daha eskiler özetlenebilir
+    kept, _ = context_builder.select(conversation, '', window)
+    oldest_kept = kept[0] if kept else window[0]
+
+    pending = ChatHistory.objects.filter(conversation=conversation, created_at__lt=oldest_kept['created_at'])
+    if conversation.summarized_until:
+        pending = pending.filter(created_at__gt=conversation.summarized_until)
+    batch = getattr(settings, 'LLM_CONTEXT_SUMMARY_BATCH', 6)
+    turns = list(pending.order_by('created_at', 'id').values('prompt', 'response', 'created_at')[:batch * 4])
+    if len(turns) < batch:
+        return False
+
+    summary_tokens = getattr(settings, 'LLM_CONTEXT_SUMMARY_TOKENS', 256)
+    summary = scheduler.generate(gateway, SUMMARY_QUEUE_KEY, SUMMARY_PROMPT.format(
+        words=summary_tokens * 3 // 4,
+        summary=conversation.summary or "-",
+        turns="\n\n".join(format_turn(turn['prompt'], turn['response']) for turn in turns),
+    ))
+    Conversation.objects.filter(pk=conversation.pk).update(
+        summary=truncate_to_tokens(summary.strip(), summary_tokens),
+        summarized_until=turns[-1]['created_at'],
+    )
+    return True
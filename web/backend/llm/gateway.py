@@ -0,0 +1,195 @@
+# llm/gateway.py
+
+import asyncio
+import json
+import os
+import threading
+
+import httpx
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from plan_go.metrics import timed
+
+class OllamaGateway:
+    """
+    Ollama'ya giden tüm isteklerin geçtiği istemci.
+    Süreç başına tek bir keep-alive Session (bağlantı havuzu) kullanır;
+    her istekte yeniden TCP bağlantısı kurulmaz.
+    Ayarlar verilmezse settings'ten okunur; testlerde sahte sunucu adresi verilebilir.
+    """
+
+    def __init__(self, api_url=None, model=None, timeout=None, connect_timeout=None, pool_size=None):
+        self._api_url = api_url
+        self._model = model
+        self._timeout = timeout
+        self._connect_timeout = connect_timeout
+        self._pool_size = pool_size
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def api_url(self):
+        api_url = self._api_url or settings.OLLAMA_API_URL
+        if not api_url:
+            raise ValueError("OLLAMA_API_URL environment variable not configured")
+        return api_url
+
+    @property
+    def model(self):
+        return self._model or settings.OLLAMA_MODEL
+
+    @property
+    def timeout(self):
+        # (bağlantı, okuma) — akışta okuma süresi her parça için ayrı işler
+        read_timeout = self._timeout or settings.OLLAMA_TIMEOUT
+        connect_timeout = self._connect_timeout or getattr(settings, 'OLLAMA_CONNECT_TIMEOUT', 5)
+        return (min(connect_timeout, read_timeout), read_timeout)
+
+    @property
+    def session(self):
+        # fork sonrası (ör. gunicorn --preload) ebeveynin soketleri paylaşılmasın
+        with self._lock:
+            if self._session is None or self._pid != os.getpid():
+                pool_size = self._pool_size or getattr(settings, 'OLLAMA_POOL_SIZE', 10)
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._session, self._pid = session, os.getpid()
+            return self._session
+
+    def payload(self, prompt, stream):
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream
+        }
+
+    def _post(self, prompt, stream):
+        with timed('ollama'):
+            response = self.session.post(
+                self.api_url,
+                json=self.payload(prompt, stream),
+                timeout=self.timeout,
+                stream=stream
+            )
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError:
+            response.close()
+            raise
+        return response
+
+    def generate(self, prompt):
+        """Yanıtın tamamını tek seferde döndürür."""
+        return self._post(prompt, stream=False).json()['response']
+
+    def stream(self, prompt):
+        """
+        Bağlantıyı hemen açar (hatalar burada yükselir) ve Ollama'nın
+        NDJSON parçalarını dict olarak veren bir üreteç döndürür.
+        """
+        return self._iter_chunks(self._post(prompt, stream=True))
+
+    @staticmethod
+    def _iter_chunks(response):
+        lines = response.iter_lines()
+        try:
+            while True:
+                # Yalnızca Ollama'yı beklenen süre ölçülür; tüketicinin süresi sayılmaz
+                with timed('ollama'):
+                    line = next(lines, None)
+                if line is None:
+                    break
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get('error'):
+                    raise ValueError(chunk['error'])
+                yield chunk
+                if chunk.get('done'):
+                    break
+        finally:
+            response.close()  # Bağlantı havuza geri döner
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+gateway = OllamaGateway()
+
+class AsyncOllamaGateway(OllamaGateway):
+    """
+    ASGI görünümleri için httpx tabanlı eşdeğer istemci.
+    Bekleme sırasında thread tutulmaz; tek süreç yüzlerce isteği aynı anda taşıyabilir.
+    İstemci (ve bağlantı havuzu) event loop başına bir kez kurulur.
+    """
+
+    def __init__(self, *args, max_connections=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._max_connections = max_connections
+        self._client = None
+        self._loop = None
+
+    @property
+    def client(self):
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            max_connections = self._max_connections or getattr(settings, 'OLLAMA_ASYNC_MAX_CONNECTIONS', 200)
+            connect_timeout, read_timeout = self.timeout
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            )
+            self._loop = loop
+        return self._client
+
+    async def _send(self, prompt, stream):
+        client = self.client
+        request = client.build_request('POST', self.api_url, json=self.payload(prompt, stream))
+        with timed('ollama'):
+            response = await client.send(request, stream=stream)
+        if response.is_error:
+            await response.aclose()
+            response.raise_for_status()
+        return response
+
+    async def generate(self, prompt):
+        response = await self._send(prompt, stream=False)
+        return response.json()['response']
+
+    async def stream(self, prompt):
+        """Bağlantıyı hemen açar ve NDJSON parçalarını veren async üreteç döndürür."""
+        return self._aiter_chunks(await self._send(prompt, stream=True))
+
+    @staticmethod
+    async def _aiter_chunks(response):
+        lines = response.aiter_lines()
+        try:
+            while True:
+                with timed('ollama'):
+                    line = await anext(lines, None)
+                if line is None:
+                    break
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get('error'):
+                    raise ValueError(chunk['error'])
+                yield chunk
+                if chunk.get('done'):
+                    break
+        finally:
+            await response.aclose()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+async_gateway = AsyncOllamaGateway()
@@ -0,0 +1,33 @@
+# llm/management/commands/seed_llm_cache.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from llm.cache import response_cache
+from llm.models import ChatHistory
+
+class Command(BaseCommand):
+    help = "LLM yanıt önbelleğini mevcut ChatHistory kayıtlarından (sohbet dışı istekler) doldurur."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Yalnızca son N günün kayıtlarını kullan")
+        parser.add_argument('--model', default=None, help="Anahtar için model adı (varsayılan OLLAMA_MODEL)")
+
+    def handle(self, *args, **options):
+        if not response_cache.enabled:
+            self.stderr.write("LLM_CACHE_BACKEND 'none'; önbellek kapalı.")
+            return
+        if settings.LLM_CACHE_BACKEND == 'locmem':
+            self.stderr.write(self.style.WARNING(
+                "locmem önbelleği bu komutun süreciyle birlikte silinir; 'sqlite' veya 'django' kullanın."
+            ))
+
+        history = ChatHistory.objects.all()
+        if options['days']:
+            history = history.filter(created_at__gte=timezone.now() - timedelta(days=options['days']))
+
+        count = response_cache.seed_from_history(history, options['model'] or settings.OLLAMA_MODEL)
+        self.stdout.write(self.style.SUCCESS(f"{count} yanıt önbelleğe yazıldı."))
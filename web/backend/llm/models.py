@@ -1,11 +1,40 @@
 from django.db import models
 from django.conf import settings
 
+class Conversation(models.Model):
+    """
+    Çok turlu sohbet oturumu. Bağlam penceresine sığmayan eski turlar
+    `summary` alanında özetlenir; `summarized_until` özete giren son turun zamanıdır.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='conversations')
+    title = models.CharField(max_length=200, blank=True)
+    summary = models.TextField(blank=True)
+    summarized_until = models.DateTimeField(null=True, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.title or self.created_at}"
+
 class ChatHistory(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    conversation = models.ForeignKey(
+        Conversation, on_delete=models.CASCADE, null=True, blank=True, related_name='turns'
+    )
     prompt = models.TextField()
     response = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+            models.Index(fields=['conversation', 'created_at', 'id']),
+        ]
+
     def __str__(self):
-        return f"{self.user.username} - {self.created_at}"
\ No newline at end of file
+        return f"{self.user.username} - {self.created_at}"
@@ -0,0 +1,340 @@
+# llm/scheduler.py
+
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+
+from django.conf import settings
+
+class SchedulerBusy(Exception):
+    """Kuyruk dolu ya da bekleme süresi aşıldı; istemci retry_after saniye sonra denemeli."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"LLM kuyruğu dolu, {retry_after} sn sonra tekrar deneyin.")
+        self.retry_after = retry_after
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(True)
+
+class _Ticket:
+    __slots__ = ('granted', 'event', 'loop', 'future')
+
+    def __init__(self, loop=None):
+        self.granted = False
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future = loop.create_future() if loop is not None else None
+
+    def grant(self):
+        self.granted = True
+        if self.event is not None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+class Lease:
+    """Alınmış bir çalışma hakkı; release() birden çok kez çağrılabilir."""
+
+    def __init__(self, scheduler):
+        self._scheduler = scheduler
+        self._started = time.monotonic()
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._scheduler._release(time.monotonic() - self._started)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+class FairScheduler:
+    """
+    Ollama'ya aynı anda giden istek sayısını LLM_MAX_IN_FLIGHT ile sınırlar.
+    Bekleyenler kullanıcı başına FIFO kuyruklarda tutulur ve kullanıcılar arasında
+    sırayla (round-robin) hizmet verilir; tek bir kullanıcının patlaması diğerlerini
+    bekletmez. Kuyruk LLM_MAX_QUEUE_DEPTH'e (kullanıcı başına LLM_MAX_QUEUE_PER_USER)
+    ulaşınca istek beklemeden SchedulerBusy ile reddedilir.
+    Sınırlar süreç başınadır; thread ve asyncio çağıranları aynı kuyruğu paylaşır.
+    """
+
+    def __init__(self, max_in_flight=None, max_queue=None, max_queue_per_user=None, queue_timeout=None):
+        self._max_in_flight = max_in_flight
+        self._max_queue = max_queue
+        self._max_queue_per_user = max_queue_per_user
+        self._queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._queues = OrderedDict()
+        self._depth = 0
+        self._in_flight = 0
+        self._service_time = None
+
+    @property
+    def max_in_flight(self):
+        return self._max_in_flight or getattr(settings, 'LLM_MAX_IN_FLIGHT', 2)
+
+    @property
+    def max_queue(self):
+        return self._max_queue if self._max_queue is not None else getattr(settings, 'LLM_MAX_QUEUE_DEPTH', 32)
+
+    @property
+    def max_queue_per_user(self):
+        return self._max_queue_per_user or getattr(settings, 'LLM_MAX_QUEUE_PER_USER', 4)
+
+    @property
+    def queue_timeout(self):
+        return self._queue_timeout or getattr(settings, 'LLM_QUEUE_TIMEOUT', 30)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'in_flight': self._in_flight,
+                'queued': self._depth,
+                'users_waiting': len(self._queues),
+                'avg_service_time': round(self._service_time or 0.0, 3),
+            }
+
+    def _retry_after_locked(self):
+        # Önümüzdeki işler / paralellik * ortalama süre; ilk ölçümden önce kaba tahmin
+        service_time = self._service_time or 5.0
+        waiting = self._depth + self._in_flight
+        return max(1, math.ceil(service_time * waiting / self.max_in_flight))
+
+    def _enter(self, user_key, loop=None):
+        """Hemen yer varsa None, yoksa kuyruğa eklenen bilet döndürür."""
+        with self._lock:
+            if self._in_flight < self.max_in_flight and not self._depth:
+                self._in_flight += 1
+                return None
+            queue = self._queues.get(user_key)
+            if self._depth >= self.max_queue or (queue is not None and len(queue) >= self.max_queue_per_user):
+                raise SchedulerBusy(self._retry_after_locked())
+            ticket = _Ticket(loop)
+            self._queues.setdefault(user_key, deque()).append(ticket)
+            self._depth += 1
+            return ticket
+
+    def _abandon(self, user_key, ticket):
+        with self._lock:
+            if ticket.granted:
+                # Zaman aşımıyla aynı anda hak verilmiş olabilir; geri bırak
+                self._in_flight -= 1
+                self._dispatch_locked()
+                return
+            queue = self._queues.get(user_key)
+            if queue is not None and ticket in queue:
+                queue.remove(ticket)
+                self._depth -= 1
+                if not queue:
+                    del self._queues[user_key]
+
+    def _dispatch_locked(self):
+        while self._in_flight < self.max_in_flight and self._queues:
+            user_key, queue = next(iter(self._queues.items()))
+            ticket = queue.popleft()
+            self._depth -= 1
+            if queue:
+                self._queues.move_to_end(user_key)  # Sıradaki kullanıcıya geç
+            else:
+                del self._queues[user_key]
+            self._in_flight += 1
+            ticket.grant()
+
+    def _release(self, elapsed):
+        with self._lock:
+            self._in_flight -= 1
+            # Üstel hareketli ortalama; Retry-After tahmini için
+            self._service_time = elapsed if self._service_time is None else 0.8 * self._service_time + 0.2 * elapsed
+            self._dispatch_locked()
+
+    def acquire(self, user_key):
+        ticket = self._enter(user_key)
+        if ticket is not None and not ticket.event.wait(self.queue_timeout):
+            self._abandon(user_key, ticket)
+            with self._lock:
+                raise SchedulerBusy(self._retry_after_locked())
+        return Lease(self)
+
+    async def aacquire(self, user_key):
+        ticket = self._enter(user_key, asyncio.get_running_loop())
+        if ticket is not None:
+            try:
+                await asyncio.wait_for(ticket.future, self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._abandon(user_key, ticket)
+                with self._lock:
+                    raise SchedulerBusy(self._retry_after_locked())
+            except asyncio.CancelledError:
+                self._abandon(user_key, ticket)
+                raise
+        return Lease(self)
+
+scheduler = FairScheduler()
+
+class _Flight:
+    __slots__ = ('event', 'waiters', 'result', 'error', 'abandoned')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.waiters = []
+        self.result = None
+        self.error = None
+        self.abandoned = False  # Lider iptal edildi; bekleyenler yeniden dener
+
+    def finish(self):
+        self.event.set()
+        for loop, future in self.waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+class RequestCoalescer:
+    """
+    Aynı anahtarla (model + prompt) eşzamanlı gelen istekleri birleştirir:
+    ilki Ollama'ya gider, diğerleri onun sonucunu bekler ve kuyrukta yer tutmaz.
+    Lider iptal edilirse bekleyenlerden biri yeni lider seçilir.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key, loop=None):
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                self._flights[key] = flight = _Flight()
+                return flight, None, True
+            future = None
+            if loop is not None:
+                future = loop.create_future()
+                flight.waiters.append((loop, future))
+            return flight, future, False
+
+    def _land(self, key, flight):
+        with self._lock:
+            del self._flights[key]
+        flight.finish()
+
+    @staticmethod
+    def _outcome(flight):
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def run(self, key, func):
+        while True:
+            flight, _, leader = self._join(key)
+            if leader:
+                break
+            flight.event.wait()
+            if not flight.abandoned:
+                return self._outcome(flight)
+        try:
+            flight.result = func()
+        except Exception as exc:
+            flight.error = exc
+            raise
+        except BaseException:
+            flight.abandoned = True
+            raise
+        finally:
+            self._land(key, flight)
+        return flight.result
+
+    async def arun(self, key, func):
+        while True:
+            flight, future, leader = self._join(key, asyncio.get_running_loop())
+            if leader:
+                break
+            await future
+            if not flight.abandoned:
+                return self._outcome(flight)
+        try:
+            flight.result = await func()
+        except Exception as exc:
+            flight.error = exc
+            raise
+        except BaseException:
+            # İstemci ayrıldı (CancelledError): bekleyenlerden biri lider olup isteği yineler
+            flight.abandoned = True
+            raise
+        finally:
+            self._land(key, flight)
+        return flight.result
+
+coalescer = RequestCoalescer()
+
+class _LeaseCloser:
+    def __init__(self, iterable, lease):
+        self.iterable = iterable
+        self.lease = lease
+
+    def close(self):
+        # StreamingHttpResponse kapanırken çağırır; akış hiç başlamamış olabilir
+        self.lease.release()
+
+class LeasedStream(_LeaseCloser):
+    """Akış bittiğinde ya da yanıt kapatıldığında (istemci ayrılsa bile) hakkı bırakır."""
+
+    def __iter__(self):
+        try:
+            yield from self.iterable
+        finally:
+            self.lease.release()
+
+class AsyncLeasedStream(_LeaseCloser):
+
+    async def __aiter__(self):
+        try:
+            async for item in self.iterable:
+                yield item
+        finally:
+            self.lease.release()
+
+def coalescing_enabled():
+    return getattr(settings, 'LLM_COALESCE_REQUESTS', True)
+
+def generate(gateway, user_key, prompt):
+    """Kuyruk ve birleştirme kurallarıyla tam yanıt üretir."""
+    from .cache import cache_key
+
+    def call():
+        with scheduler.acquire(user_key):
+            return gateway.generate(prompt)
+
+    if coalescing_enabled():
+        return coalescer.run(cache_key(gateway.model, prompt), call)
+    return call()
+
+async def agenerate(gateway, user_key, prompt):
+    from .cache import cache_key
+
+    async def call():
+        with await scheduler.aacquire(user_key):
+            return await gateway.generate(prompt)
+
+    if coalescing_enabled():
+        return await coalescer.arun(cache_key(gateway.model, prompt), call)
+    return await call()
+
+def stream(gateway, user_key, prompt):
+    """Hak alınır ve akış açılır; (parçalar, hak) döner. Hak akışla birlikte bırakılmalı."""
+    lease = scheduler.acquire(user_key)
+    try:
+        return gateway.stream(prompt), lease
+    except Exception:
+        lease.release()
+        raise
+
+async def astream(gateway, user_key, prompt):
+    lease = await scheduler.aacquire(user_key)
+    try:
+        return await gateway.stream(prompt), lease
+    except BaseException:
+        lease.release()
+        raise
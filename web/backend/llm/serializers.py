@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import ChatHistory
+from .models import ChatHistory, Conversation
 
 class ChatHistorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -8,4 +8,15 @@ class ChatHistorySerializer(serializers.ModelSerializer):
         read_only_fields = ['response']
         extra_kwargs = {
             'user': {'write_only': True}
-        }
\ No newline at end of file
+        }
+
+class ConversationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Conversation
+        fields = ['id', 'title', 'summary', 'created_at', 'updated_at']
+        read_only_fields = ['summary', 'created_at', 'updated_at']
+
+class ConversationTurnSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChatHistory
+        fields = ['id', 'prompt', 'response', 'created_at']
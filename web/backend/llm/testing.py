@@ -0,0 +1,96 @@
+# llm/testing.py
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FakeOllamaServer:
+    """
+    Ollama'nın /api/generate uç noktasını taklit eden yerel sunucu.
+    Testlerde ve geliştirmede gerçek model olmadan gateway'i denemek için:
+
+        with FakeOllamaServer(tokens=["Mer", "haba"]) as server:
+            OllamaGateway(api_url=server.url).generate("selam")
+    """
+
+    def __init__(self, tokens=("Merhaba", " dünya"), delay=0.0, status=200):
+        self.tokens = list(tokens)
+        self.delay = delay
+        self.status = status
+        self.requests = []
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/generate"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                fake.requests.append(payload)
+
+                if fake.status != 200:
+                    body = json.dumps({"error": "fake error"}).encode()
+                    self.send_response(fake.status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+
+                model = payload.get('model')
+                if not payload.get('stream', True):
+                    time.sleep(fake.delay * len(fake.tokens))
+                    body = json.dumps({"model": model, "response": "".join(fake.tokens), "done": True}).encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                chunks = [{"model": model, "response": token, "done": False} for token in fake.tokens]
+                chunks.append({"model": model, "response": "", "done": True})
+                for chunk in chunks:
+                    time.sleep(fake.delay)
+                    line = json.dumps(chunk).encode() + b"\n"
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,222 @@
+import asyncio
+import json
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from llm.cache import BACKENDS, BaseCacheBackend, ResponseCache, response_cache
+from llm.context import summarize_conversation
+from llm.models import ChatHistory, Conversation
+from llm.scheduler import RequestCoalescer, scheduler
+from llm.testing import FakeOllamaServer
+from users.models import User
+
+class RequestCoalescerTests(SimpleTestCase):
+
+    def test_follower_retries_when_leader_is_cancelled(self):
+        coalescer = RequestCoalescer()
+        calls = []
+
+        async def scenario():
+            started = asyncio.Event()
+
+            async def call():
+                calls.append(len(calls))
+                started.set()
+                await asyncio.sleep(0 if len(calls) > 1 else 10)
+                return f"yanıt {len(calls)}"
+
+            leader = asyncio.create_task(coalescer.arun('anahtar', call))
+            await started.wait()
+            follower = asyncio.create_task(coalescer.arun('anahtar', call))
+            await asyncio.sleep(0)
+            leader.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            return await follower
+
+        self.assertEqual(asyncio.run(scenario()), "yanıt 2")
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(coalescer._flights, {})
+
+    def test_follower_receives_leader_error(self):
+        coalescer = RequestCoalescer()
+
+        async def scenario():
+            started = asyncio.Event()
+
+            async def call():
+                started.set()
+                await asyncio.sleep(0.01)
+                raise ValueError("ollama hatası")
+
+            leader = asyncio.create_task(coalescer.arun('anahtar', call))
+            await started.wait()
+            follower = asyncio.create_task(coalescer.arun('anahtar', call))
+            return await asyncio.gather(leader, follower, return_exceptions=True)
+
+        leader, follower = asyncio.run(scenario())
+        self.assertIsInstance(leader, ValueError)
+        self.assertIs(follower, leader)
+
+class SeedFromHistoryTests(TestCase):
+
+    def test_skips_conversation_turns(self):
+        user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        conversation = Conversation.objects.create(user=user)
+        ChatHistory.objects.create(user=user, prompt="Roma'da ne yenir?", response="Carbonara")
+        ChatHistory.objects.create(user=user, conversation=conversation, prompt="Peki orada?", response="Bağlama bağlı")
+
+        cache = ResponseCache()
+        with self.settings(LLM_CACHE_BACKEND='locmem'):
+            self.assertEqual(cache.seed_from_history(ChatHistory.objects.all(), 'model'), 1)
+            self.assertEqual(cache.get('model', "Roma'da ne yenir?"), "Carbonara")
+            self.assertIsNone(cache.get('model', "Peki orada?"))
+
+class CacheBackendTests(SimpleTestCase):
+
+    def test_incomplete_backend_fails_at_instantiation(self):
+        class GetOnlyBackend(BaseCacheBackend):
+            def get(self, key):
+                return None
+
+        with self.assertRaises(TypeError):
+            GetOnlyBackend(ttl=60, max_entries=10)
+
+    def test_builtin_backends_implement_interface(self):
+        for name, backend_class in BACKENDS.items():
+            with self.subTest(backend=name):
+                self.assertFalse(backend_class.__abstractmethods__)
+
+@override_settings(LLM_CACHE_BACKEND='locmem')
+class CacheMetricsTests(TestCase):
+
+    def setUp(self):
+        response_cache.reset()
+        self.addCleanup(response_cache.reset)
+        admin = User.objects.create_user(username='yonetici', email='yonetici@example.com', password='x', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(admin)
+
+    def test_hit_and_miss_counters_are_published(self):
+        self.assertIsNone(response_cache.get('model', 'Selam'))
+        response_cache.set('model', 'Selam', 'Merhaba')
+        self.assertEqual(response_cache.get('model', 'Selam'), 'Merhaba')
+
+        report = self.client.get(reverse('metrics-report')).json()
+        self.assertEqual(report['llm_cache'], {'backend': 'locmem', 'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+        text = self.client.get(reverse('metrics-prometheus')).content.decode()
+        self.assertIn('plan_go_llm_cache_hits_total{backend="locmem"} 1', text)
+        self.assertIn('plan_go_llm_cache_misses_total{backend="locmem"} 1', text)
+
+@override_settings(LLM_CACHE_BACKEND='none')
+class AskEndpointTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_ask_saves_history(self):
+        with FakeOllamaServer(tokens=['Mer', 'haba']) as server, self.settings(OLLAMA_API_URL=server.url):
+            response = self.client.post(reverse('ask-llm'), {'prompt': 'Selam'}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['response'], 'Merhaba')
+        self.assertEqual(ChatHistory.objects.get(user=self.user).response, 'Merhaba')
+        self.assertEqual(len(server.requests), 1)
+
+    def test_ask_streams_ndjson(self):
+        with FakeOllamaServer(tokens=['Mer', 'haba']) as server, self.settings(OLLAMA_API_URL=server.url):
+            response = self.client.post(reverse('ask-llm'), {'prompt': 'Selam', 'stream': True}, format='json')
+            lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual([line.get('response') for line in lines[:-1]], ['Mer', 'haba'])
+        self.assertTrue(lines[-1]['done'])
+
+    @override_settings(LLM_MAX_IN_FLIGHT=1, LLM_MAX_QUEUE_DEPTH=0)
+    def test_ask_returns_429_when_queue_is_full(self):
+        with scheduler.acquire('başka-kullanıcı'):
+            response = self.client.post(reverse('ask-llm'), {'prompt': 'Selam'}, format='json')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertFalse(ChatHistory.objects.exists())
+
+@override_settings(LLM_CACHE_BACKEND='none')
+class AsyncAskEndpointTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+
+    async def test_async_ask_saves_history(self):
+        await self.async_client.aforce_login(self.user)
+        with FakeOllamaServer(tokens=['Mer', 'haba']) as server, self.settings(OLLAMA_API_URL=server.url):
+            response = await self.async_client.post(
+                reverse('ask-llm-async'), {'prompt': 'Selam'}, content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(json.loads(response.content)['response'], 'Merhaba')
+        self.assertTrue(await ChatHistory.objects.filter(user=self.user, response='Merhaba').aexists())
+
+    async def test_async_ask_requires_login(self):
+        response = await self.async_client.post(
+            reverse('ask-llm-async'), {'prompt': 'Selam'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 401)
+
+@override_settings(LLM_CACHE_BACKEND='none')
+class ConversationEndpointTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_ask_within_conversation_sends_previous_turns(self):
+        response = self.client.post(reverse('conversation-list'), {'title': 'Roma'}, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        conversation_id = response.json()['id']
+
+        with FakeOllamaServer(tokens=['Carbonara']) as server, self.settings(OLLAMA_API_URL=server.url):
+            for prompt in ("Roma'da ne yenir?", "Peki tatlı?"):
+                response = self.client.post(
+                    reverse('ask-llm'), {'prompt': prompt, 'conversation': conversation_id}, format='json'
+                )
+                self.assertEqual(response.status_code, 200, response.content)
+        self.assertIn("Roma'da ne yenir?", server.requests[1]['prompt'])
+
+        response = self.client.get(reverse('conversation-turns', args=[conversation_id]))
+        self.assertEqual(len(response.json()['results']), 2)
+
+    def test_turns_of_other_users_are_hidden(self):
+        other = User.objects.create_user(username='diger', email='diger@example.com', password='x')
+        conversation = Conversation.objects.create(user=other)
+        ChatHistory.objects.create(user=other, conversation=conversation, prompt="Gizli", response="Gizli")
+
+        response = self.client.get(reverse('conversation-turns', args=[conversation.pk]))
+        self.assertEqual(response.json()['results'], [])
+        response = self.client.get(reverse('conversation-list'))
+        self.assertEqual(response.json()['results'], [])
+
+@override_settings(LLM_CONTEXT_MAX_TURNS=2, LLM_CONTEXT_SUMMARY_BATCH=2)
+class SummarizeConversationTests(TestCase):
+
+    def test_old_turns_are_folded_into_summary(self):
+        user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        conversation = Conversation.objects.create(user=user)
+        start = timezone.now() - timedelta(hours=1)
+        for index in range(5):
+            turn = ChatHistory.objects.create(user=user, conversation=conversation, prompt=f"Soru {index}", response="Yanıt")
+            ChatHistory.objects.filter(pk=turn.pk).update(created_at=start + timedelta(minutes=index))
+
+        with FakeOllamaServer(tokens=['Kullanıcı ', 'Roma gezisi planlıyor']) as server, \
+                self.settings(OLLAMA_API_URL=server.url):
+            self.assertTrue(summarize_conversation(conversation.pk))
+
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.summary, 'Kullanıcı Roma gezisi planlıyor')
+        self.assertEqual(conversation.summarized_until, start + timedelta(minutes=2))
+        self.assertIn("Soru 0", server.requests[0]['prompt'])
+        self.assertNotIn("Soru 3", server.requests[0]['prompt'])
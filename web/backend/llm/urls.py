@@ -3,4 +3,7 @@ from . import views
 
 urlpatterns = [
     path('api/ask/', views.LLMInteractionView.as_view(), name='ask-llm'),
+    path('api/async/ask/', views.AsyncLLMInteractionView.as_view(), name='ask-llm-async'),
+    path('api/conversations/', views.ConversationListCreateView.as_view(), name='conversation-list'),
+    path('api/conversations/<int:pk>/turns/', views.ConversationTurnListView.as_view(), name='conversation-turns'),
 ]
\ No newline at end of file
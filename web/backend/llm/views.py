@@ -1,52 +1,131 @@
+import json
+
+import httpx
 import requests
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import generics, serializers, status
+from rest_framework.exceptions import NotFound
 from django.conf import settings
-from .models import ChatHistory
-from .serializers import ChatHistorySerializer
+from django.http import JsonResponse, StreamingHttpResponse
+from plan_go.async_views import AsyncAPIView
+from plan_go.pagination import KeysetPagination
+from .cache import response_cache
+from .context import context_builder
+from .gateway import async_gateway, gateway
+from . import scheduler
+from .scheduler import AsyncLeasedStream, LeasedStream, SchedulerBusy
+from .models import ChatHistory, Conversation
+from .serializers import ChatHistorySerializer, ConversationSerializer, ConversationTurnSerializer
 from .mixins import AuthenticationMixin
 
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+def busy_response(exc, response_class):
+    response = response_class({"error": str(exc)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    response['Retry-After'] = str(exc.retry_after)
+    return response
+
+def conversation_lookup(request, data):
+    """İstekteki `conversation` id'si için kullanıcının sohbetini süzen queryset; yoksa None."""
+    conversation_id = data.get('conversation')
+    if conversation_id in (None, ''):
+        return None
+    try:
+        return Conversation.objects.filter(pk=int(conversation_id), user=request.user)
+    except (TypeError, ValueError):
+        raise NotFound("Sohbet bulunamadı.")
+
 class LLMInteractionView(AuthenticationMixin, APIView):
+
+    def wants_stream(self, request):
+        value = request.data.get('stream', request.query_params.get('stream', ''))
+        return str(value).lower() in TRUE_VALUES
+
+    def get_conversation(self, request):
+        queryset = conversation_lookup(request, request.data)
+        if queryset is None:
+            return None
+        conversation = queryset.first()
+        if conversation is None:
+            raise NotFound("Sohbet bulunamadı.")
+        return conversation
+
+    def stream_response(self, request, prompt, chunks, cached=False, conversation=None, lease=None):
+        """
+        Ollama parçalarını NDJSON olarak istemciye aktarır.
+        ChatHistory akış tamamlandığında kaydedilir; son satırda created_at döner.
+        Tamamlanan tek turluk yanıt önbelleğe yazılır.
+        """
+        def relay():
+            tokens = []
+            try:
+                for chunk in chunks:
+                    token = chunk.get('response', '')
+                    if token:
+                        tokens.append(token)
+                        yield json.dumps({"response": token}, ensure_ascii=False) + "\n"
+            except (requests.exceptions.RequestException, ValueError) as e:
+                # Başlıklar gönderildi; hata son satır olarak bildirilir
+                yield json.dumps({"error": str(e), "done": True}, ensure_ascii=False) + "\n"
+                return
+
+            chat = ChatHistory.objects.create(
+                user=request.user,
+                conversation=conversation,
+                prompt=prompt,
+                response="".join(tokens)
+            )
+            if not cached and conversation is None:
+                response_cache.set(gateway.model, prompt, chat.response)
+            yield json.dumps({"done": True, "created_at": chat.created_at.isoformat()}) + "\n"
+
+        # Kuyruktan alınan hak akış bitince ya da bağlantı kapanınca bırakılır
+        content = LeasedStream(relay(), lease) if lease else relay()
+        response = StreamingHttpResponse(content, content_type='application/x-ndjson')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # nginx tamponlamasın
+        response['X-Cache'] = 'HIT' if cached else 'MISS'
+        return response
     
     def post(self, request):
         serializer = ChatHistorySerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+        prompt = serializer.validated_data['prompt']
+        conversation = self.get_conversation(request)
+        # Sohbet bağlamı son turlardan ve özetten, token bütçesi içinde kurulur
+        model_prompt = context_builder.build(conversation, prompt)
+        # Aynı (model, normalize prompt) daha önce yanıtlandıysa Ollama'ya gidilmez;
+        # sohbet içindeki yanıtlar bağlama bağlı olduğundan önbelleğe alınmaz
+        cached = response_cache.get(gateway.model, prompt) if conversation is None else None
         try:
-            # Ortam değişkenlerinden ayarları al
-            api_url = settings.OLLAMA_API_URL
-            model = settings.OLLAMA_MODEL
-            timeout = settings.OLLAMA_TIMEOUT
-
-            # API URL kontrolü
-            if not api_url:
-                raise ValueError("OLLAMA_API_URL environment variable not configured")
-
-            # Ollama API isteği
-            response = requests.post(
-                api_url,
-                json={
-                    "model": model,
-                    "prompt": serializer.validated_data['prompt'],
-                    "stream": False
-                },
-                timeout=timeout
-            )
-            response.raise_for_status()
+            # Akış modunda bağlantı burada açılır; hatalar normal yanıt olarak döner
+            if self.wants_stream(request):
+                if cached:
+                    return self.stream_response(request, prompt, [{"response": cached, "done": True}], cached=True)
+                # Ollama'ya giden her istek adil kuyruktan geçer
+                chunks, lease = scheduler.stream(gateway, request.user.pk, model_prompt)
+                return self.stream_response(request, prompt, chunks, conversation=conversation, lease=lease)
 
             # Yanıtı kaydet
             chat = ChatHistory.objects.create(
                 user=request.user,
-                prompt=serializer.validated_data['prompt'],
-                response=response.json()['response']
+                conversation=conversation,
+                prompt=prompt,
+                response=cached or scheduler.generate(gateway, request.user.pk, model_prompt)
             )
+            if not cached and conversation is None:
+                response_cache.set(gateway.model, prompt, chat.response)
 
             return Response({
                 "response": chat.response,
                 "created_at": chat.created_at
-            }, status=status.HTTP_200_OK)
+            }, status=status.HTTP_200_OK, headers={'X-Cache': 'HIT' if cached else 'MISS'})
+
+        except SchedulerBusy as e:
+            return busy_response(e, Response)
 
         except requests.exceptions.ConnectionError as e:
             error_msg = f"Ollama connection error: {str(e)}"
@@ -61,4 +140,124 @@ class LLMInteractionView(AuthenticationMixin, APIView):
 
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
-            return Response({"error": error_msg}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({"error": error_msg}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+async def cached_chunks(response):
+    yield {"response": response, "done": True}
+
+class AsyncLLMInteractionView(AsyncAPIView):
+    """
+    LLMInteractionView'ın ASGI eşdeğeri: Ollama beklenirken thread tutulmaz,
+    ChatHistory async ORM ile kaydedilir. İstek/yanıt biçimi aynıdır.
+    """
+    login_required = True
+
+    async def get_conversation(self, request, data):
+        queryset = conversation_lookup(request, data)
+        if queryset is None:
+            return None
+        conversation = await queryset.afirst()
+        if conversation is None:
+            raise NotFound("Sohbet bulunamadı.")
+        return conversation
+
+    async def stream_response(self, request, prompt, chunks, cached=False, conversation=None, lease=None):
+        async def relay():
+            tokens = []
+            try:
+                async for chunk in chunks:
+                    token = chunk.get('response', '')
+                    if token:
+                        tokens.append(token)
+                        yield json.dumps({"response": token}, ensure_ascii=False) + "\n"
+            except (httpx.HTTPError, ValueError) as e:
+                yield json.dumps({"error": str(e), "done": True}, ensure_ascii=False) + "\n"
+                return
+
+            chat = await ChatHistory.objects.acreate(
+                user=request.user,
+                conversation=conversation,
+                prompt=prompt,
+                response="".join(tokens)
+            )
+            if not cached and conversation is None:
+                await response_cache.aset(async_gateway.model, prompt, chat.response)
+            yield json.dumps({"done": True, "created_at": chat.created_at.isoformat()}) + "\n"
+
+        content = AsyncLeasedStream(relay(), lease) if lease else relay()
+        response = StreamingHttpResponse(content, content_type='application/x-ndjson')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        response['X-Cache'] = 'HIT' if cached else 'MISS'
+        return response
+
+    async def post(self, request):
+        data = self.parse_json(request)
+        serializer = ChatHistorySerializer(data=data)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        prompt = serializer.validated_data['prompt']
+        conversation = await self.get_conversation(request, data)
+        model_prompt = await context_builder.abuild(conversation, prompt)
+        cached = await response_cache.aget(async_gateway.model, prompt) if conversation is None else None
+        try:
+            if str(data.get('stream', request.GET.get('stream', ''))).lower() in TRUE_VALUES:
+                if cached:
+                    return await self.stream_response(request, prompt, cached_chunks(cached), cached=True)
+                chunks, lease = await scheduler.astream(async_gateway, request.user.pk, model_prompt)
+                return await self.stream_response(request, prompt, chunks, conversation=conversation, lease=lease)
+
+            chat = await ChatHistory.objects.acreate(
+                user=request.user,
+                conversation=conversation,
+                prompt=prompt,
+                response=cached or await scheduler.agenerate(async_gateway, request.user.pk, model_prompt)
+            )
+            if not cached and conversation is None:
+                await response_cache.aset(async_gateway.model, prompt, chat.response)
+
+            return JsonResponse({
+                "response": chat.response,
+                "created_at": serializers.DateTimeField().to_representation(chat.created_at)
+            }, status=status.HTTP_200_OK, headers={'X-Cache': 'HIT' if cached else 'MISS'})
+
+        except SchedulerBusy as e:
+            return busy_response(e, JsonResponse)
+
+        except httpx.TimeoutException:
+            error_msg = f"Ollama request timeout ({settings.OLLAMA_TIMEOUT}s)"
+            return JsonResponse({"error": error_msg}, status=status.HTTP_504_GATEWAY_TIMEOUT)
+
+        except httpx.TransportError as e:
+            error_msg = f"Ollama connection error: {str(e)}"
+            return JsonResponse({"error": error_msg}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        except Exception as e:
+            error_msg = f"Unexpected error: {str(e)}"
+            return JsonResponse({"error": error_msg}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ConversationListCreateView(AuthenticationMixin, generics.ListCreateAPIView):
+    """Kullanıcının sohbetleri; yeni sohbet id'si `api/ask/` isteğinde `conversation` olarak verilir."""
+    serializer_class = ConversationSerializer
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return Conversation.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+class ConversationTurnListView(AuthenticationMixin, generics.ListAPIView):
+    serializer_class = ConversationTurnSerializer
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        return ChatHistory.objects.filter(
+            conversation_id=self.kwargs['pk'],
+            conversation__user=self.request.user
+        )
@@ -0,0 +1,10 @@
+# notifications/apps.py
+
+from django.apps import AppConfig
+
+class NotificationsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'notifications'
+    verbose_name = 'Bildirimler'
+    # notifications.signals MQTT (paho-mqtt ve MQTT_BROKER ayarı) gerektirdiğinden
+    # burada kaydedilmez; broker yapılandırılınca ready() içinde içe aktarılmalıdır.
@@ -7,8 +7,8 @@ class Comment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     message = models.TextField()
     route = models.ForeignKey(Route, on_delete=models.CASCADE)
-    travel_buddy = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True related_name='buddy_comments')
-    created_at = models.DateTimeField()
+    travel_buddy = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='buddy_comments')
+    created_at = models.DateTimeField(auto_now_add=True)
 
 class Notification(models.Model):
     CATEGORY_CHOICES = [
@@ -24,6 +24,11 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id']),  # Keyset sayfalama
+        ]
+
 class Feedback(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     route = models.ForeignKey(Route, on_delete=models.SET_NULL, null=True, blank=True)
@@ -2,6 +2,7 @@ from rest_framework import serializers
 from .models import Notification, Feedback, Comment
 from users.models import User
 from routes.models import Route
+from plan_go.fast_serializers import ValuesSerializer
 
 class NotificationSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(
@@ -25,6 +26,10 @@ class NotificationSerializer(serializers.ModelSerializer):
             'category': {'required': True}
         }
 
+class NotificationValuesSerializer(ValuesSerializer):
+    """Bildirim listesinin .values() ile üretilen, NotificationSerializer ile aynı çıktısı."""
+    serializer_class = NotificationSerializer
+
 class FeedbackSerializer(serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(
         read_only=True,
@@ -0,0 +1,81 @@
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from notifications.models import Comment, Notification
+from notifications.serializers import NotificationSerializer, NotificationValuesSerializer
+from notifications.views import NotificationList
+from plan_go.testing import assert_max_queries, query_counts
+from routes.tests import create_route
+from users.models import User
+
+class NotificationListQueryTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+
+    def setup_notifications(self, count):
+        Notification.objects.filter(user=self.user).delete()
+        Notification.objects.bulk_create([
+            Notification(user=self.user, message=f'Bildirim {index}', category='reminder')
+            for index in range(count)
+        ])
+
+    def get(self):
+        request = APIRequestFactory().get('/api/notifications/')
+        force_authenticate(request, user=self.user)
+        response = NotificationList.as_view()(request)
+        response.render()
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_count_is_constant(self):
+        for fast in (True, False):
+            with self.subTest(fast=fast), self.settings(FAST_SERIALIZERS_ENABLED=fast):
+                counts = query_counts(self.get, (1, 20), self.setup_notifications)
+                self.assertEqual(counts[1], counts[20], counts)
+                with assert_max_queries(counts[1]):
+                    self.assertEqual(len(self.get().data['results']), 20)
+
+class NotificationValuesSerializerParityTests(TestCase):
+
+    def test_matches_drf_serializer(self):
+        user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        Notification.objects.bulk_create([
+            Notification(user=user, message=f'{category} bildirimi', category=category, is_read=is_read)
+            for category in [value for value, _ in Notification.CATEGORY_CHOICES] + ['eski_kategori']
+            for is_read in (False, True)
+        ])
+        queryset = Notification.objects.filter(user=user).order_by('id')
+        fast = NotificationValuesSerializer()
+        self.assertEqual(
+            JSONRenderer().render(fast.serialize(fast.values(queryset))),
+            JSONRenderer().render(NotificationSerializer(queryset, many=True).data),
+        )
+
+class NotificationEndpointTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_lists_only_own_notifications(self):
+        other = User.objects.create_user(username='diger', email='diger@example.com', password='x')
+        Notification.objects.create(user=self.user, message='Rotanız güncellendi', category='route_update')
+        Notification.objects.create(user=other, message='Başkasının bildirimi', category='reminder')
+
+        response = self.client.get(reverse('notification-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['message'] for item in response.json()['results']], ['Rotanız güncellendi'])
+
+    def test_create_comment(self):
+        route = create_route(self.user)
+        response = self.client.post(
+            reverse('comment-create'), {'route': route.pk, 'message': 'Harika rota'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        comment = Comment.objects.get()
+        self.assertEqual((comment.user, comment.route), (self.user, route))
+        self.assertIsNotNone(comment.created_at)
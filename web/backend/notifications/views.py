@@ -1,17 +1,25 @@
 # notifications/views.py
 
 from rest_framework import generics, permissions
+from plan_go.pagination import KeysetPagination
+from plan_go.fast_serializers import FastListMixin
+from plan_go.query_optimizer import QueryOptimizerMixin
 from .models import Notification, Comment
 from .serializers import (
     NotificationSerializer, 
+    NotificationValuesSerializer,
     FeedbackSerializer,
     CommentSerializer)
 
-class NotificationList(generics.ListAPIView):
+class NotificationList(FastListMixin, QueryOptimizerMixin, generics.ListAPIView):
     serializer_class = NotificationSerializer
+    fast_serializer_class = NotificationValuesSerializer
+    pagination_class = KeysetPagination
+    queryset = Notification.objects.all()
     
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user)
+        # super(): QueryOptimizerMixin ilişkileri ön yükler
+        return super().get_queryset().filter(user=self.request.user)
 
 class MarkAsReadView(generics.UpdateAPIView):
     queryset = Notification.objects.all()
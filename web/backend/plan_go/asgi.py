@@ -5,6 +5,9 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+Async uç noktalar (api/async/...) yalnızca bu giriş noktasıyla thread
+tutmadan çalışır; dağıtım profili için readme.md'deki ASGI bölümüne bakın.
 """
 
 # plan_go/asgi.py
@@ -0,0 +1,68 @@
+# plan_go/async_views.py
+
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.settings import api_settings
+
+class AsyncAPIView(View):
+    """
+    ASGI altında thread tutmadan çalışan JSON görünümleri için temel sınıf.
+    DRF APIView async handler desteklemediğinden kimlik doğrulama burada yapılır:
+    önce REST_FRAMEWORK'teki header tabanlı sınıflar (JWT), sonra oturum.
+    Oturumla gelen isteklerde CSRF, DRF'teki gibi ayrıca denetlenir.
+    Alt sınıflar handler'larını `async def` olarak tanımlar.
+    """
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    login_required = False
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # CSRF kontrolü oturum doğrulamasında elle yapılır
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def authenticate(self, request):
+        for authentication_class in self.authentication_classes:
+            if issubclass(authentication_class, SessionAuthentication):
+                continue  # DRF Request bekler; oturum aşağıda ele alınır
+            result = await sync_to_async(authentication_class().authenticate)(request)
+            if result is not None:
+                return result[0]
+
+        user = await request.auser()
+        if user.is_authenticated:
+            reason = CsrfViewMiddleware(lambda req: None).process_view(request, None, (), {})
+            if reason is not None:
+                raise exceptions.PermissionDenied("CSRF doğrulaması başarısız.")
+        return user
+
+    def error(self, detail, status):
+        return JsonResponse({"detail": detail}, status=status)
+
+    def parse_json(self, request):
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            raise exceptions.ParseError()
+        if not isinstance(data, dict):
+            raise exceptions.ParseError()
+        return data
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            request.user = await self.authenticate(request)
+        except exceptions.APIException as exc:
+            return self.error(exc.detail, exc.status_code)
+        if self.login_required and not request.user.is_authenticated:
+            return self.error("Kimlik bilgileri verilmedi.", 401)
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.error(exc.detail, exc.status_code)
@@ -0,0 +1,345 @@
+# plan_go/benchmark.py
+
+import datetime
+import io
+import platform
+import random
+import statistics
+import time
+from contextlib import ExitStack
+
+import django
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from . import metrics
+
+# Benchmark süresince geçerli ayarlar: arka plan thread'leri kapalı, dosyalar bellekte
+BENCHMARK_SETTINGS = {
+    'DEBUG': False,
+    'ALLOWED_HOSTS': ['*'],
+    'QR_CODE_ASYNC': False,
+    'ACTIVITY_BUFFER_ENABLED': False,
+    'STORAGES': {
+        'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+}
+
+ACTIVITY_TYPES = ('travel', 'comment', 'like', 'profile_update')
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+class BenchmarkSuite:
+    """
+    Sentetik veriyle sıcak yolları ölçen benchmark. Akışlar doğrudan view ve
+    servisler üzerinden çağrılır; her işlem için süre, sorgu sayısı ve
+    plan_go.metrics'in serileştirme/Ollama kırılımı kaydedilir. Aynı seed ve
+    parametrelerle veri ve istek sırası tekrarlanabilirdir.
+    Boş bir veritabanında çalıştırılmalıdır (bkz. `manage.py benchmark`).
+    """
+    FLOWS = (
+        'route_create',
+        'route_update',
+        'route_list',
+        'route_list_polyline',
+        'badge_award',
+        'shared_route_cold',
+        'shared_route_warm',
+        'llm_interaction',
+    )
+
+    def __init__(self, users=5, routes=20, waypoints=25, collaborators=3, activities=200,
+                 badges=20, iterations=20, warmup=3, seed=42):
+        self.params = {
+            'users': users, 'routes': routes, 'waypoints': waypoints, 'collaborators': collaborators,
+            'activities': activities, 'badges': badges, 'iterations': iterations, 'warmup': warmup, 'seed': seed,
+        }
+        self.rng = random.Random(seed)
+        self.factory = APIRequestFactory()
+        self.start = timezone.make_aware(datetime.datetime(2025, 6, 1, 8, 0))
+
+    # Veri
+
+    def seed(self):
+        from badges.models import Badge
+        from badges.services import rule_index
+        from routes.models import Route, Waypoint
+        from users.models import Activity, User
+
+        params = self.params
+        Badge.objects.bulk_create([
+            Badge(
+                name=f'Benchmark rozeti {index}',
+                image='badges/benchmark.png',
+                criteria=(
+                    {'type': 'activity_based', 'activity_type': self.rng.choice(ACTIVITY_TYPES),
+                     'count': self.rng.randint(1, max(params['activities'], 1))}
+                    if index % 4 else {'type': 'event_based', 'event': 'user_created'}
+                ),
+            )
+            for index in range(params['badges'])
+        ])
+        rule_index.invalidate()  # bulk_create sinyal göndermez
+
+        self.users = [
+            User.objects.create_user(username=f'bench{index}', email=f'bench{index}@example.com', password=None)
+            for index in range(max(params['users'], 2))
+        ]
+        self.user = self.users[0]
+        # Yeni rotalar ayrı kullanıcıya yazılır; ölçülen liste akış seçiminden bağımsız kalır
+        self.writer = self.users[-1]
+
+        for user in self.users:
+            others = [other for other in self.users if other != user]
+            for index in range(params['routes']):
+                route = Route.objects.create(user=user, is_shared=index == 0, **self.route_fields(index))
+                route.collaborators.set(self.rng.sample(others, min(params['collaborators'], len(others))))
+                Waypoint.objects.bulk_create([
+                    Waypoint(route=route, **fields) for fields in self.waypoint_fields(params['waypoints'])
+                ])
+
+            Activity.objects.bulk_create([
+                Activity(user=user, activity_type=self.rng.choice(ACTIVITY_TYPES))
+                for _ in range(params['activities'])
+            ])
+        call_command('backfill_activity_counters', stdout=io.StringIO())
+
+        self.route = Route.objects.filter(user=self.user).order_by('pk').first()
+        self.shared = Route.objects.filter(user=self.user, is_shared=True).first()
+
+    def route_fields(self, index):
+        lng, lat = self.rng.uniform(26, 44), self.rng.uniform(36, 42)
+        return {
+            'title': f'Benchmark rotası {index}',
+            'start_point': f'POINT({lng} {lat})',
+            'destination': f'POINT({lng + 1} {lat + 0.5})',
+            'start_date': self.start,
+            'end_date': self.start + datetime.timedelta(days=3),
+        }
+
+    def waypoint_fields(self, count, suffix=''):
+        from routes.fields import LazyPoint
+
+        lng, lat = self.rng.uniform(26, 44), self.rng.uniform(36, 42)
+        return [
+            {
+                'name': f'Durak {order}{suffix}',
+                'order': order,
+                'location': LazyPoint(lng + order * 0.01, lat + order * 0.005),
+                'arrival_time': self.start + datetime.timedelta(hours=order),
+            }
+            for order in range(1, count + 1)
+        ]
+
+    def route_payload(self, suffix=''):
+        payload = self.route_fields(0)
+        payload['start_date'] = payload['start_date'].isoformat()
+        payload['end_date'] = payload['end_date'].isoformat()
+        payload['collaborators'] = [user.email for user in self.users[1:1 + self.params['collaborators']]]
+        payload['waypoints'] = [
+            {
+                'name': fields['name'],
+                'order': fields['order'],
+                'latitude': fields['location'].y,
+                'longitude': fields['location'].x,
+                'arrival_time': fields['arrival_time'].isoformat(),
+            }
+            for fields in self.waypoint_fields(self.params['waypoints'], suffix)
+        ]
+        return payload
+
+    # Ölçüm
+
+    def measure(self, operation, setup=None):
+        """operation'ı warmup + iterations kez çalıştırır; ölçülen turların özetini döndürür."""
+        for index in range(self.params['warmup']):
+            if setup:
+                setup(index)
+            operation(index)
+
+        durations, queries, serialization, ollama = [], [], [], []
+        metrics.install_all()
+        for index in range(self.params['iterations']):
+            if setup:
+                setup(index)
+            recorder = metrics.RequestMetrics()
+            token = metrics.activate(recorder)
+            try:
+                started = time.perf_counter()
+                operation(index)
+                durations.append((time.perf_counter() - started) * 1000)
+            finally:
+                metrics.deactivate(token)
+            queries.append(recorder.queries)
+            serialization.append(recorder.timings['serialization'])
+            ollama.append(recorder.timings['ollama'])
+
+        return {
+            'iterations': len(durations),
+            'mean_ms': round(statistics.fmean(durations), 3),
+            'median_ms': round(statistics.median(durations), 3),
+            'p95_ms': round(percentile(durations, 0.95), 3),
+            'min_ms': round(min(durations), 3),
+            'max_ms': round(max(durations), 3),
+            'ops_per_sec': round(1000 / statistics.fmean(durations), 2),
+            'queries': max(queries),
+            'serialization_ms': round(statistics.median(serialization), 3),
+            'ollama_ms': round(statistics.median(ollama), 3),
+        }
+
+    def run(self, flows=None):
+        results = {}
+        for name in flows or self.FLOWS:
+            results[name] = getattr(self, f'bench_{name}')()
+        return results
+
+    def describe(self):
+        return {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': f'{connection.vendor} {connection.Database.sqlite_version}'
+                        if connection.vendor == 'sqlite' else connection.vendor,
+            'params': self.params,
+        }
+
+    @staticmethod
+    def render(response):
+        if hasattr(response, 'render'):
+            response.render()
+        if response.status_code >= 400:
+            raise AssertionError(f"Beklenmeyen yanıt {response.status_code}: {response.content[:200]!r}")
+        return response
+
+    def request(self, method, path, data=None):
+        request = getattr(self.factory, method)(path, data, format='json')
+        force_authenticate(request, user=self.user)
+        return request
+
+    # Akışlar
+
+    def _save_route(self, serializer):
+        serializer.is_valid(raise_exception=True)
+        if serializer.instance is None:
+            serializer.save(user=self.writer)
+        else:
+            serializer.save()
+        with metrics.timed('serialization'):
+            return serializer.data
+
+    def bench_route_create(self):
+        from routes.serializers import RouteSerializer
+
+        payload = self.route_payload()
+        context = {'request': self.factory.get('/routes/')}
+        return self.measure(lambda index: self._save_route(RouteSerializer(data=payload, context=context)))
+
+    def bench_route_update(self):
+        from routes.models import Route
+        from routes.serializers import RouteSerializer
+
+        # Her turda durak adları değişir; eşitleme gerçekten güncelleme yapar
+        payloads = [self.route_payload(' (a)'), self.route_payload(' (b)')]
+        context = {'request': self.factory.get('/routes/')}
+
+        def operation(index):
+            route = Route.objects.get(pk=self.route.pk)
+            self._save_route(RouteSerializer(route, data=payloads[index % 2], context=context))
+        return self.measure(operation)
+
+    def _route_list(self, path):
+        from routes.views import RouteViewSet
+
+        view = RouteViewSet.as_view({'get': 'list'})
+        return self.measure(lambda index: self.render(view(self.request('get', path))))
+
+    def bench_route_list(self):
+        return self._route_list('/routes/')
+
+    def bench_route_list_polyline(self):
+        return self._route_list('/routes/?waypoints=polyline')
+
+    def bench_badge_award(self):
+        from badges.services import BadgeAwardService
+
+        return self.measure(lambda index: BadgeAwardService.award_badges(self.user, activity_type=ACTIVITY_TYPES[index % 2]))
+
+    def _shared_route(self, cold):
+        from routes.shared_cache import shared_route_cache
+        from routes.views import RouteViewSet
+
+        view = RouteViewSet.as_view({'get': 'shared_route_detail'})
+        token = self.shared.share_token
+        path = f'/api/routes/shared/{token}/'
+
+        def setup(index):
+            if cold:
+                shared_route_cache.invalidate(token)
+        return self.measure(
+            lambda index: self.render(view(self.factory.get(path), share_token=token)), setup=setup
+        )
+
+    def bench_shared_route_cold(self):
+        return self._shared_route(cold=True)
+
+    def bench_shared_route_warm(self):
+        return self._shared_route(cold=False)
+
+    def bench_llm_interaction(self):
+        if not apps.is_installed('llm'):
+            return {'skipped': "'llm' uygulaması INSTALLED_APPS içinde değil"}
+        from llm.testing import FakeOllamaServer
+        from llm.views import LLMInteractionView
+
+        view = LLMInteractionView.as_view()
+        with ExitStack() as stack:
+            server = stack.enter_context(FakeOllamaServer(tokens=['Merhaba', ' gezgin', '!']))
+            stack.enter_context(override_settings(OLLAMA_API_URL=server.url))
+            # Her turda farklı prompt: yanıt önbelleği devreye girmez
+            return self.measure(lambda index: self.render(
+                view(self.request('post', '/api/ask/', {'prompt': f'Benchmark sorusu {index} {time.perf_counter_ns()}'}))
+            ))
+
+def compare(results, baseline, threshold=0.25):
+    """
+    Sonuçları önceki bir çalıştırmayla karşılaştırır. Medyan süre eşikten
+    fazla artan ya da sorgu sayısı artan akışlar gerileme sayılır; baseline'da
+    ölçülmüş olup bu çalıştırmada atlanan akışlar da gerilemedir.
+    (karşılaştırma, gerileyen akış adları) döndürür.
+    """
+    comparison, regressions = {}, []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        measured_before = bool(previous) and 'median_ms' in previous
+        if 'skipped' in current:
+            comparison[name] = {'status': 'skipped', 'reason': current['skipped']}
+            if measured_before:
+                comparison[name]['baseline_median_ms'] = previous['median_ms']
+                regressions.append(name)
+            continue
+        if not measured_before:
+            continue
+        ratio = current['median_ms'] / previous['median_ms'] if previous['median_ms'] else 1.0
+        status = 'ok'
+        if ratio > 1 + threshold or current['queries'] > previous['queries']:
+            status = 'regression'
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            status = 'improvement'
+        comparison[name] = {
+            'status': status,
+            'median_ratio': round(ratio, 3),
+            'baseline_median_ms': previous['median_ms'],
+            'median_ms': current['median_ms'],
+            'baseline_queries': previous['queries'],
+            'queries': current['queries'],
+        }
+    return comparison, regressions
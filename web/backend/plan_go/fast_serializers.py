@@ -0,0 +1,166 @@
+# plan_go/fast_serializers.py
+
+from operator import itemgetter
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .metrics import timed
+
+def _datetime_encoder(field):
+    """DRF DateTimeField.to_representation'ın saat dilimi bir kez çözülmüş hâli."""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None:
+        return None
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    iso = output_format.lower() == ISO_8601
+
+    def encode(value):
+        if field_timezone is not None and timezone.is_aware(value):
+            value = value.astimezone(field_timezone)
+        else:
+            value = field.enforce_timezone(value)
+        if iso:
+            value = value.isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return value.strftime(output_format)
+    return encode
+
+def _choice_encoder(field):
+    choices = field.choice_strings_to_values
+
+    def encode(value):
+        if value == '':
+            return value
+        return choices.get(str(value), value)
+    return encode
+
+def compile_encoder(field):
+    """
+    DRF alanının to_representation'ını .values() değerleri üzerinde çalışan düz
+    bir fonksiyona çevirir (None: değer olduğu gibi kullanılır). None değerler
+    DRF'teki gibi kodlanmadan None döner.
+    """
+    if isinstance(field, serializers.BooleanField):
+        return bool
+    if isinstance(field, serializers.IntegerField):
+        return int
+    if isinstance(field, serializers.FloatField):
+        return float
+    if isinstance(field, serializers.CharField):
+        return str
+    if isinstance(field, serializers.ChoiceField):
+        return _choice_encoder(field)
+    if isinstance(field, serializers.UUIDField):
+        return str if field.uuid_format == 'hex_verbose' else field.to_representation
+    if isinstance(field, serializers.DateTimeField):
+        return _datetime_encoder(field)
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        # values() yabancı anahtarın kendisini döndürür
+        return compile_encoder(field.pk_field) if field.pk_field is not None else None
+    if isinstance(field, (serializers.RelatedField, serializers.ManyRelatedField,
+                          serializers.BaseSerializer, serializers.FileField,
+                          serializers.SerializerMethodField)):
+        raise ImproperlyConfigured(
+            f"'{field.field_name}' alanı .values() ile kodlanamaz; method_fields ile hesaplanmalı"
+        )
+    return field.to_representation
+
+def _value_getter(lookup, encoder):
+    if encoder is None:
+        return itemgetter(lookup)
+
+    def get(row):
+        value = row[lookup]
+        return None if value is None else encoder(value)
+    return get
+
+class ValuesSerializer:
+    """
+    Salt okunur liste uçları için hızlı serileştirme. Kayıtlar model nesnesi
+    kurulmadan .values() ile okunur; her alan serializer_class'taki karşılığından
+    bir kez derlenen düz bir fonksiyonla kodlanır. Alan adları, sırası ve
+    değerleri serializer_class çıktısıyla birebir aynıdır.
+
+      lookups:       çıktı alanı -> values() yolu (varsayılan: alanın source'u)
+      method_fields: satırdan get_<alan>(row) ile hesaplanan alanlar; ilişkili
+                     veriler prepare(rows) içinde toplu okunur
+    """
+    serializer_class = None
+    lookups = {}
+    method_fields = ()
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.getters = self.compile()
+
+    def get_fields(self):
+        serializer = self.serializer_class(context=self.context)
+        return [field for field in serializer.fields.values() if not field.write_only]
+
+    def compile(self):
+        getters = []
+        self.value_lookups = []
+        for field in self.get_fields():
+            name = field.field_name
+            if name in self.method_fields:
+                getters.append((name, getattr(self, f'get_{name}')))
+                continue
+            lookup = self.lookups.get(name, field.source.replace('.', '__'))
+            self.value_lookups.append(lookup)
+            getters.append((name, _value_getter(lookup, compile_encoder(field))))
+        return getters
+
+    def values(self, queryset, *extra):
+        """Serileştirme için gereken sütunları okuyan values() queryset'i."""
+        lookups = dict.fromkeys((*self.value_lookups, *self.extra_lookups(), *extra))
+        return queryset.select_related(None).prefetch_related(None).values(*lookups)
+
+    def extra_lookups(self):
+        """method_fields'ın satırda ihtiyaç duyduğu ek sütunlar."""
+        return ()
+
+    def prepare(self, rows):
+        """Satırlar kodlanmadan önce ilişkili verileri toplu okumak için kanca."""
+
+    def serialize(self, rows):
+        rows = list(rows)
+        self.prepare(rows)
+        getters = self.getters
+        return [{name: get(row) for name, get in getters} for row in rows]
+
+class FastListMixin:
+    """
+    ListModelMixin.list'in fast_serializer_class ile çalışan hızlı yolu.
+    Çıktı serializer_class ile aynıdır; FAST_SERIALIZERS_ENABLED=False ya da
+    get_fast_serializer None döndürürse normal serileştirmeye düşülür.
+    """
+    fast_serializer_class = None
+
+    def get_fast_serializer(self):
+        if self.fast_serializer_class is None or not getattr(settings, 'FAST_SERIALIZERS_ENABLED', True):
+            return None
+        return self.fast_serializer_class(context=self.get_serializer_context())
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_fast_serializer()
+        if serializer is None:
+            return super().list(request, *args, **kwargs)
+
+        # Keyset cursor'ı sıralama sütunlarını satırdan okur
+        ordering = getattr(self.paginator, 'ordering', None) or ()
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        queryset = serializer.values(
+            self.filter_queryset(self.get_queryset()), *(name.lstrip('-') for name in ordering)
+        )
+        page = self.paginate_queryset(queryset)
+        with timed('serialization'):
+            data = serializer.serialize(page if page is not None else queryset)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
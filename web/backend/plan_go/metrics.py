@@ -0,0 +1,228 @@
+# plan_go/metrics.py
+
+import bisect
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.utils import timezone
+
+DURATION_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Uç başına tutulan histogramlar: ad -> (kova sınırları, açıklama)
+HISTOGRAMS = {
+    'duration_ms': (DURATION_BUCKETS_MS, "İstek süresi (ms)"),
+    'db_queries': (QUERY_BUCKETS, "İstek başına veritabanı sorgusu"),
+    'db_ms': (DURATION_BUCKETS_MS, "İstek başına veritabanı süresi (ms)"),
+    'serialization_ms': (DURATION_BUCKETS_MS, "Serileştirme ve render süresi (ms)"),
+    'ollama_ms': (DURATION_BUCKETS_MS, "Ollama çağrılarında beklenen süre (ms)"),
+    'response_bytes': (SIZE_BUCKETS, "Yanıt gövdesi boyutu (bayt)"),
+}
+
+class Histogram:
+    """Sabit kovalı histogram; yüzdelikler kova içinde doğrusal tahmin edilir."""
+    __slots__ = ('bounds', 'counts', 'count', 'sum')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Son kova: +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        total, result = 0, []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[index - 1] if index else 0
+                if index == len(self.bounds):
+                    return float(lower)  # +Inf kovası: alt sınır raporlanır
+                return lower + (self.bounds[index] - lower) * (rank - seen) / count
+            seen += count
+        return float(self.bounds[-1])
+
+    def summary(self):
+        def rounded(value):
+            return None if value is None else round(value, 2)
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 2),
+            'mean': rounded(self.sum / self.count if self.count else None),
+            'p50': rounded(self.quantile(0.5)),
+            'p95': rounded(self.quantile(0.95)),
+            'p99': rounded(self.quantile(0.99)),
+        }
+
+class RequestMetrics:
+    """Tek isteğin ölçümleri; InstrumentationMiddleware tarafından context'e konur."""
+
+    def __init__(self, capture_sql=False):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.timings = Counter()  # serialization, ollama, ...
+        self.capture_sql = capture_sql
+        self.sql = []  # (sql, ms); yalnızca örneklenen isteklerde
+
+    def add_query(self, sql, elapsed_ms):
+        self.queries += 1
+        self.db_ms += elapsed_ms
+        if self.capture_sql:
+            self.sql.append((sql, elapsed_ms))
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+_current = ContextVar('plan_go_request_metrics', default=None)
+
+def current():
+    return _current.get()
+
+def activate(metrics):
+    return _current.set(metrics)
+
+def deactivate(token):
+    _current.reset(token)
+
+@contextmanager
+def timed(kind):
+    """
+    Bloğun süresini etkin isteğin kind (serialization, ollama) süresine ekler.
+    Blok içinde çalışan sorguların süresi düşülür; veritabanı ayrıca ölçülür.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start, db_start = time.perf_counter(), metrics.db_ms
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000 - (metrics.db_ms - db_start)
+        metrics.timings[kind] += max(elapsed, 0.0)
+
+def record_query(execute, sql, params, many, context):
+    """connection.execute_wrapper: etkin isteğin sorgu sayısını ve süresini toplar."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, (time.perf_counter() - start) * 1000)
+
+def install(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+def install_all():
+    """Bu thread'de açılmış bağlantılara sarmalayıcıyı ekler; yenileri sinyalle eklenir."""
+    for connection in connections.all(initialized_only=True):
+        install(connection)
+
+@receiver(connection_created)
+def install_on_connect(sender, connection, **kwargs):
+    # sync_to_async thread'lerinde açılan bağlantılar da ölçülür
+    install(connection)
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.statuses = Counter()
+        self.histograms = {name: Histogram(bounds) for name, (bounds, _) in HISTOGRAMS.items()}
+
+class MetricsRegistry:
+    """
+    Süreç içi uç (view adı, HTTP metodu) istatistikleri. Her süreç kendi
+    sayaçlarını tutar; çok süreçli dağıtımda Prometheus her süreci ayrı kazır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+            self.since = timezone.now()
+
+    def record(self, endpoint, method, status, values):
+        with self._lock:
+            stats = self._endpoints.get((endpoint, method))
+            if stats is None:
+                stats = self._endpoints[(endpoint, method)] = EndpointStats()
+            stats.requests += 1
+            stats.statuses[status] += 1
+            for name, value in values.items():
+                stats.histograms[name].observe(value)
+
+    def report(self):
+        """Uçları toplam süreye göre azalan sırada özetler."""
+        with self._lock:
+            endpoints = [
+                {
+                    'endpoint': endpoint,
+                    'method': method,
+                    'requests': stats.requests,
+                    'statuses': {str(status): count for status, count in sorted(stats.statuses.items())},
+                    **{name: histogram.summary() for name, histogram in stats.histograms.items()},
+                }
+                for (endpoint, method), stats in self._endpoints.items()
+            ]
+            since = self.since
+        endpoints.sort(key=lambda item: item['duration_ms']['sum'], reverse=True)
+        return {'since': since.isoformat(), 'endpoints': endpoints}
+
+    def prometheus(self, prefix='plan_go'):
+        """Prometheus metin biçimi (0.0.4)."""
+        lines = []
+        with self._lock:
+            items = sorted(self._endpoints.items())
+            lines.append(f'# HELP {prefix}_requests_total İşlenen istek sayısı')
+            lines.append(f'# TYPE {prefix}_requests_total counter')
+            for (endpoint, method), stats in items:
+                for status, count in sorted(stats.statuses.items()):
+                    labels = _labels(endpoint=endpoint, method=method, status=status)
+                    lines.append(f'{prefix}_requests_total{{{labels}}} {count}')
+
+            for name, (bounds, description) in HISTOGRAMS.items():
+                metric = f'{prefix}_request_{name}'
+                lines.append(f'# HELP {metric} {description}')
+                lines.append(f'# TYPE {metric} histogram')
+                for (endpoint, method), stats in items:
+                    histogram = stats.histograms[name]
+                    labels = _labels(endpoint=endpoint, method=method)
+                    for bound, count in zip((*bounds, '+Inf'), histogram.cumulative()):
+                        lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f'{metric}_sum{{{labels}}} {histogram.sum:.3f}')
+                    lines.append(f'{metric}_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{name}="{escape(value)}"' for name, value in labels.items())
+
+registry = MetricsRegistry()
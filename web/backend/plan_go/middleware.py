@@ -0,0 +1,160 @@
+# plan_go/middleware.py
+
+import logging
+import random
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger('plan_go.metrics')
+
+SLOW_SQL_LIMIT = 5
+
+class InstrumentationMiddleware:
+    """
+    Her isteğin sorgu sayısı/süresi, serileştirme (render) süresi, Ollama
+    bekleme süresi ve yanıt boyutunu ölçüp uç başına histogramlara işler
+    (bkz. plan_go.metrics). METRICS_SQL_SAMPLE_RATE oranındaki isteklerde SQL
+    metinleri de toplanır; METRICS_SLOW_REQUEST_MS'i aşan istekler en yavaş ve
+    en çok tekrarlanan sorgularıyla loglanır. Akış yanıtları akış bitince kaydedilir.
+    MIDDLEWARE listesinin başında olmalıdır.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'METRICS_ENABLED', True)
+        self.slow_request_ms = getattr(settings, 'METRICS_SLOW_REQUEST_MS', 1000)
+        self.sample_rate = getattr(settings, 'METRICS_SQL_SAMPLE_RATE', 0.1)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        request_metrics, token = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.deactivate(token)
+        return self._finish(request, response, request_metrics)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        request_metrics, token = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.deactivate(token)
+        return self._finish(request, response, request_metrics)
+
+    def process_template_response(self, request, response):
+        # DRF Response'ları view döndükten sonra render edilir; bu süre serileştirmeye sayılır
+        request_metrics = metrics.current()
+        if request_metrics is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                request_metrics.timings['serialization'] += (time.perf_counter() - start) * 1000
+            response.add_post_render_callback(rendered)
+        return response
+
+    def _start(self):
+        request_metrics = metrics.RequestMetrics(capture_sql=random.random() < self.sample_rate)
+        metrics.install_all()
+        return request_metrics, metrics.activate(request_metrics)
+
+    def _finish(self, request, response, request_metrics):
+        if response.streaming:
+            self._wrap_stream(request, response, request_metrics)
+        else:
+            self._record(request, response, request_metrics, len(response.content))
+        return response
+
+    def _wrap_stream(self, request, response, request_metrics):
+        """Akış parçaları üretilirken ölçüm context'i yeniden etkinleştirilir."""
+        content = response.streaming_content
+
+        if response.is_async:
+            async def stream():
+                size = 0
+                iterator = aiter(content)
+                try:
+                    while True:
+                        token = metrics.activate(request_metrics)
+                        try:
+                            chunk = await anext(iterator)
+                        except StopAsyncIteration:
+                            break
+                        finally:
+                            metrics.deactivate(token)
+                        size += len(chunk)
+                        yield chunk
+                finally:
+                    self._record(request, response, request_metrics, size)
+        else:
+            def stream():
+                size = 0
+                iterator = iter(content)
+                try:
+                    while True:
+                        token = metrics.activate(request_metrics)
+                        try:
+                            chunk = next(iterator)
+                        except StopIteration:
+                            break
+                        finally:
+                            metrics.deactivate(token)
+                        size += len(chunk)
+                        yield chunk
+                finally:
+                    self._record(request, response, request_metrics, size)
+
+        response.streaming_content = stream()
+
+    @staticmethod
+    def endpoint(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return '<unmatched>'
+        return match.view_name or match._func_path
+
+    def _record(self, request, response, request_metrics, size):
+        duration = request_metrics.elapsed_ms()
+        endpoint = self.endpoint(request)
+        metrics.registry.record(endpoint, request.method, response.status_code, {
+            'duration_ms': duration,
+            'db_queries': request_metrics.queries,
+            'db_ms': request_metrics.db_ms,
+            'serialization_ms': request_metrics.timings['serialization'],
+            'ollama_ms': request_metrics.timings['ollama'],
+            'response_bytes': size,
+        })
+        if duration >= self.slow_request_ms:
+            self._log_slow(request, endpoint, duration, request_metrics)
+
+    @staticmethod
+    def _log_slow(request, endpoint, duration, request_metrics):
+        lines = [
+            f"Yavaş istek: {request.method} {request.get_full_path()} ({endpoint}) "
+            f"{duration:.0f}ms, {request_metrics.queries} sorgu / {request_metrics.db_ms:.0f}ms, "
+            f"serileştirme {request_metrics.timings['serialization']:.0f}ms, "
+            f"ollama {request_metrics.timings['ollama']:.0f}ms"
+        ]
+        if request_metrics.sql:
+            slowest = sorted(request_metrics.sql, key=lambda item: item[1], reverse=True)[:SLOW_SQL_LIMIT]
+            lines.append("En yavaş sorgular:")
+            lines.extend(f"  {elapsed:.1f}ms  {sql}" for sql, elapsed in slowest)
+            repeated = [(sql, count) for sql, count in Counter(sql for sql, _ in request_metrics.sql).most_common(SLOW_SQL_LIMIT) if count > 1]
+            if repeated:
+                lines.append("Tekrarlanan sorgular (olası N+1):")
+                lines.extend(f"  {count}x  {sql}" for sql, count in repeated)
+        logger.warning('\n'.join(lines))
@@ -0,0 +1,140 @@
+# plan_go/pagination.py
+
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+class InvalidCursor(ValueError):
+    pass
+
+def _split(ordering):
+    return [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+
+def _value(item, name):
+    return item[name] if isinstance(item, dict) else getattr(item, name)
+
+def encode_cursor(item, ordering):
+    """Sayfanın son kaydından bir sonraki sayfanın başlangıç anahtarını üretir."""
+    values = []
+    for name, _ in _split(ordering):
+        value = _value(item, name)
+        values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def decode_cursor(cursor, model, ordering):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        fields = _split(ordering)
+        if not isinstance(values, list) or len(values) != len(fields):
+            raise InvalidCursor(cursor)
+        return [model._meta.get_field(name).to_python(value) for (name, _), value in zip(fields, values)]
+    except (TypeError, ValueError, ValidationError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+def keyset_filter(ordering, values):
+    """
+    (a, b) sıralaması için `a < x OR (a = x AND b < y)` koşulunu kurar.
+    Bileşik indeksle birlikte derin sayfalar da ilk sayfa kadar ucuzdur.
+    """
+    condition = Q()
+    fields = _split(ordering)
+    for index, (name, descending) in enumerate(fields):
+        equal = {prefix: value for (prefix, _), value in zip(fields[:index], values)}
+        lookup = 'lt' if descending else 'gt'
+        condition |= Q(**equal, **{f'{name}__{lookup}': values[index]})
+    return condition
+
+def paginate_keyset(queryset, ordering, cursor=None, page_size=20):
+    """Bir sayfa kayıt ve varsa bir sonraki sayfanın cursor'ını döndürür."""
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(keyset_filter(ordering, decode_cursor(cursor, queryset.model, ordering)))
+
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(items[-1], ordering)
+    return items, next_cursor
+
+class KeysetPagination(BasePagination):
+    """
+    (created_at, id) gibi bileşik anahtarla ilerleyen cursor sayfalama.
+    OFFSET kullanılmadığı için derin sayfaların maliyeti ilk sayfayla aynıdır.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        try:
+            items, self.next_cursor = paginate_keyset(
+                queryset,
+                self.ordering,
+                request.query_params.get(self.cursor_query_param),
+                self.get_page_size(request),
+            )
+        except InvalidCursor:
+            raise NotFound("Geçersiz cursor")
+        return items
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+class KeysetListMixin:
+    """
+    Django ListView için keyset sayfalama.
+    Şablona `next_cursor` verilir; `?cursor=` ile bir sonraki sayfa istenir.
+    """
+    keyset_ordering = ('-created_at', '-id')
+    paginate_by = 10
+
+    def paginate_queryset(self, queryset, page_size):
+        try:
+            items, self.next_cursor = paginate_keyset(
+                queryset, self.keyset_ordering, self.request.GET.get('cursor'), page_size
+            )
+        except InvalidCursor:
+            raise Http404("Geçersiz cursor")
+        return (None, None, items, self.next_cursor is not None)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['next_cursor'] = getattr(self, 'next_cursor', None)
+        return context
@@ -0,0 +1,111 @@
+# plan_go/query_optimizer.py
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+def _relation(model, name):
+    """model üzerindeki name ilişkisini döndürür; ilişki değilse (property, alan) None."""
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    return field if field.is_relation else None
+
+def _leading_relations(model, source):
+    """'user.profile.name' gibi bir kaynağın baştaki ilişki zincirini ('user__profile') bulur."""
+    path = []
+    for name in source.split('.'):
+        relation = _relation(model, name)
+        if relation is None or relation.many_to_many or relation.one_to_many:
+            break
+        path.append(name)
+        model = relation.related_model
+    return '__'.join(path)
+
+def _meta_option(serializer, name):
+    return tuple(getattr(getattr(serializer, 'Meta', None), name, ()))
+
+def collect(serializer, model, prefix=''):
+    """
+    Serializer alanlarını gezerek gereken (select_related, prefetch_related)
+    listelerini çıkarır:
+      - iç içe tekil serializer / pk dışı tekil ilişki alanı -> select_related
+      - many=True serializer / ilişki alanı -> Prefetch (iç serializer'ın
+        ihtiyaçları ve Meta.ordering Prefetch queryset'ine uygulanır)
+    SerializerMethodField gibi çıkarılamayan ihtiyaçlar Meta.select_related /
+    Meta.prefetch_related ile bildirilir.
+    """
+    select = [prefix + path for path in _meta_option(serializer, 'select_related')]
+    prefetch = [prefix + path for path in _meta_option(serializer, 'prefetch_related')]
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        head = field.source.split('.', 1)[0]
+        relation = _relation(model, head)
+
+        if isinstance(field, (serializers.ListSerializer, ManyRelatedField)):
+            if relation is None or not (relation.many_to_many or relation.one_to_many):
+                continue
+            related_model = relation.related_model
+            if isinstance(field, serializers.ListSerializer):
+                queryset = optimize_queryset(related_model._default_manager.all(), field.child)
+                ordering = _meta_option(field.child, 'ordering')
+                if ordering:
+                    queryset = queryset.order_by(*ordering)
+            else:
+                queryset = related_model._default_manager.all()
+                slug_field = getattr(field.child_relation, 'slug_field', None)
+                if slug_field and '__' not in slug_field:
+                    # Yalnızca gösterilen alan okunur (ör. işbirlikçi e-postaları)
+                    queryset = queryset.only(related_model._meta.pk.name, slug_field)
+            prefetch.append(Prefetch(prefix + head, queryset=queryset))
+
+        elif isinstance(field, serializers.BaseSerializer):
+            if relation is not None and not (relation.many_to_many or relation.one_to_many):
+                select.append(prefix + head)
+                child_select, child_prefetch = collect(field, relation.related_model, prefix + head + '__')
+                select.extend(child_select)
+                prefetch.extend(child_prefetch)
+
+        elif isinstance(field, RelatedField):
+            if not field.use_pk_only_optimization() and relation is not None:
+                select.append(prefix + head)
+
+        elif '.' in field.source:
+            path = _leading_relations(model, field.source)
+            if path:
+                select.append(prefix + path)
+
+    return select, prefetch
+
+def optimize_queryset(queryset, serializer):
+    """Serializer'ın (sınıf ya da örnek) ihtiyaç duyduğu ilişkileri queryset'e ekler."""
+    if isinstance(serializer, type):
+        serializer = serializer()
+    select, prefetch = collect(serializer, queryset.model)
+    if select:
+        queryset = queryset.select_related(*dict.fromkeys(select))
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+class QueryOptimizerMixin:
+    """
+    GenericAPIView.get_queryset sonucunu serializer'ın ihtiyaçlarına göre
+    select_related/prefetch_related ile zenginleştirir; N kayıtlık bir liste
+    sabit sayıda sorguyla serileştirilir. Serializer görünümün context'iyle
+    kurulduğundan context'e göre değişen alanlar da dikkate alınır.
+    optimized_actions verilirse yalnızca o ViewSet action'larında uygulanır.
+    get_queryset'i ezen görünümler sonucu super().get_queryset() üzerinden kurmalıdır.
+    """
+    optimized_actions = None
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.optimized_actions is not None and getattr(self, 'action', None) not in self.optimized_actions:
+            return queryset
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        return optimize_queryset(queryset, serializer)
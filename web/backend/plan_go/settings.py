@@ -48,11 +48,14 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'badges.apps.BadgesConfig',
     'routes.apps.RoutesConfig',
+    'llm.apps.LlmConfig',
+    'notifications.apps.NotificationsConfig',
     'rest_framework',
     # 'social_django',
 ]
 
 MIDDLEWARE = [
+    'plan_go.middleware.InstrumentationMiddleware',  # Tüm zinciri ölçmesi için en başta
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -99,6 +102,7 @@ GDAL_LIBRARY_PATH = r"C:\\OSGeo4W\\bin\\gdal310.dll"
 # GDAL_LIBRARY_PATH = r"C:\\gdal\\bin\\gdal.dll"
 
 WSGI_APPLICATION = 'plan_go.wsgi.application'
+ASGI_APPLICATION = 'plan_go.asgi.application'
 
 
 # Database
@@ -156,17 +160,85 @@ SOCIAL_AUTH_URL_NAMESPACE = 'social'
 # https://docs.djangoproject.com/en/5.1/howto/static-files/
 
 STATIC_URL = '/static/'
+STATICFILES_DIRS = [BASE_DIR / 'statics']
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
 
 
+# QR kodları istek dışında üretilir; hazır olana kadar yer tutucu döner
+QR_CODE_ASYNC = os.getenv('QR_CODE_ASYNC', 'True') == 'True'
+QR_CODE_PLACEHOLDER_URL = STATIC_URL + 'img/qr_placeholder.svg'
+
+
+# Aktiviteler bellekte biriktirilip toplu yazılır (bkz. users.services.ActivityBuffer)
+ACTIVITY_BUFFER_ENABLED = os.getenv('ACTIVITY_BUFFER_ENABLED', 'True') == 'True'
+ACTIVITY_BUFFER_SIZE = int(os.getenv('ACTIVITY_BUFFER_SIZE', 100))
+ACTIVITY_BUFFER_MAX_DELAY = float(os.getenv('ACTIVITY_BUFFER_MAX_DELAY', 2.0))
+# Yazma başarısız olursa yeniden denemek için tutulacak en fazla aktivite
+ACTIVITY_BUFFER_MAX_PENDING = int(os.getenv('ACTIVITY_BUFFER_MAX_PENDING', 10000))
+
+
+# Güzergâh (mesafe/ETA) hesaplarının önbellekte kalma süresi; anahtar rota versiyonunu ve last_updated'ı içerir
+ITINERARY_CACHE_TTL = int(os.getenv('ITINERARY_CACHE_TTL', 60 * 60 * 24))
+
+# Paylaşılan rota yanıtlarının önbellekte kalma süresi; rota kaydında hemen geçersizleşir
+SHARED_ROUTE_CACHE_TTL = int(os.getenv('SHARED_ROUTE_CACHE_TTL', 600))
+
+# GPX/GeoJSON iz içe aktarımı: bulk_create parça boyutu ve dosya başına nokta sınırı
+ROUTE_IMPORT_BATCH_SIZE = int(os.getenv('ROUTE_IMPORT_BATCH_SIZE', 1000))
+ROUTE_IMPORT_MAX_POINTS = int(os.getenv('ROUTE_IMPORT_MAX_POINTS', 200000))
+# GeoJSON'da bellekte tutulabilecek tek değerin (feature) en fazla boyutu; varsayılan DATA_UPLOAD_MAX_MEMORY_SIZE (2.5 MB)
+ROUTE_IMPORT_MAX_VALUE_SIZE = int(os.getenv('ROUTE_IMPORT_MAX_VALUE_SIZE', 2621440))
+
+# Konumsal sorgu sınırları: nearby en büyük yarıçapı (km), bbox en büyük alanı (derece²)
+# ve nearby/bbox yanıtındaki en fazla rota sayısı
+NEARBY_MAX_RADIUS_KM = float(os.getenv('NEARBY_MAX_RADIUS_KM', 500))
+BBOX_MAX_AREA_DEG2 = float(os.getenv('BBOX_MAX_AREA_DEG2', 400))
+SPATIAL_MAX_RESULTS = int(os.getenv('SPATIAL_MAX_RESULTS', 200))
+
+# Liste uçlarında .values() tabanlı hızlı serileştirme (plan_go.fast_serializers)
+FAST_SERIALIZERS_ENABLED = os.getenv('FAST_SERIALIZERS_ENABLED', 'True') == 'True'
+
+# İstek ölçümleri (plan_go.metrics): /api/metrics/ ve /api/metrics/prometheus/
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+METRICS_SLOW_REQUEST_MS = int(os.getenv('METRICS_SLOW_REQUEST_MS', 1000))
+METRICS_SQL_SAMPLE_RATE = float(os.getenv('METRICS_SQL_SAMPLE_RATE', 0.1))  # SQL metni toplanan istek oranı
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')  # Prometheus için Bearer token; boşsa yalnızca yönetici
+
+# Rozet kural indeksi diğer süreçlerde en geç bu kadar saniyede yenilenir
+BADGE_RULE_INDEX_TTL = int(os.getenv('BADGE_RULE_INDEX_TTL', 60))
+
+
 LOGIN_REDIRECT_URL = '/'
 LOGIN_URL = 'login'
 
 OLLAMA_API_URL = str(os.getenv('OLLAMA_API_URL', 'http://localhost:11434/api/generate'))
 OLLAMA_MODEL = str(os.getenv('OLLAMA_MODEL', 'md_tr_tunned'))
 OLLAMA_TIMEOUT = int(os.getenv('OLLAMA_TIMEOUT', 60))
+OLLAMA_CONNECT_TIMEOUT = int(os.getenv('OLLAMA_CONNECT_TIMEOUT', 5))
+OLLAMA_POOL_SIZE = int(os.getenv('OLLAMA_POOL_SIZE', 10))
+# ASGI altında süreç başına Ollama'ya açık tutulabilecek bağlantı sayısı
+OLLAMA_ASYNC_MAX_CONNECTIONS = int(os.getenv('OLLAMA_ASYNC_MAX_CONNECTIONS', 200))
+
+# LLM yanıt önbelleği: locmem | django | sqlite | none (ya da sınıf yolu)
+LLM_CACHE_BACKEND = str(os.getenv('LLM_CACHE_BACKEND', 'locmem'))
+LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', 60 * 60 * 24))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 1000))
+LLM_CACHE_OPTIONS = {}  # ör. {'alias': 'default'} veya {'path': BASE_DIR / 'llm_cache.sqlite3'}
+
+# Çok turlu sohbet bağlamı (token tahmini ~4 karakter/token)
+LLM_CONTEXT_TOKEN_BUDGET = int(os.getenv('LLM_CONTEXT_TOKEN_BUDGET', 2048))
+LLM_CONTEXT_MAX_TURNS = int(os.getenv('LLM_CONTEXT_MAX_TURNS', 20))
+LLM_CONTEXT_SUMMARY_BATCH = int(os.getenv('LLM_CONTEXT_SUMMARY_BATCH', 6))
+LLM_CONTEXT_SUMMARY_TOKENS = int(os.getenv('LLM_CONTEXT_SUMMARY_TOKENS', 256))
+
+# LLM istek zamanlayıcısı (süreç başına sınırlar)
+LLM_MAX_IN_FLIGHT = int(os.getenv('LLM_MAX_IN_FLIGHT', 2))
+LLM_MAX_QUEUE_DEPTH = int(os.getenv('LLM_MAX_QUEUE_DEPTH', 32))
+LLM_MAX_QUEUE_PER_USER = int(os.getenv('LLM_MAX_QUEUE_PER_USER', 4))
+LLM_QUEUE_TIMEOUT = int(os.getenv('LLM_QUEUE_TIMEOUT', 30))
+LLM_COALESCE_REQUESTS = os.getenv('LLM_COALESCE_REQUESTS', 'True') == 'True'
 
 # social auth configs for github
 SOCIAL_AUTH_GITHUB_KEY = str(os.getenv('GITHUB_KEY'))
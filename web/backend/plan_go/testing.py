@@ -0,0 +1,37 @@
+# plan_go/testing.py
+
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+@contextmanager
+def assert_max_queries(limit, using=DEFAULT_DB_ALIAS):
+    """
+    Blok içindeki sorgu sayısını sabitler; sınır aşılırsa çalışan SQL'leri
+    listeleyerek AssertionError fırlatır. N+1 gerilemelerini yakalamak için:
+
+        with assert_max_queries(4):
+            client.get('/routes/')
+    """
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+    executed = len(context.captured_queries)
+    if executed > limit:
+        queries = '\n'.join(
+            f'{index}. {query["sql"]}' for index, query in enumerate(context.captured_queries, start=1)
+        )
+        raise AssertionError(f"{executed} sorgu çalıştı, en fazla {limit} bekleniyordu:\n{queries}")
+
+def query_counts(func, sizes, setup, using=DEFAULT_DB_ALIAS):
+    """
+    setup(n) ile n kayıt hazırlayıp func()'ın sorgu sayısını ölçer; {n: sorgu} döner.
+    Sayıların n'den bağımsız kalması O(1) sorgu anlamına gelir.
+    """
+    counts = {}
+    for size in sizes:
+        setup(size)
+        with CaptureQueriesContext(connections[using]) as context:
+            func()
+        counts[size] = len(context.captured_queries)
+    return counts
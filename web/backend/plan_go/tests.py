@@ -0,0 +1,25 @@
+from django.test import SimpleTestCase
+
+from plan_go.benchmark import compare
+
+class BenchmarkCompareTests(SimpleTestCase):
+
+    def test_skipped_flow_is_regression_when_baseline_measured_it(self):
+        baseline = {
+            'route_list': {'median_ms': 10.0, 'queries': 3},
+            'llm_interaction': {'median_ms': 50.0, 'queries': 1},
+        }
+        results = {
+            'route_list': {'median_ms': 10.5, 'queries': 3},
+            'llm_interaction': {'skipped': "'llm' uygulaması INSTALLED_APPS içinde değil"},
+        }
+        comparison, regressions = compare(results, baseline)
+        self.assertEqual(regressions, ['llm_interaction'])
+        self.assertEqual(comparison['route_list']['status'], 'ok')
+        self.assertEqual(comparison['llm_interaction']['status'], 'skipped')
+        self.assertEqual(comparison['llm_interaction']['baseline_median_ms'], 50.0)
+
+    def test_skipped_flow_without_baseline_is_reported(self):
+        comparison, regressions = compare({'llm_interaction': {'skipped': 'yok'}}, {})
+        self.assertEqual(regressions, [])
+        self.assertEqual(comparison['llm_interaction'], {'status': 'skipped', 'reason': 'yok'})
@@ -0,0 +1,62 @@
+# plan_go/tracking.py
+
+import copy
+
+from django.db.models.fields.files import FieldFile
+
+class FieldTrackerMixin:
+    """
+    Veritabanından yüklenen alan değerlerinin anlık görüntüsünü from_db anında alır.
+    Sinyallerde eski değeri öğrenmek için ek SELECT yapmaya gerek kalmaz.
+    Takip edilecek alanlar modelde `tracked_fields` ile belirtilir.
+    """
+    tracked_fields = ()
+
+    @staticmethod
+    def _normalize(value):
+        # Dosya alanlarında adı, değiştirilebilir değerlerde kopyayı sakla
+        if isinstance(value, FieldFile):
+            return value.name or ''
+        if isinstance(value, (dict, list)):
+            return copy.deepcopy(value)
+        return value
+
+    def _take_snapshot(self, fields=None):
+        deferred = self.get_deferred_fields()
+        snapshot = {
+            name: self._normalize(getattr(self, name))
+            for name in self.tracked_fields
+            if name not in deferred and (fields is None or name in fields)
+        }
+        if fields is None:
+            self._loaded_values = snapshot
+        else:
+            self._loaded_values = {**getattr(self, '_loaded_values', {}), **snapshot}
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._take_snapshot()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._take_snapshot(fields)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # post_save sinyalleri eski görüntüyü gördükten sonra güncelle
+        self._take_snapshot()
+
+    def get_loaded_value(self, name, default=None):
+        """Alanın son yüklenen/kaydedilen değeri; bilinmiyorsa default."""
+        return getattr(self, '_loaded_values', {}).get(name, default)
+
+    def has_changed(self, name):
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None or name not in loaded:
+            return True  # Yeni kayıt veya yüklenmemiş alan
+        return self._normalize(getattr(self, name)) != loaded[name]
+
+    def changed_fields(self):
+        return [name for name in self.tracked_fields if self.has_changed(name)]
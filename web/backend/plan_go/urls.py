@@ -4,10 +4,15 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .views import MetricsReportView, PrometheusMetricsView
 
 urlpatterns = [
+    path('api/metrics/', MetricsReportView.as_view(), name='metrics-report'),
+    path('api/metrics/prometheus/', PrometheusMetricsView.as_view(), name='metrics-prometheus'),
     path('admin/', admin.site.urls),
     path('', include('users.urls')),
     path('', include('routes.urls')),
     path('', include('badges.urls')),
+    path('', include('llm.urls')),
+    path('', include('notifications.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
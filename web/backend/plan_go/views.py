@@ -0,0 +1,82 @@
+# plan_go/views.py
+
+import hmac
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.authentication import BaseAuthentication, SessionAuthentication
+from rest_framework.permissions import BasePermission, IsAdminUser
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from .metrics import _labels, registry
+
+def llm_cache_stats():
+    """LLM yanıt önbelleğinin isabet/ıska sayaçları (süreç başından beri); llm kurulu değilse None."""
+    if not apps.is_installed('llm'):
+        return None
+    from llm.cache import response_cache
+    return response_cache.stats()
+
+def llm_cache_prometheus(stats, prefix='plan_go'):
+    labels = _labels(backend=stats['backend'])
+    lines = []
+    for name, description in (('hits', 'LLM önbellek isabetleri'), ('misses', 'LLM önbellek ıskaları')):
+        metric = f'{prefix}_llm_cache_{name}_total'
+        lines += [f'# HELP {metric} {description}', f'# TYPE {metric} counter', f'{metric}{{{labels}}} {stats[name]}']
+    return '\n'.join(lines) + '\n'
+
+class MetricsTokenAuthentication(BaseAuthentication):
+    """Prometheus kazıyıcısı için `Authorization: Bearer <METRICS_TOKEN>`."""
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        token = getattr(settings, 'METRICS_TOKEN', '')
+        header = request.META.get('HTTP_AUTHORIZATION', '').split()
+        if not token or len(header) != 2 or header[0] != self.keyword:
+            return None
+        if not hmac.compare_digest(header[1].encode(), token.encode()):
+            return None  # JWT doğrulamasına bırakılır
+        return AnonymousUser(), 'metrics-token'
+
+    def authenticate_header(self, request):
+        return self.keyword
+
+class IsAdminOrMetricsToken(BasePermission):
+    def has_permission(self, request, view):
+        return request.auth == 'metrics-token' or bool(request.user and request.user.is_staff)
+
+class MetricsReportView(APIView):
+    """
+    Uç başına istek, sorgu, serileştirme, Ollama ve yanıt boyutu özetleri ile
+    LLM önbellek isabet oranı (yalnızca yönetici). DELETE uç sayaçlarını sıfırlar.
+    """
+    authentication_classes = [*api_settings.DEFAULT_AUTHENTICATION_CLASSES, SessionAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        report = registry.report()
+        stats = llm_cache_stats()
+        if stats is not None:
+            report['llm_cache'] = stats
+        return Response(report)
+
+    def delete(self, request):
+        registry.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class PrometheusMetricsView(APIView):
+    """Aynı histogramların Prometheus metin biçimi."""
+    authentication_classes = [MetricsTokenAuthentication, *api_settings.DEFAULT_AUTHENTICATION_CLASSES, SessionAuthentication]
+    permission_classes = [IsAdminOrMetricsToken]
+
+    def get(self, request):
+        body = registry.prometheus()
+        stats = llm_cache_stats()
+        if stats is not None:
+            body += llm_cache_prometheus(stats)
+        return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
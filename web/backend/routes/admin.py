@@ -14,7 +14,8 @@ class WaypointInline(admin.TabularInline):
 class RouteAdmin(admin.ModelAdmin):
     list_display = ('title', 'user', 'share_token_short', 'is_shared', 'created_at', 'qr_code_preview')
     list_filter = ('is_shared', 'user', 'created_at')
-    search_fields = ('title', 'start_point', 'destination', 'share_token')
+    list_select_related = ('user',)  # Route.__str__ ve user sütunu için
+    search_fields = ('title', 'share_token')
     filter_horizontal = ('collaborators',)
     readonly_fields = ('share_token', 'qr_code_preview')
     inlines = [WaypointInline]
@@ -29,19 +29,170 @@
 
 # routes/fields.py
 
+import re
+import struct
+
 from django.db import models
-from django.contrib.gis.geos import GEOSGeometry
 from django.core.exceptions import ValidationError
 
+from .spatial import GEOHASH_PRECISION, encode_geohash
+
+_POINT_STRUCT = struct.Struct('<dd')  # (longitude, latitude) float64 çifti
+_POINT_WKT_RE = re.compile(
+    r'^\s*(?:SRID=\d+;\s*)?POINT\s*\(\s*([-+0-9.eE]+)\s+([-+0-9.eE]+)\s*\)\s*$',
+    re.IGNORECASE
+)
+
+def parse_point_wkt(value):
+    """'POINT(longitude latitude)' WKT'sini GEOS'a gitmeden (x, y) çiftine çevirir."""
+    match = _POINT_WKT_RE.match(value)
+    if not match:
+        raise ValueError(f"Geçersiz POINT WKT: {value!r}")
+    return float(match.group(1)), float(match.group(2))
+
+class LazyPoint:
+    """
+    (longitude, latitude) çiftini tutan hafif nokta.
+    GEOS nesnesi yalnızca uzamsal bir işlem istendiğinde oluşturulur.
+    """
+    __slots__ = ('x', 'y', '_geos')
+
+    def __init__(self, x, y):
+        self.x = float(x)
+        self.y = float(y)
+        self._geos = None
+
+    @classmethod
+    def from_bytes(cls, value):
+        return cls(*_POINT_STRUCT.unpack(value))
+
+    @classmethod
+    def from_wkt(cls, value):
+        return cls(*parse_point_wkt(value))
+
+    @classmethod
+    def coerce(cls, value):
+        """Desteklenen her girdiyi (WKT, bayt, GEOS Point, (x, y)) LazyPoint'e çevirir."""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return cls.from_bytes(value)
+        if isinstance(value, str):
+            return cls.from_wkt(value)
+        if isinstance(value, (tuple, list)):
+            return cls(*value)
+        if hasattr(value, 'x') and hasattr(value, 'y'):
+            return cls(value.x, value.y)
+        raise TypeError(f"Nokta değerine çevrilemiyor: {type(value).__name__}")
+
+    @property
+    def coords(self):
+        return (self.x, self.y)
+
+    @property
+    def wkt(self):
+        return f"POINT ({self.x!r} {self.y!r})"
+
+    @property
+    def geos(self):
+        """Uzamsal işlemler (distance, buffer, ...) için GEOS Point'i ilk erişimde oluşturur."""
+        if self._geos is None:
+            from django.contrib.gis.geos import Point
+            self._geos = Point(self.x, self.y)
+        return self._geos
+
+    def to_bytes(self):
+        return _POINT_STRUCT.pack(self.x, self.y)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyPoint):
+            return self.coords == other.coords
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.coords)
+
+    def __str__(self):
+        return self.wkt
+
+    def __repr__(self):
+        return f"<LazyPoint {self.wkt}>"
+
+class PackedPointField(models.Field):
+    """
+    Noktaları 16 baytlık (longitude, latitude) float64 çifti olarak saklayan alan.
+    Okumada WKT/GEOS ayrıştırması yapılmaz; değer LazyPoint olarak döner.
+    """
+    description = "Paketlenmiş (longitude, latitude) noktası"
+
+    def get_internal_type(self):
+        return 'BinaryField'
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return LazyPoint.from_bytes(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, LazyPoint):
+            return value
+        try:
+            return LazyPoint.coerce(value)
+        except (ValueError, TypeError, struct.error):
+            raise ValidationError("Geçersiz geometri formatı")
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if value is None:
+            return value
+        return self.to_python(value).to_bytes()
+
+    def value_to_string(self, obj):
+        value = self.value_from_object(obj)
+        return None if value is None else value.wkt
+
+class GeohashField(models.CharField):
+    """
+    source alanındaki noktanın geohash'ini tutan indeksli alan.
+    Değer her kayıtta (bulk_create dahil) pre_save ile yeniden hesaplanır.
+    """
+
+    def __init__(self, *args, source=None, precision=GEOHASH_PRECISION, **kwargs):
+        self.source = source
+        self.precision = precision
+        kwargs.setdefault('max_length', precision)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('db_index', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        if self.precision != GEOHASH_PRECISION:
+            kwargs['precision'] = self.precision
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        point = getattr(model_instance, self.source)
+        value = ''
+        if point is not None:
+            point = LazyPoint.coerce(point)
+            value = encode_geohash(point.x, point.y, self.precision)
+        setattr(model_instance, self.attname, value)
+        return value
+
 class WKTGeometryField(models.TextField):
     """Coğrafi verileri WKT formatında saklayan özel alan."""
     
     def from_db_value(self, value, expression, connection):
+        from django.contrib.gis.geos import GEOSGeometry
         if value is None:
             return value
         return GEOSGeometry(value)  # WKT → GEOSGeometry
     
     def to_python(self, value):
+        from django.contrib.gis.geos import GEOSGeometry
         if isinstance(value, GEOSGeometry):
             return value
         if value is None:
@@ -0,0 +1,141 @@
+# routes/itinerary.py
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+from django.db.models import ExpressionWrapper, F
+
+from .shared_cache import route_stamp
+from .spatial import EARTH_RADIUS_KM
+
+SPEED_PROFILES = {
+    'walking': 5.0,   # km/sa
+    'cycling': 15.0,
+    'driving': 60.0,
+}
+DEFAULT_PROFILE = 'driving'
+MAX_SPEED_KMH = 1000.0      # Uçak hızının üstü anlamsız
+MAX_STOP_MINUTES = 24 * 60  # Durak başına en fazla bir gün mola
+
+def haversine_legs(coords):
+    """(N, 2) derece cinsinden (lng, lat) dizisi için ardışık N-1 bacağın uzunluğu (km)."""
+    radians = np.radians(coords)
+    lng, lat = radians[:, 0], radians[:, 1]
+    a = (
+        np.sin(np.diff(lat) / 2) ** 2
+        + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lng) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def compute_schedule(coords, speed_kmh, departure, stop_seconds=0.0, planned=None):
+    """
+    Bacak mesafelerini, kümülatif mesafeyi ve her noktaya varış zamanını hesaplar.
+    departure ve planned epoch saniyesidir; planned[i] NaN değilse o duraktan
+    planlanan saatten önce ayrılınmaz. Ara duraklarda stop_seconds kadar beklenir.
+    Döngü yoktur: bekleme etkisi maximum.accumulate ile yayılır.
+    """
+    n = len(coords)
+    legs = haversine_legs(coords)
+    cumulative = np.concatenate(([0.0], np.cumsum(legs)))
+
+    # Bekleme olmadan i. noktaya varış ofseti: yol süresi + önceki ara duraklardaki mola
+    base = np.concatenate(([0.0], np.cumsum(legs / speed_kmh * 3600.0)))
+    base += stop_seconds * np.maximum(np.arange(n) - 1, 0)
+
+    slack = np.full(n, -np.inf)
+    if planned is not None:
+        slack = np.where(np.isnan(planned), -np.inf, planned - base)
+    slack[0] = departure
+    # A_i = base_i + max(kalkış, önceki durakların plan - base farkı)
+    shift = np.maximum.accumulate(slack)
+    arrival = base + np.concatenate(([departure], shift[:-1]))
+    wait = np.zeros(n) if planned is None else np.nan_to_num(np.maximum(planned - arrival, 0.0))
+    return legs, cumulative, arrival, wait
+
+def _isoformat(timestamps):
+    return np.datetime_as_string((timestamps * 1000).astype('datetime64[ms]'), unit='s', timezone='UTC')
+
+def raw_location():
+    """Konum sütununu LazyPoint'e çevirmeden ham '<dd' baytları olarak okur."""
+    return ExpressionWrapper(F('location'), output_field=models.BinaryField())
+
+def coords_from_bytes(values):
+    """Ham konum baytlarını tek seferde (N, 2) (lng, lat) dizisine çevirir."""
+    return np.frombuffer(b''.join(bytes(value) for value in values), dtype='<f8').reshape(-1, 2)
+
+def load_waypoints(route, *fields):
+    """
+    Rotanın duraklarını sıralı olarak (satırlar, (N, 2) koordinat dizisi) döndürür.
+    Konumlar LazyPoint'e çevrilmeden ham '<dd' baytlarıyla okunup tek seferde
+    NumPy dizisine dönüştürülür; satır başına nesne üretme maliyeti olmaz.
+    """
+    rows = list(
+        route.waypoints.order_by('order')
+        .annotate(raw_location=raw_location())
+        .values_list(*fields, 'raw_location')
+    )
+    return [row[:-1] for row in rows], coords_from_bytes(row[-1] for row in rows)
+
+def route_coords(route, waypoint_coords):
+    """start_point + duraklar + destination koordinatlarını tek dizide birleştirir."""
+    return np.vstack((route.start_point.coords, waypoint_coords.reshape(-1, 2), route.destination.coords))
+
+def build_itinerary(route, speed_kmh, stop_seconds=0.0):
+    """start_point → sıralı duraklar → destination için güzergâh özetini üretir."""
+    waypoints, waypoint_coords = load_waypoints(route, 'id', 'order', 'name', 'arrival_time')
+    coords = route_coords(route, waypoint_coords)
+    planned = np.full(len(coords), np.nan)
+    for index, (_, _, _, arrival_time) in enumerate(waypoints, start=1):
+        if arrival_time is not None:
+            planned[index] = arrival_time.timestamp()
+
+    departure = route.start_date.timestamp()
+    legs, cumulative, arrival, wait = compute_schedule(coords, speed_kmh, departure, stop_seconds, planned)
+
+    leg_km = np.concatenate(([0.0], legs)).round(3).tolist()
+    cumulative_km = cumulative.round(3).tolist()
+    etas = _isoformat(arrival).tolist()
+    waits = wait.round().astype(int).tolist()
+
+    points = [{'type': 'start', 'leg_km': 0.0, 'cumulative_km': 0.0, 'eta': etas[0]}]
+    for index, (waypoint_id, order, name, _) in enumerate(waypoints, start=1):
+        points.append({
+            'type': 'waypoint',
+            'id': waypoint_id,
+            'order': order,
+            'name': name,
+            'leg_km': leg_km[index],
+            'cumulative_km': cumulative_km[index],
+            'eta': etas[index],
+            'wait_s': waits[index],
+        })
+    points.append({'type': 'destination', 'leg_km': leg_km[-1], 'cumulative_km': cumulative_km[-1], 'eta': etas[-1]})
+
+    return {
+        'route': route.pk,
+        'version': route.version,
+        'speed_kmh': speed_kmh,
+        'stop_minutes': stop_seconds / 60,
+        'total_distance_km': cumulative_km[-1],
+        'total_duration_s': int(round(arrival[-1] - departure)),
+        'departure': etas[0],
+        'arrival': etas[-1],
+        'points': points,
+    }
+
+def itinerary_cache_key(route, speed_kmh, stop_seconds):
+    return f'route-itinerary:{route.pk}:{route.version}:{route_stamp(route)}:{speed_kmh:g}:{stop_seconds:g}'
+
+def get_itinerary(route, speed_kmh, stop_seconds=0.0):
+    """
+    Önbellekten (rota, versiyon, last_updated, hız, mola) anahtarıyla döndürür.
+    Versiyonu artırmayan değişiklikler (admin kaydı, tekil Waypoint.save())
+    last_updated'ı ilerlettiğinden eski kayıt yine kendiliğinden geçersizleşir.
+    """
+    key = itinerary_cache_key(route, speed_kmh, stop_seconds)
+    itinerary = cache.get(key)
+    if itinerary is None:
+        itinerary = build_itinerary(route, speed_kmh, stop_seconds)
+        cache.set(key, itinerary, getattr(settings, 'ITINERARY_CACHE_TTL', 60 * 60 * 24))
+    return itinerary
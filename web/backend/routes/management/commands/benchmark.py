@@ -0,0 +1,88 @@
+# routes/management/commands/benchmark.py
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from plan_go.benchmark import BENCHMARK_SETTINGS, BenchmarkSuite, compare
+
+class Command(BaseCommand):
+    help = (
+        "Sentetik kullanıcı, rota, aktivite ve rozet verisiyle sıcak yolları ölçer. "
+        "Veri geçici bir test veritabanına yazılır; sonuçlar JSON olarak döner ve "
+        "--baseline verilirse gerileyen akışlarda komut hata koduyla biter."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5)
+        parser.add_argument('--routes', type=int, default=20, help="Kullanıcı başına rota")
+        parser.add_argument('--waypoints', type=int, default=25, help="Rota başına durak")
+        parser.add_argument('--collaborators', type=int, default=3, help="Rota başına işbirlikçi")
+        parser.add_argument('--activities', type=int, default=200, help="Kullanıcı başına aktivite")
+        parser.add_argument('--badges', type=int, default=20)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--flows', help=f"Virgülle ayrılmış akışlar: {', '.join(BenchmarkSuite.FLOWS)}")
+        parser.add_argument('--output', help="Sonuç JSON dosyası (varsayılan: stdout)")
+        parser.add_argument('--baseline', help="Karşılaştırılacak önceki sonuç JSON dosyası")
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help="Medyan sürede gerileme sayılan artış oranı (0.25 = %%25)")
+
+    def handle(self, *args, **options):
+        flows = options['flows'].split(',') if options['flows'] else None
+        unknown = set(flows or ()) - set(BenchmarkSuite.FLOWS)
+        if unknown:
+            raise CommandError(f"Bilinmeyen akış: {', '.join(sorted(unknown))}")
+        if options['iterations'] < 1:
+            raise CommandError("--iterations en az 1 olmalıdır")
+
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline'], encoding='utf-8') as file:
+                    baseline = json.load(file)['results']
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"Baseline okunamadı: {e}")
+
+        suite = BenchmarkSuite(**{
+            name: options[name]
+            for name in ('users', 'routes', 'waypoints', 'collaborators', 'activities',
+                         'badges', 'iterations', 'warmup', 'seed')
+        })
+
+        # Geliştirme veritabanına dokunulmaz: test çalıştırıcısı gibi geçici veritabanı kurulur
+        old_name = connection.settings_dict['NAME']
+        with override_settings(**BENCHMARK_SETTINGS):
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                self.stderr.write("Veri hazırlanıyor...")
+                suite.seed()
+                self.stderr.write("Akışlar ölçülüyor...")
+                results = suite.run(flows)
+                report = {'meta': suite.describe(), 'results': results}
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        regressions = []
+        if baseline is not None:
+            report['comparison'], regressions = compare(results, baseline, options['threshold'])
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Sonuçlar {options['output']} dosyasına yazıldı."))
+        else:
+            self.stdout.write(output)
+
+        for name, result in results.items():
+            if 'skipped' in result:
+                self.stderr.write(f"{name:<22} atlandı: {result['skipped']}")
+            else:
+                self.stderr.write(f"{name:<22} medyan {result['median_ms']:>9.2f}ms  p95 {result['p95_ms']:>9.2f}ms  {result['queries']:>3} sorgu")
+
+        if regressions:
+            raise CommandError(f"Gerileme: {', '.join(regressions)}")
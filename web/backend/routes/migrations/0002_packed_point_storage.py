@@ -0,0 +1,128 @@
+# routes/migrations/0002_packed_point_storage.py
+
+import routes.fields
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+def pack_points(apps, schema_editor):
+    """Mevcut WKT metinlerini GEOS kullanmadan paketlenmiş noktalara çevirir."""
+    Route = apps.get_model('routes', 'Route')
+    Waypoint = apps.get_model('routes', 'Waypoint')
+    LazyPoint = routes.fields.LazyPoint
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'SELECT id, start_point, destination FROM {Route._meta.db_table}')
+        routes_ = [
+            Route(pk=pk, start_point_packed=LazyPoint.from_wkt(start), destination_packed=LazyPoint.from_wkt(dest))
+            for pk, start, dest in cursor.fetchall()
+        ]
+        cursor.execute(f'SELECT id, location FROM {Waypoint._meta.db_table}')
+        waypoints = [
+            Waypoint(pk=pk, location_packed=LazyPoint.from_wkt(location))
+            for pk, location in cursor.fetchall()
+        ]
+
+    Route.objects.bulk_update(routes_, ['start_point_packed', 'destination_packed'], batch_size=BATCH_SIZE)
+    Waypoint.objects.bulk_update(waypoints, ['location_packed'], batch_size=BATCH_SIZE)
+
+def unpack_points(apps, schema_editor):
+    """Paketlenmiş noktaları tekrar WKT metnine yazar."""
+    Route = apps.get_model('routes', 'Route')
+    Waypoint = apps.get_model('routes', 'Waypoint')
+
+    routes_ = [
+        Route(pk=pk, start_point=start.wkt, destination=dest.wkt)
+        for pk, start, dest in Route.objects.values_list('pk', 'start_point_packed', 'destination_packed')
+    ]
+    waypoints = [
+        Waypoint(pk=pk, location=location.wkt)
+        for pk, location in Waypoint.objects.values_list('pk', 'location_packed')
+    ]
+
+    Route.objects.bulk_update(routes_, ['start_point', 'destination'], batch_size=BATCH_SIZE)
+    Waypoint.objects.bulk_update(waypoints, ['location'], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='route',
+            name='start_point_packed',
+            field=routes.fields.PackedPointField(null=True),
+        ),
+        migrations.AddField(
+            model_name='route',
+            name='destination_packed',
+            field=routes.fields.PackedPointField(null=True),
+        ),
+        migrations.AddField(
+            model_name='waypoint',
+            name='location_packed',
+            field=routes.fields.PackedPointField(null=True),
+        ),
+        # Geri alırken WKT sütunları boş eklenip unpack_points ile doldurulabilsin
+        migrations.AlterField(
+            model_name='route',
+            name='start_point',
+            field=routes.fields.WKTGeometryField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='route',
+            name='destination',
+            field=routes.fields.WKTGeometryField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='waypoint',
+            name='location',
+            field=routes.fields.WKTGeometryField(null=True),
+        ),
+        migrations.RunPython(pack_points, unpack_points),
+        migrations.RemoveField(
+            model_name='route',
+            name='start_point',
+        ),
+        migrations.RemoveField(
+            model_name='route',
+            name='destination',
+        ),
+        migrations.RemoveField(
+            model_name='waypoint',
+            name='location',
+        ),
+        migrations.RenameField(
+            model_name='route',
+            old_name='start_point_packed',
+            new_name='start_point',
+        ),
+        migrations.RenameField(
+            model_name='route',
+            old_name='destination_packed',
+            new_name='destination',
+        ),
+        migrations.RenameField(
+            model_name='waypoint',
+            old_name='location_packed',
+            new_name='location',
+        ),
+        migrations.AlterField(
+            model_name='route',
+            name='start_point',
+            field=routes.fields.PackedPointField(),
+        ),
+        migrations.AlterField(
+            model_name='route',
+            name='destination',
+            field=routes.fields.PackedPointField(),
+        ),
+        migrations.AlterField(
+            model_name='waypoint',
+            name='location',
+            field=routes.fields.PackedPointField(),
+        ),
+    ]
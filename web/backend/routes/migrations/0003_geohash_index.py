@@ -0,0 +1,50 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:07
+
+import routes.fields
+import routes.spatial
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+def fill_geohashes(apps, schema_editor):
+    """Mevcut rota ve duraklar için geohash değerlerini hesaplar."""
+    Route = apps.get_model('routes', 'Route')
+    Waypoint = apps.get_model('routes', 'Waypoint')
+    encode = routes.spatial.encode_geohash
+
+    routes_ = list(Route.objects.only('start_point', 'destination'))
+    for route in routes_:
+        route.start_geohash = encode(route.start_point.x, route.start_point.y)
+        route.destination_geohash = encode(route.destination.x, route.destination.y)
+    Route.objects.bulk_update(routes_, ['start_geohash', 'destination_geohash'], batch_size=BATCH_SIZE)
+
+    waypoints = list(Waypoint.objects.only('location'))
+    for waypoint in waypoints:
+        waypoint.geohash = encode(waypoint.location.x, waypoint.location.y)
+    Waypoint.objects.bulk_update(waypoints, ['geohash'], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0002_packed_point_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='route',
+            name='destination_geohash',
+            field=routes.fields.GeohashField(blank=True, db_index=True, editable=False, max_length=12, source='destination'),
+        ),
+        migrations.AddField(
+            model_name='route',
+            name='start_geohash',
+            field=routes.fields.GeohashField(blank=True, db_index=True, editable=False, max_length=12, source='start_point'),
+        ),
+        migrations.AddField(
+            model_name='waypoint',
+            name='geohash',
+            field=routes.fields.GeohashField(blank=True, db_index=True, editable=False, max_length=12, source='location'),
+        ),
+        migrations.RunPython(fill_geohashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+def fill_route_access(apps, schema_editor):
+    """Mevcut sahip ve işbirlikçiler için erişim kayıtlarını oluşturur."""
+    Route = apps.get_model('routes', 'Route')
+    RouteAccess = apps.get_model('routes', 'RouteAccess')
+    Collaborator = Route.collaborators.through
+
+    entries = [
+        RouteAccess(route_id=route_id, user_id=user_id, role='owner')
+        for route_id, user_id in Route.objects.values_list('pk', 'user_id')
+    ]
+    entries += [
+        RouteAccess(route_id=route_id, user_id=user_id, role='collaborator')
+        for route_id, user_id in Collaborator.objects.values_list('route_id', 'user_id')
+    ]
+    # Sahip aynı zamanda işbirlikçiyse sahip kaydı önce geldiği için korunur
+    RouteAccess.objects.bulk_create(entries, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0003_geohash_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RouteAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('owner', 'Sahip'), ('collaborator', 'İşbirlikçi')], max_length=20)),
+                ('route', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='access_entries', to='routes.route')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='route_access', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('route', 'user')},
+            },
+        ),
+        migrations.RunPython(fill_route_access, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-18 18:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('routes', '0004_route_access'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='route',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='routes_rout_user_id_125dca_idx'),
+        ),
+    ]
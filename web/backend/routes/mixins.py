@@ -1,7 +1,7 @@
 # routes/mixins.py
 
-from django.db.models import Q  
 from rest_framework import mixins, viewsets
+from .models import RouteAccess
 from .permissions import IsRouteOwnerOrReadOnly, IsCollaboratorOrOwner
 
 class OwnerEditMixin:
@@ -21,7 +21,5 @@ class CollaborativeEditMixin(viewsets.GenericViewSet):
     permission_classes = [IsCollaboratorOrOwner]
 
     def get_queryset(self):
-        return super().get_queryset().filter(
-            Q(user=self.request.user) | 
-            Q(collaborators__in=[self.request.user])
-        ).distinct()
\ No newline at end of file
+        # JOIN + distinct yerine RouteAccess üzerinde indeksli EXISTS
+        return super().get_queryset().filter(RouteAccess.exists_for(self.request.user))
\ No newline at end of file
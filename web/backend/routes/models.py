@@ -1,18 +1,23 @@
 # routes/models.py
 
-from django.contrib.gis.db import models
+from django.db import models
 from django.contrib.auth import get_user_model
 from django.urls import reverse
-from .fields import WKTGeometryField
+from .fields import GeohashField, PackedPointField
+from plan_go.tracking import FieldTrackerMixin
 import uuid
 
 User = get_user_model()
 
-class Route(models.Model):
+class Route(FieldTrackerMixin, models.Model):
+    tracked_fields = ('share_token', 'title', 'version', 'user_id')
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='routes')
     title = models.CharField(max_length=255)
-    start_point = WKTGeometryField()  # Coğrafi veri için PointField
-    destination = WKTGeometryField()  # Coğrafi veri için PointField
+    start_point = PackedPointField()  # (longitude, latitude) float64 çifti
+    destination = PackedPointField()  # (longitude, latitude) float64 çifti
+    start_geohash = GeohashField(source='start_point')  # Uzamsal indeks
+    destination_geohash = GeohashField(source='destination')
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
     is_shared = models.BooleanField(default=False)
@@ -24,15 +29,9 @@ class Route(models.Model):
     version = models.PositiveIntegerField(default=0)  # Versiyon kontrol için
 
     def generate_qr_code(self):
-        """QR kod oluşturma işlevselliğini modele taşıma"""
-        import qrcode
-        from io import BytesIO
-        from django.core.files import File
-        
-        qr = qrcode.make(self.share_link)
-        buffer = BytesIO()
-        qr.save(buffer)
-        self.qr_code.save(f'qr_{self.share_token}.png', File(buffer))
+        """QR kodu arka planda üretilmek üzere kuyruğa alır"""
+        from .qr import schedule_qr_code
+        schedule_qr_code(self)
 
     @property
     def share_link(self):
@@ -46,6 +45,7 @@ class Route(models.Model):
             models.Index(fields=['share_token']),
             models.Index(fields=['is_shared']),
             models.Index(fields=['version']),  # Yeni indeks
+            models.Index(fields=['user', 'created_at', 'id']),  # Keyset sayfalama
         ]
         ordering = ['-created_at']
 
@@ -53,7 +53,8 @@ class Waypoint(models.Model):
     route = models.ForeignKey(Route, related_name='waypoints', on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
     order = models.PositiveIntegerField()
-    location = WKTGeometryField()  # Coğrafi veri için PointField
+    location = PackedPointField()  # (longitude, latitude) float64 çifti
+    geohash = GeohashField(source='location')  # Uzamsal indeks
     arrival_time = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
@@ -61,4 +62,31 @@ class Waypoint(models.Model):
 
     class Meta:
         unique_together = ['route', 'order']
-        ordering = ['order']
\ No newline at end of file
+        ordering = ['order']
+class RouteAccess(models.Model):
+    """
+    Rota erişim haklarının denormalize edilmiş tablosu.
+    Sahip ve işbirlikçiler sinyallerle senkron tutulur; yetki kontrolü tek bir
+    indeksli EXISTS sorgusuna iner.
+    """
+    OWNER = 'owner'
+    COLLABORATOR = 'collaborator'
+    ROLE_CHOICES = [
+        (OWNER, 'Sahip'),
+        (COLLABORATOR, 'İşbirlikçi'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='route_access')
+    route = models.ForeignKey(Route, on_delete=models.CASCADE, related_name='access_entries')
+    role = models.CharField(max_length=20, choices=ROLE_CHOICES)
+
+    @classmethod
+    def exists_for(cls, user, route=models.OuterRef('pk')):
+        """Kullanıcının rotaya erişimi olup olmadığını veren EXISTS ifadesi."""
+        return models.Exists(cls.objects.filter(route=route, user=user))
+
+    def __str__(self):
+        return f"{self.user} → {self.route_id} ({self.role})"
+
+    class Meta:
+        unique_together = ['route', 'user']
@@ -0,0 +1,134 @@
+# routes/optimization.py
+
+import time
+
+import numpy as np
+
+from .itinerary import haversine_legs, load_waypoints, route_coords
+from .spatial import EARTH_RADIUS_KM
+
+MAX_OPTIMIZE_WAYPOINTS = 2000  # Mesafe matrisi ~32 MB
+DEFAULT_TIME_BUDGET_MS = 500
+MAX_TIME_BUDGET_MS = 5000
+EPSILON = 1e-9
+
+def distance_matrix(coords):
+    """(N, 2) (lng, lat) dizisi için tüm çiftler arası haversine mesafesi (km)."""
+    radians = np.radians(coords)
+    lng, lat = radians[:, 0], radians[:, 1]
+    a = (
+        np.sin((lat[:, None] - lat[None, :]) / 2) ** 2
+        + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin((lng[:, None] - lng[None, :]) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def path_length(path, matrix):
+    return float(matrix[path[:-1], path[1:]].sum())
+
+def nearest_neighbour(matrix):
+    """0 (başlangıç) ve son indeks (varış) sabit; aradakileri en yakın komşu sırasıyla dizer."""
+    n = len(matrix)
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[[0, n - 1]] = False
+    path = [0]
+    for _ in range(n - 2):
+        row = np.where(unvisited, matrix[path[-1]], np.inf)
+        nxt = int(np.argmin(row))
+        unvisited[nxt] = False
+        path.append(nxt)
+    path.append(n - 1)
+    return np.array(path)
+
+def two_opt(path, matrix, deadline):
+    """Kesişen kenarları ters çevirerek çözer; her i için tüm j'ler tek vektör işlemde denenir."""
+    n = len(path)
+    improved = False
+    for i in range(1, n - 2):
+        if time.monotonic() >= deadline:
+            break
+        js = np.arange(i + 1, n - 1)
+        a, b = path[i - 1], path[i]
+        c, d = path[js], path[js + 1]
+        delta = matrix[a, c] + matrix[b, d] - matrix[a, b] - matrix[c, d]
+        k = int(np.argmin(delta))
+        if delta[k] < -EPSILON:
+            j = js[k]
+            path[i:j + 1] = path[i:j + 1][::-1].copy()
+            improved = True
+    return improved
+
+def or_opt(path, matrix, deadline, max_segment=3):
+    """1-3 duraklık parçaları (gerekirse ters çevirerek) yolun en ucuz yerine taşır."""
+    improved = False
+    for length in range(1, max_segment + 1):
+        i = 1
+        while i + length <= len(path) - 1:
+            if time.monotonic() >= deadline:
+                return improved
+            segment = path[i:i + length]
+            first, last = segment[0], segment[-1]
+            before, after = path[i - 1], path[i + length]
+            removal_gain = matrix[before, first] + matrix[last, after] - matrix[before, after]
+
+            rest = np.concatenate((path[:i], path[i + length:]))
+            u, v = rest[:-1], rest[1:]
+            forward = matrix[u, first] + matrix[last, v] - matrix[u, v]
+            backward = matrix[u, last] + matrix[first, v] - matrix[u, v]
+            j_forward, j_backward = int(np.argmin(forward)), int(np.argmin(backward))
+            if forward[j_forward] <= backward[j_backward]:
+                j, cost, piece = j_forward, forward[j_forward], segment
+            else:
+                j, cost, piece = j_backward, backward[j_backward], segment[::-1]
+
+            if cost - removal_gain < -EPSILON:
+                path[:] = np.concatenate((rest[:j + 1], piece, rest[j + 1:]))
+                improved = True
+            i += 1
+    return improved
+
+def optimize_order(coords, time_budget_ms=DEFAULT_TIME_BUDGET_MS):
+    """
+    coords[0] başlangıç, coords[-1] varış; aradakilerin toplam mesafeyi en aza
+    indiren sırasını döndürür: (ara nokta indeksleri, önceki km, yeni km, tur sayısı).
+    En yakın komşu ile başlar, süre bitene ya da iyileşme kalmayana kadar
+    2-opt ve Or-opt turlarını dönüşümlü uygular.
+    """
+    deadline = time.monotonic() + time_budget_ms / 1000
+    matrix = distance_matrix(coords)
+    original = np.arange(len(coords))
+    before = path_length(original, matrix)
+
+    path = nearest_neighbour(matrix)
+    rounds = 0
+    while time.monotonic() < deadline:
+        rounds += 1
+        if not (two_opt(path, matrix, deadline) | or_opt(path, matrix, deadline)):
+            break
+
+    after = path_length(path, matrix)
+    if after >= before - EPSILON:
+        path, after = original, before  # Mevcut sıra zaten daha iyi
+    return path[1:-1] - 1, before, after, rounds
+
+def optimize_route(route, time_budget_ms=DEFAULT_TIME_BUDGET_MS):
+    """Rotanın duraklarını yeni sırasıyla (id, order, name satırları) ve özet bilgiyle döndürür."""
+    waypoints, waypoint_coords = load_waypoints(route, 'id', 'order', 'name')
+    if len(waypoints) > MAX_OPTIMIZE_WAYPOINTS:
+        raise ValueError(f"En fazla {MAX_OPTIMIZE_WAYPOINTS} duraklı rotalar optimize edilebilir")
+
+    coords = route_coords(route, waypoint_coords)
+    started = time.monotonic()
+    if len(waypoints) < 2:
+        order = np.arange(len(waypoints))
+        before = after = float(haversine_legs(coords).sum())
+        rounds = 0
+    else:
+        order, before, after, rounds = optimize_order(coords, time_budget_ms)
+
+    return [waypoints[index] for index in order], {
+        'distance_before_km': round(before, 3),
+        'distance_after_km': round(after, 3),
+        'saved_km': round(before - after, 3),
+        'rounds': rounds,
+        'elapsed_ms': round((time.monotonic() - started) * 1000, 1),
+    }
@@ -1,6 +1,7 @@
 # routes/permissions.py
 
 from rest_framework import permissions
+from .models import RouteAccess
 
 class IsRouteOwnerOrReadOnly(permissions.BasePermission):
     """
@@ -17,4 +18,7 @@ class IsCollaboratorOrOwner(permissions.BasePermission):
     Sadece rota sahibi veya işbirlikçiler düzenleme yapabilir.
     """
     def has_object_permission(self, request, view, obj):
-        return request.user in obj.collaborators.all() or obj.user == request.user
\ No newline at end of file
+        if obj.user_id == request.user.pk:
+            return True
+        # Tüm işbirlikçileri yüklemek yerine tek indeksli EXISTS sorgusu
+        return RouteAccess.objects.filter(route=obj, user_id=request.user.pk).exists()
\ No newline at end of file
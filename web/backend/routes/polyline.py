@@ -0,0 +1,157 @@
+# routes/polyline.py
+
+import heapq
+
+import numpy as np
+
+from .itinerary import coords_from_bytes, raw_location
+from .models import Waypoint
+from .spatial import EARTH_RADIUS_KM
+
+ENCODINGS = ('full', 'polyline', 'delta')
+SIMPLIFIERS = ('dp', 'vw')
+DEFAULT_PRECISION = 5
+EQUATOR_METERS_PER_PIXEL = 156543.03392  # Web Mercator, zoom 0, 256 px karo
+MAX_ZOOM = 22
+
+def zoom_tolerance(zoom):
+    """Verilen zoom seviyesinde bir pikselin ekvatordaki karşılığı (metre)."""
+    return EQUATOR_METERS_PER_PIXEL / (2 ** zoom)
+
+def quantize(coords, precision=DEFAULT_PRECISION):
+    """(lng, lat) dizisini polyline sırasıyla (lat, lng) tamsayılara yuvarlar."""
+    return np.round(coords[:, ::-1] * 10 ** precision).astype(np.int64)
+
+def delta_pack(coords, precision=DEFAULT_PRECISION):
+    """[lat0, lng0, Δlat1, Δlng1, ...] düz tamsayı listesi; ölçek 10^precision."""
+    values = quantize(coords, precision)
+    return np.diff(values, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel().tolist()
+
+def encode_polyline(coords, precision=DEFAULT_PRECISION):
+    """
+    Google encoded polyline algoritması. Döngü yoktur: farklar zigzag
+    kodlanır, 5 bitlik parçalara bölünür ve geçerli parçalar tek maskeyle seçilir.
+    """
+    if not len(coords):
+        return ''
+    values = quantize(coords, precision)
+    deltas = np.diff(values, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    zigzag = (deltas << 1) ^ (deltas >> 63)
+
+    chunks = (zigzag[:, None] >> np.arange(0, 35, 5)) & 0x1f
+    lengths = 1 + ((zigzag[:, None] >> np.arange(5, 35, 5)) > 0).sum(axis=1)
+    positions = np.arange(7)
+    chunks |= np.where(positions < lengths[:, None] - 1, 0x20, 0)  # Devam biti
+    return (chunks[positions < lengths[:, None]] + 63).astype(np.uint8).tobytes().decode('ascii')
+
+def project(coords):
+    """(lng, lat) derecelerini ortalama enlem etrafında düzlemsel metreye çevirir."""
+    radians = np.radians(coords)
+    scale = EARTH_RADIUS_KM * 1000
+    return np.column_stack((
+        radians[:, 0] * np.cos(radians[:, 1].mean()) * scale,
+        radians[:, 1] * scale,
+    ))
+
+def douglas_peucker(points, tolerance):
+    """Uçları birleştiren doğruya tolerance'tan uzak noktaları koruyan maske (yinelemeli)."""
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, n - 1]] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a = points[start]
+        direction = points[end] - a
+        offsets = points[start + 1:end] - a
+        length = np.hypot(*direction)
+        if length:
+            distances = np.abs(direction[0] * offsets[:, 1] - direction[1] * offsets[:, 0]) / length
+        else:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            split = start + 1 + index
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return keep
+
+def _triangle_areas(points, prev, curr, nxt):
+    a, b, c = points[prev], points[curr], points[nxt]
+    return np.abs((b[..., 0] - a[..., 0]) * (c[..., 1] - a[..., 1])
+                  - (c[..., 0] - a[..., 0]) * (b[..., 1] - a[..., 1])) / 2
+
+def visvalingam(points, tolerance):
+    """Etkin alanı tolerance² altında kalan noktaları en küçükten başlayarak eler."""
+    n = len(points)
+    keep = np.ones(n, dtype=bool)
+    if n < 3:
+        return keep
+    threshold = tolerance ** 2
+    prev = np.arange(-1, n - 1)
+    nxt = np.arange(1, n + 1)
+    areas = np.full(n, np.inf)
+    areas[1:-1] = _triangle_areas(points, prev[1:-1], np.arange(1, n - 1), nxt[1:-1])
+    heap = [(area, index) for index, area in enumerate(areas[1:-1].tolist(), start=1)]
+    heapq.heapify(heap)
+
+    while heap:
+        area, index = heapq.heappop(heap)
+        if not keep[index] or area != areas[index]:
+            continue  # Eskimiş kayıt
+        if area >= threshold:
+            break
+        keep[index] = False
+        before, after = prev[index], nxt[index]
+        nxt[before], prev[after] = after, before
+        for neighbour in (before, after):
+            if 0 < neighbour < n - 1:
+                # Komşunun alanı elenen noktanınkinden küçük olamaz (Visvalingam-Whyatt)
+                areas[neighbour] = max(area, float(_triangle_areas(points, prev[neighbour], neighbour, nxt[neighbour])))
+                heapq.heappush(heap, (areas[neighbour], neighbour))
+    return keep
+
+def simplify(coords, method, tolerance):
+    """Koruma maskesini döndürür; tolerance metre cinsindendir."""
+    if len(coords) < 3 or not tolerance:
+        return np.ones(len(coords), dtype=bool)
+    points = project(coords)
+    return douglas_peucker(points, tolerance) if method == 'dp' else visvalingam(points, tolerance)
+
+def encode_shape(coords, encoding, precision=DEFAULT_PRECISION, method=None, tolerance=None):
+    shape = {'encoding': encoding, 'precision': precision, 'total': len(coords)}
+    if method:
+        coords = coords[simplify(coords, method, tolerance)]
+        shape.update(simplify=method, tolerance_m=round(tolerance, 2))
+    shape['count'] = len(coords)
+    shape['points'] = encode_polyline(coords, precision) if encoding == 'polyline' else delta_pack(coords, precision)
+    return shape
+
+def waypoint_shapes(route_ids, encoding, precision=DEFAULT_PRECISION, method=None, tolerance=None):
+    """
+    Rotaların duraklarını tek sorguda ham baytlarla okur ve her rota için
+    sıkıştırılmış şekli {route_id: shape} olarak döndürür.
+    """
+    rows = list(
+        Waypoint.objects.filter(route_id__in=route_ids)
+        .order_by('route_id', 'order')
+        .annotate(raw_location=raw_location())
+        .values_list('route_id', 'raw_location')
+    )
+    owners = np.array([route_id for route_id, _ in rows], dtype=np.int64)
+    coords = coords_from_bytes(raw for _, raw in rows)
+    # Satırlar route_id'ye göre sıralı: her rota ardışık bir dilim
+    ids, starts = np.unique(owners, return_index=True)
+    bounds = dict(zip(ids.tolist(), zip(starts.tolist(), np.append(starts[1:], len(owners)).tolist())))
+
+    empty = np.empty((0, 2))
+    return {
+        route_id: encode_shape(
+            coords[slice(*bounds[route_id])] if route_id in bounds else empty,
+            encoding, precision, method, tolerance
+        )
+        for route_id in route_ids
+    }
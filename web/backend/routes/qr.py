@@ -0,0 +1,124 @@
+# routes/qr.py
+
+import hashlib
+import logging
+import queue
+import threading
+from io import BytesIO
+
+import qrcode
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+QR_UPLOAD_DIR = 'qr_codes'
+
+def qr_code_name(share_link):
+    """Paylaşım linkinin hash'inden türetilen, içerik adresli dosya adı."""
+    digest = hashlib.sha256(share_link.encode()).hexdigest()
+    return f'{QR_UPLOAD_DIR}/qr_{digest[:32]}.png'
+
+def render_qr_png(share_link):
+    """Paylaşım linki için PNG QR kodunu bayt olarak üretir."""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(share_link)
+    qr.make(fit=True)
+
+    img = qr.make_image(fill_color="#2ecc71", back_color="white")
+    buffer = BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def ensure_qr_file(share_link):
+    """Aynı link için dosya zaten varsa yeniden çizmeden adını döndürür."""
+    name = qr_code_name(share_link)
+    if default_storage.exists(name):
+        return name
+    return default_storage.save(name, ContentFile(render_qr_png(share_link)))
+
+def attach_qr_code(route_id, share_token, share_link):
+    """QR dosyasını hazırlar ve token hâlâ geçerliyse rotaya bağlar."""
+    from .models import Route
+
+    name = ensure_qr_file(share_link)
+    Route.objects.filter(pk=route_id, share_token=share_token).update(qr_code=name)
+    return name
+
+def qr_code_url(route, request=None):
+    """Hazırsa QR kodun, değilse yer tutucu görselin URL'si."""
+    return qr_code_file_url(route.qr_code, request)
+
+def qr_code_file_url(file, request=None):
+    """qr_code_url'in dosya adı (ya da FieldFile) alan hâli; .values() satırları için."""
+    if file:
+        from .models import Route
+        url = Route._meta.get_field('qr_code').storage.url(str(file))
+    else:
+        url = settings.QR_CODE_PLACEHOLDER_URL
+    return request.build_absolute_uri(url) if request is not None else url
+
+class QRCodeWorker:
+    """
+    QR kodlarını istek dışında üreten süreç içi arka plan işçisi.
+    Aynı rota ve link için bekleyen iş varsa tekrar kuyruğa alınmaz.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, route_id, share_token, share_link):
+        key = (route_id, share_link)
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='qr-code-worker', daemon=True)
+                self._thread.start()
+        self._queue.put((route_id, share_token, share_link))
+
+    def join(self):
+        """Kuyruktaki tüm işler bitene kadar bekler."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            route_id, share_token, share_link = self._queue.get()
+            try:
+                attach_qr_code(route_id, share_token, share_link)
+            except Exception:
+                logger.exception("QR kod üretilemedi (rota %s)", route_id)
+            finally:
+                with self._lock:
+                    self._pending.discard((route_id, share_link))
+                close_old_connections()
+                self._queue.task_done()
+
+worker = QRCodeWorker()
+
+def schedule_qr_code(route):
+    """
+    Rotanın QR kodunu transaction tamamlandıktan sonra üretir.
+    QR_CODE_ASYNC kapalıysa (ör. testlerde) üretim aynı thread'de yapılır.
+    """
+    args = (route.pk, route.share_token, route.share_link)
+
+    if getattr(settings, 'QR_CODE_ASYNC', True):
+        transaction.on_commit(lambda: worker.submit(*args))
+        return
+
+    def attach_now():
+        route.qr_code.name = attach_qr_code(*args)
+
+    transaction.on_commit(attach_now)
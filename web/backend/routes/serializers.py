@@ -69,13 +69,23 @@
 #         except (TypeError, ValueError):
 #             return False
 
+import uuid
+from collections import defaultdict
+
 from rest_framework import serializers
-from django.contrib.gis.geos import GEOSGeometry, GEOSException
+from django.db import transaction
+from django.urls import reverse
 from .models import Route, Waypoint
 from users.models import User
-from .fields import WKTGeometryField  # Özel alanı import edin
+from .fields import LazyPoint
+from . import polyline
+from .itinerary import coords_from_bytes, raw_location
+from .services import WaypointSyncService
+from .qr import qr_code_file_url, qr_code_url
+from plan_go.fast_serializers import ValuesSerializer
 
 class WaypointSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)  # Güncellemede mevcut durağı eşlemek için
     latitude = serializers.FloatField(write_only=True)
     longitude = serializers.FloatField(write_only=True)
     
@@ -83,30 +93,40 @@ class WaypointSerializer(serializers.ModelSerializer):
         model = Waypoint
         fields = ['id', 'name', 'order', 'latitude', 'longitude', 'arrival_time']
         read_only_fields = ('route',)
+        ordering = ('order',)  # İç içe kullanımda Prefetch sırası (plan_go.query_optimizer)
 
     def validate(self, data):
-        """Koordinatları WKT'ye çevir ve modelle eşleştir"""
+        """Koordinatları noktaya çevir ve modelle eşleştir"""
         lat = data.pop('latitude', None)  # Veriden çıkar
         lng = data.pop('longitude', None) # Veriden çıkar
         
         if not lat or not lng:
             raise serializers.ValidationError("Koordinatlar eksik")
         
-        # WKT formatına çevir (POINT(longitude latitude))
-        data['location'] = f"POINT({lng} {lat})"
+        # Paketlenmiş noktaya çevir (longitude, latitude)
+        data['location'] = LazyPoint(lng, lat)
         return data
 
     def to_representation(self, instance):
-        """Response'ta WKT'yi latitude/longitude olarak göster"""
+        """Response'ta konumu latitude/longitude olarak göster"""
         representation = super().to_representation(instance)
-        point = GEOSGeometry(instance.location)
+        point = instance.location  # LazyPoint: GEOS ayrıştırması yapılmaz
         representation['latitude'] = point.y
         representation['longitude'] = point.x
         return representation
 
+class WaypointShapeField(serializers.Field):
+    """Sıkıştırılmış durak şekli; görünümün context'e koyduğu waypoint_shapes'ten okunur."""
+
+    def __init__(self, **kwargs):
+        super().__init__(source='*', read_only=True, **kwargs)
+
+    def to_representation(self, route):
+        return self.context['waypoint_shapes'].get(route.pk)
+
 class RouteSerializer(serializers.ModelSerializer):
-    start_point = WKTGeometryField()
-    destination = WKTGeometryField()
+    start_point = serializers.CharField()  # WKT: POINT(longitude latitude)
+    destination = serializers.CharField()
     version = serializers.IntegerField(read_only=True)
     collaborators = serializers.SlugRelatedField(
         many=True,
@@ -115,7 +135,7 @@ class RouteSerializer(serializers.ModelSerializer):
         required=False
     )
     waypoints = WaypointSerializer(many=True, required=False)  # read_only=False (default)
-    qr_code = serializers.ImageField(read_only=True)
+    qr_code = serializers.SerializerMethodField()  # Hazır değilse yer tutucu URL
     share_link = serializers.SerializerMethodField()
     share_token = serializers.UUIDField(read_only=True)
 
@@ -128,32 +148,50 @@ class RouteSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ('user', 'created_at', 'last_updated')
 
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.context.get('waypoint_shapes') is not None:
+            # Sıkıştırılmış çıktıda Waypoint nesneleri hiç yüklenmez
+            fields['waypoints'] = WaypointShapeField()
+        return fields
+
     def get_share_link(self, obj):
         return self.context['request'].build_absolute_uri(obj.share_link)
 
+    def get_qr_code(self, obj):
+        return qr_code_url(obj, self.context.get('request'))
+
+    @transaction.atomic
     def create(self, validated_data):
         # Waypoint'leri ayrıştır
         waypoints_data = validated_data.pop('waypoints', [])
+        # Çoka çok alan create()'e verilemez; rota oluşturulduktan sonra atanır
+        collaborators = validated_data.pop('collaborators', None)
         
         # Route'u oluştur
         route = Route.objects.create(**validated_data)
+        if collaborators is not None:
+            route.collaborators.set(collaborators)
         
-        # Waypoint'leri ekle
-        for wp_data in waypoints_data:
-            Waypoint.objects.create(route=route, **wp_data)
+        # Waypoint'leri tek sorguda ekle
+        WaypointSyncService.create(route, waypoints_data)
         
         return route
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        waypoints_data = validated_data.pop('waypoints', [])
+        # PATCH isteğinde waypoints gönderilmediyse duraklara dokunma
+        waypoints_data = validated_data.pop('waypoints', None)
         
+        # Her güncelleme versiyonu artırır; versiyona bağlı önbellekler geçersizleşir
+        instance.version += 1
+
         # Route'u güncelle
         instance = super().update(instance, validated_data)
         
-        # Waypoint'leri sil ve yeniden oluştur
-        instance.waypoints.all().delete()
-        for wp_data in waypoints_data:
-            Waypoint.objects.create(route=instance, **wp_data)
+        # Waypoint'leri farkları uygulayarak eşitle
+        if waypoints_data is not None or not self.partial:
+            WaypointSyncService.sync(instance, waypoints_data or [])
         
         return instance
     
@@ -171,11 +209,89 @@ class RouteSerializer(serializers.ModelSerializer):
             value = data.get(field)
             if value:
                 try:
-                    GEOSGeometry(value)  # WKT geçerliliğini doğrula
-                except (GEOSException, ValueError):
+                    data[field] = LazyPoint.from_wkt(value)  # WKT'yi doğrula ve noktaya çevir
+                except ValueError:
                     errors[field] = "Geçersiz WKT formatı. Örnek: POINT(longitude latitude)"
         
         if errors:
             raise serializers.ValidationError(errors)
             
-        return data
\ No newline at end of file
+        return data
+
+class WaypointValuesSerializer(ValuesSerializer):
+    """WaypointSerializer çıktısı; konum WKT/LazyPoint yerine ham baytlardan toplu çözülür."""
+    serializer_class = WaypointSerializer
+
+    def compile(self):
+        getters = super().compile()
+        # WaypointSerializer.to_representation'daki gibi en sona eklenir
+        return getters + [('latitude', self.get_latitude), ('longitude', self.get_longitude)]
+
+    def values(self, queryset, *extra):
+        return super().values(queryset.annotate(raw_location=raw_location()), *extra)
+
+    def extra_lookups(self):
+        return ('raw_location',)
+
+    def prepare(self, rows):
+        coords = coords_from_bytes(row['raw_location'] for row in rows).tolist()
+        for row, point in zip(rows, coords):
+            row['location'] = point
+
+    @staticmethod
+    def get_latitude(row):
+        return row['location'][1]
+
+    @staticmethod
+    def get_longitude(row):
+        return row['location'][0]
+
+class RouteValuesSerializer(ValuesSerializer):
+    """
+    RouteSerializer'ın liste uçları için hızlı hâli. Duraklar ve işbirlikçiler
+    sayfa başına birer sorguda okunur; ?waypoints=polyline|delta desteklenir.
+    """
+    serializer_class = RouteSerializer
+    method_fields = ('collaborators', 'waypoints', 'qr_code', 'share_link')
+
+    def extra_lookups(self):
+        return ('qr_code',)
+
+    def prepare(self, rows):
+        ids = [row['id'] for row in rows]
+        self.collaborators = defaultdict(list)
+        # Prefetch ile aynı sorgu biçimi: sıralama da aynı kalır
+        for route_id, email in User.objects.filter(collaborated_routes__in=ids).values_list('collaborated_routes', 'email'):
+            self.collaborators[route_id].append(email)
+
+        options = self.context.get('waypoint_shape_options')
+        if options:
+            self.waypoints = polyline.waypoint_shapes(ids, **options)
+        else:
+            self.waypoints = defaultdict(list)
+            waypoints = WaypointValuesSerializer(context=self.context)
+            waypoint_rows = list(waypoints.values(
+                Waypoint.objects.filter(route_id__in=ids).order_by('route_id', 'order'), 'route_id'
+            ))
+            for row, item in zip(waypoint_rows, waypoints.serialize(waypoint_rows)):
+                self.waypoints[row['route_id']].append(item)
+
+        # reverse() satır başına değil bir kez çağrılır; token şablondaki yer tutucunun yerine konur
+        placeholder = str(uuid.UUID(int=0))
+        link = self.context['request'].build_absolute_uri(
+            reverse('shared-route-detail', kwargs={'share_token': placeholder})
+        )
+        self.share_link_parts = link.split(placeholder, 1)
+
+    def get_collaborators(self, row):
+        return self.collaborators.get(row['id'], [])
+
+    def get_waypoints(self, row):
+        return self.waypoints.get(row['id'], [])
+
+    def get_qr_code(self, row):
+        return qr_code_file_url(row['qr_code'], self.context.get('request'))
+
+    def get_share_link(self, row):
+        prefix, suffix = self.share_link_parts
+        return f"{prefix}{row['share_token']}{suffix}"
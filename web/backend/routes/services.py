@@ -0,0 +1,120 @@
+# routes/services.py
+
+from django.db import transaction
+from django.db.models import F
+from .models import Waypoint
+
+class WaypointsChanged(Exception):
+    """Yeniden sıralanacak duraklar okunduktan sonra eklenmiş ya da silinmiş."""
+
+class WaypointSyncService:
+    """
+    Bir rotanın duraklarını gelen listeyle eşitler.
+    Durak sayısından bağımsız olarak sabit sayıda sorgu çalıştırır:
+    1 SELECT, 1 DELETE, 1 geçici sıra UPDATE'i, bulk_update ve bulk_create.
+    """
+
+    @staticmethod
+    def _geohash_field():
+        return Waypoint._meta.get_field('geohash')
+
+    @classmethod
+    def create(cls, route, waypoints_data):
+        """Yeni rota için tüm durakları tek bulk_create ile ekler."""
+        waypoints = [Waypoint(route=route, **cls._clean(data)) for data in waypoints_data]
+        return Waypoint.objects.bulk_create(waypoints)
+
+    @staticmethod
+    def _clean(data):
+        data = dict(data)
+        data.pop('id', None)
+        return data
+
+    @classmethod
+    def _diff(cls, route, waypoints_data):
+        """Gelen veriyi mevcut duraklarla id, yoksa sıra numarası üzerinden eşler."""
+        existing = {waypoint.pk: waypoint for waypoint in route.waypoints.all()}
+        by_order = {waypoint.order: waypoint for waypoint in existing.values()}
+
+        matched = {}
+        to_create = []
+        for data in waypoints_data:
+            waypoint = existing.get(data.get('id')) or by_order.get(data['order'])
+            if waypoint is None or waypoint.pk in matched:
+                to_create.append(Waypoint(route=route, **cls._clean(data)))
+            else:
+                matched[waypoint.pk] = (waypoint, cls._clean(data))
+
+        to_delete = [pk for pk in existing if pk not in matched]
+        top_order = max([*by_order, *(data['order'] for data in waypoints_data)], default=0)
+        return matched.values(), to_create, to_delete, top_order
+
+    @classmethod
+    def _apply_changes(cls, pairs):
+        """Değişen durakları günceller; (durak, sıra değişti mi) listesi ve alan kümesini döndürür."""
+        changed = []
+        fields = set()
+        for waypoint, data in pairs:
+            changed_fields = {name for name, value in data.items() if getattr(waypoint, name) != value}
+            if not changed_fields:
+                continue
+            reordered = 'order' in changed_fields
+            for name in changed_fields:
+                setattr(waypoint, name, data[name])
+            if 'location' in changed_fields:
+                cls._geohash_field().pre_save(waypoint, False)
+                changed_fields.add('geohash')
+            fields |= changed_fields
+            changed.append((waypoint, reordered))
+        return changed, fields
+
+    @classmethod
+    @transaction.atomic
+    def sync(cls, route, waypoints_data):
+        pairs, to_create, to_delete, top_order = cls._diff(route, waypoints_data)
+        changed, fields = cls._apply_changes(pairs)
+
+        if to_delete:
+            Waypoint.objects.filter(pk__in=to_delete).delete()
+
+        if changed:
+            reordered = [waypoint.pk for waypoint, moved in changed if moved]
+            if reordered:
+                # unique_together(route, order) çakışmasını önlemek için yer değiştiren
+                # durakları önce mevcut tüm sıraların üzerine kaydır
+                Waypoint.objects.filter(pk__in=reordered).update(order=F('order') + top_order + 1)
+            Waypoint.objects.bulk_update([waypoint for waypoint, _ in changed], sorted(fields))
+
+        if to_create:
+            Waypoint.objects.bulk_create(to_create)
+
+    @classmethod
+    @transaction.atomic
+    def reorder(cls, route, waypoint_ids):
+        """
+        Durakları verilen id sırasına göre, mevcut sıra numaralarını yeniden
+        dağıtarak numaralar. Yalnızca yeri değişenler güncellenir: 1 kaydırma
+        UPDATE'i ve 1 bulk_update. Satırlar kilitlenir; id kümesi rotanın güncel
+        duraklarıyla eşleşmezse WaypointsChanged fırlatılır.
+        """
+        waypoints = {
+            waypoint.pk: waypoint
+            for waypoint in route.waypoints.select_for_update().only('id', 'order')
+        }
+        if len(waypoint_ids) != len(waypoints) or set(waypoint_ids) != waypoints.keys():
+            raise WaypointsChanged
+        orders = sorted(waypoint.order for waypoint in waypoints.values())
+        moved = []
+        for waypoint_id, order in zip(waypoint_ids, orders):
+            waypoint = waypoints[waypoint_id]
+            if waypoint.order != order:
+                waypoint.order = order
+                moved.append(waypoint)
+
+        if moved:
+            # unique_together(route, order): önce tüm sıraların üzerine kaydır
+            Waypoint.objects.filter(pk__in=[waypoint.pk for waypoint in moved]).update(
+                order=F('order') + orders[-1] + 1
+            )
+            Waypoint.objects.bulk_update(moved, ['order'])
+        return moved
@@ -0,0 +1,108 @@
+# routes/shared_cache.py
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+def route_stamp(route):
+    """last_updated'ın mikro saniye cinsinden değeri; ETag'lerde kullanılır."""
+    return int(route.last_updated.timestamp() * 1_000_000)
+
+class SharedRouteCache:
+    """
+    QR/token ile açılan paylaşılan rota yanıtlarının önbelleği. İki kayıt tutulur:
+      shared-route:<token>                     -> {'version', 'last_modified', 'stamp'} işaretçisi
+      shared-route:<token>:<version>:<origin>  -> serileştirilmiş JSON gövdesi
+    İşaretçi önbellekteyse koşullu istekler hiç sorgu yapmadan 304 alır, diğerleri
+    gövdeyi versiyon anahtarından okur. Gövde mutlak URL'ler (share_link, qr_code)
+    içerdiğinden anahtarda istek kökeni de vardır. Rota kaydında işaretçi silinir;
+    sonraki istek yeniden serileştirip gövdeyi günceller.
+    """
+    prefix = 'shared-route'
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'SHARED_ROUTE_CACHE_TTL', 600)
+
+    @staticmethod
+    def _origin_digest(origin):
+        return hashlib.sha1(origin.encode()).hexdigest()[:12]
+
+    def pointer_key(self, token):
+        return f'{self.prefix}:{token}'
+
+    def body_key(self, token, version, origin):
+        return f'{self.prefix}:{token}:{version}:{self._origin_digest(origin)}'
+
+    def etag(self, pointer, origin):
+        return f'"{pointer["version"]}-{pointer["stamp"]}-{self._origin_digest(origin)}"'
+
+    @staticmethod
+    def pointer_for(route):
+        # Last-Modified saniye hassasiyetindedir; ETag aynı saniyedeki değişiklikleri de ayırır
+        return {
+            'version': route.version,
+            'last_modified': int(route.last_updated.timestamp()),
+            'stamp': route_stamp(route),
+        }
+
+    def get(self, token, origin):
+        """(işaretçi, gövde) döndürür; işaretçi yoksa ikisi de None'dır."""
+        pointer = cache.get(self.pointer_key(token))
+        if pointer is None:
+            return None, None
+        return pointer, cache.get(self.body_key(token, pointer['version'], origin))
+
+    async def aget(self, token, origin):
+        pointer = await cache.aget(self.pointer_key(token))
+        if pointer is None:
+            return None, None
+        return pointer, await cache.aget(self.body_key(token, pointer['version'], origin))
+
+    def _entries(self, route, origin, body):
+        pointer = self.pointer_for(route)
+        return pointer, {
+            self.pointer_key(route.share_token): pointer,
+            self.body_key(route.share_token, route.version, origin): body,
+        }
+
+    def store(self, route, origin, body):
+        pointer, entries = self._entries(route, origin, body)
+        cache.set_many(entries, self.ttl)
+        return pointer
+
+    async def astore(self, route, origin, body):
+        pointer, entries = self._entries(route, origin, body)
+        await cache.aset_many(entries, self.ttl)
+        return pointer
+
+    def invalidate(self, token):
+        """İşaretçiyi hemen ve transaction tamamlandığında siler (bkz. badges.signals)."""
+        if not token:
+            return
+        key = self.pointer_key(token)
+        cache.delete(key)
+        transaction.on_commit(lambda: cache.delete(key))
+
+    def response(self, request, pointer, body, origin):
+        """
+        Koşullu isteğe göre 304 ya da gövdeli yanıt kurar; gövde yoksa ve
+        istek koşulsuzsa None döner (çağıran veritabanından okumalı).
+        """
+        etag = self.etag(pointer, origin)
+        response = get_conditional_response(request, etag=etag, last_modified=pointer['last_modified'])
+        if response is None:
+            if body is None:
+                return None
+            response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(pointer['last_modified'])
+        patch_cache_control(response, no_cache=True)  # Tarayıcı her taramada yeniden doğrulasın
+        return response
+
+shared_route_cache = SharedRouteCache()
@@ -1,19 +1,23 @@
 # routes/signals.py
 
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.utils import timezone
-from .models import Route
-import qrcode
-from io import BytesIO
-from django.core.files import File
+from .models import Route, RouteAccess, Waypoint
+from .qr import schedule_qr_code
+from .shared_cache import shared_route_cache
+import logging
 import uuid
 
+logger = logging.getLogger(__name__)
+
 @receiver(post_save, sender=Route)
 def handle_route_changes(sender, instance, **kwargs):
     """Rota değişikliklerini loglama"""
-    action = "oluşturuldu" if kwargs['created'] else "güncellendi"
-    print(f"Rota {action}: {instance.title} (ID: {instance.id})")
+    if kwargs['created']:
+        logger.info("Rota oluşturuldu: %s (ID: %s)", instance.title, instance.id)
+    else:
+        logger.info("Rota güncellendi: %s (ID: %s) %s", instance.title, instance.id, instance.changed_fields())
 
 @receiver(pre_save, sender=Route)
 def handle_share_token(sender, instance, **kwargs):
@@ -26,51 +30,77 @@ def handle_share_token(sender, instance, **kwargs):
     # else:
     #     instance.share_token = None
 
-    # Orijinal değeri kaydet
-    if not kwargs['raw']:
-        try:
-            original = Route.objects.get(pk=instance.pk)
-            instance._original_share_token = original.share_token
-        except Route.DoesNotExist:
-            instance._original_share_token = None
+@receiver(post_save, sender=Route)
+def manage_qr_code(sender, instance, created, **kwargs):
+    """QR kod yönetimi için: üretim arka plan işçisine bırakılır"""
+    if kwargs.get('raw'):
+        return
+
+    # Orijinal token from_db anında yakalandı; tekrar sorgu yapmaya gerek yok
+    if (created or instance.has_changed('share_token') or not instance.qr_code) and instance.share_token:
+        schedule_qr_code(instance)
+
 
 @receiver(post_save, sender=Route)
-def manage_qr_code(sender, instance, **kwargs):
-    """QR kod yönetimi için"""
-    qr_needs_update = False
-    
-    # QR kod oluşturma/update koşulları
-    if kwargs['created']:
-        qr_needs_update = True
-    else:
-        original = Route.objects.get(pk=instance.pk)
-        if instance.share_token != original.share_token:
-            qr_needs_update = True
+def sync_owner_access(sender, instance, created, **kwargs):
+    """Sahip erişim kaydını RouteAccess tablosunda güncel tutar"""
+    if not (created or instance.has_changed('user_id')):
+        return
+    if not created:
+        RouteAccess.objects.filter(route=instance, role=RouteAccess.OWNER).delete()
+    RouteAccess.objects.update_or_create(
+        route=instance, user_id=instance.user_id,
+        defaults={'role': RouteAccess.OWNER}
+    )
 
-    if qr_needs_update and instance.share_token:
-        # QR kod oluştur
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(instance.share_link)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="#2ecc71", back_color="white")
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        
-        # Mevcut QR kodunu sil ve yenisini kaydet
-        if instance.qr_code:
-            instance.qr_code.delete(save=False)
-            
-        instance.qr_code.save(
-            f'qr_{instance.share_token}.png',
-            File(buffer),
-            save=False
+@receiver(m2m_changed, sender=Route.collaborators.through)
+def sync_collaborator_access(sender, instance, action, reverse, pk_set, **kwargs):
+    """İşbirlikçi ekleme/çıkarma işlemlerini RouteAccess tablosuna yansıtır"""
+    collaborators = RouteAccess.objects.filter(role=RouteAccess.COLLABORATOR)
+
+    if action == 'post_add':
+        pairs = [(pk, instance.pk) for pk in pk_set] if reverse else [(instance.pk, pk) for pk in pk_set]
+        # Sahip zaten kayıtlıysa çakışma yoksayılır; rolü düşürülmez
+        RouteAccess.objects.bulk_create(
+            [RouteAccess(route_id=route_id, user_id=user_id, role=RouteAccess.COLLABORATOR)
+             for route_id, user_id in pairs],
+            ignore_conflicts=True
         )
-        
-        # Sonsuz döngüyü önlemek için partial update
-        Route.objects.filter(pk=instance.pk).update(qr_code=instance.qr_code)
\ No newline at end of file
+    elif action == 'post_remove':
+        if reverse:
+            collaborators.filter(user=instance, route_id__in=pk_set).delete()
+        else:
+            collaborators.filter(route=instance, user_id__in=pk_set).delete()
+    elif action == 'post_clear':
+        collaborators.filter(**{'user' if reverse else 'route': instance}).delete()
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def invalidate_shared_route(sender, instance, **kwargs):
+    """Paylaşılan rota yanıt önbelleğini geçersiz kılar (paylaşım kapatma dahil)"""
+    shared_route_cache.invalidate(instance.share_token)
+
+@receiver(post_save, sender=Waypoint)
+def touch_route_for_waypoint(sender, instance, **kwargs):
+    """
+    Tekil durak kayıtlarında rotanın last_updated'ını (dolayısıyla ETag'leri)
+    ilerletir ve paylaşım önbelleğini temizler. Toplu işlemler rotayı da
+    kaydettiğinden Route sinyaliyle geçersizleşir. post_delete'e bilerek
+    bağlanmıyor: Waypoint'in hızlı toplu silinmesini engellerdi.
+    """
+    if kwargs.get('raw'):
+        return
+    routes = Route.objects.filter(pk=instance.route_id)
+    routes.update(last_updated=timezone.now())
+    shared_route_cache.invalidate(routes.values_list('share_token', flat=True).first())
+
+@receiver(m2m_changed, sender=Route.collaborators.through)
+def invalidate_shared_route_collaborators(sender, instance, action, reverse, pk_set, **kwargs):
+    """İşbirlikçi listesi yanıtta yer aldığından değişimde önbelleği temizler"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        shared_route_cache.invalidate(instance.share_token)
+    elif pk_set:
+        for token in Route.objects.filter(pk__in=pk_set).values_list('share_token', flat=True):
+            shared_route_cache.invalidate(token)
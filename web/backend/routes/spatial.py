@@ -0,0 +1,189 @@
+# routes/spatial.py
+
+import math
+
+from django.db.models import Q
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 12
+MAX_COVER_CELLS = 32  # Bir sorguda taranacak en fazla geohash hücresi
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+_GEOHASH_PAIRS = [a + b for a in GEOHASH_ALPHABET for b in GEOHASH_ALPHABET]  # 10 bit -> 2 karakter
+
+def _quantize(value, low, span, bits):
+    """
+    Bisection'ın verdiği hücre indeksini tek adımda hesaplar. Hücre sınırları
+    (low + span * i / 2^bits) kayan noktada kesin olduğundan yuvarlama hatası
+    bir komşu hücreye kaydırmayla düzeltilir; sonuç bisection ile birebir aynıdır.
+    """
+    cells = 1 << bits
+    if math.isnan(value):
+        return 0
+    index = min(max(int((value - low) / span * cells), 0), cells - 1)
+    if index > 0 and value < low + span * index / cells:
+        index -= 1
+    elif index < cells - 1 and value >= low + span * (index + 1) / cells:
+        index += 1
+    return index
+
+def _spread_bits(value):
+    """32 bitlik değerin bitlerini çift konumlara yayar (abcd -> 0a0b0c0d)."""
+    value = (value | (value << 16)) & 0x0000FFFF0000FFFF
+    value = (value | (value << 8)) & 0x00FF00FF00FF00FF
+    value = (value | (value << 4)) & 0x0F0F0F0F0F0F0F0F
+    value = (value | (value << 2)) & 0x3333333333333333
+    return (value | (value << 1)) & 0x5555555555555555
+
+def encode_geohash(lng, lat, precision=GEOHASH_PRECISION):
+    """
+    (longitude, latitude) çiftini verilen hassasiyette (en fazla 12) geohash'e çevirir.
+    Bit bit bisection yerine iki eksen tamsayıya indirgenip bitleri iç içe geçirilir.
+    """
+    total_bits = precision * 5
+    lng_index = _quantize(lng, -180.0, 360.0, (total_bits + 1) // 2)
+    lat_index = _quantize(lat, -90.0, 180.0, total_bits // 2)
+    # Geohash bitleri boylamla başlar; tek bit sayısında boylam bir bit fazladır
+    if total_bits % 2:
+        code = _spread_bits(lng_index) | (_spread_bits(lat_index) << 1)
+    else:
+        code = (_spread_bits(lng_index) << 1) | _spread_bits(lat_index)
+    chars = ''.join([_GEOHASH_PAIRS[(code >> shift) & 1023] for shift in range(total_bits - 10, -1, -10)])
+    return chars + GEOHASH_ALPHABET[code & 31] if precision % 2 else chars
+
+def cell_size(precision):
+    """Verilen hassasiyetteki hücrenin (boylam genişliği, enlem yüksekliği) derece cinsinden boyutu."""
+    total_bits = precision * 5
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 360.0 / (1 << lng_bits), 180.0 / (1 << lat_bits)
+
+def _frange(start, stop, step):
+    value = start
+    while value < stop:
+        yield value
+        value += step
+    yield stop
+
+def cover_bbox(min_lng, min_lat, max_lng, max_lat, max_cells=MAX_COVER_CELLS):
+    """
+    Bbox'ı örten geohash önek kümesini döndürür.
+    Hücre sayısı max_cells'i aşmayan en yüksek hassasiyet seçilir.
+    """
+    min_lng, max_lng = max(min_lng, -180.0), min(max_lng, 180.0)
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+
+    cells = {''}  # Hassasiyet 0: tüm dünya
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        width, height = cell_size(precision)
+        estimate = (math.ceil((max_lng - min_lng) / width) + 1) * (math.ceil((max_lat - min_lat) / height) + 1)
+        if estimate > max_cells:
+            break
+        cells = {
+            encode_geohash(lng, lat, precision)
+            for lng in _frange(min_lng, max_lng, width)
+            for lat in _frange(min_lat, max_lat, height)
+        }
+    return cells
+
+def split_bbox(min_lng, min_lat, max_lng, max_lat):
+    """Antimeridyeni geçen kutuyu (min_lng > max_lng) iki yanındaki parçalara böler."""
+    if min_lng <= max_lng:
+        return [(min_lng, min_lat, max_lng, max_lat)]
+    return [(min_lng, min_lat, 180.0, max_lat), (-180.0, min_lat, max_lng, max_lat)]
+
+def bbox_area(min_lng, min_lat, max_lng, max_lat):
+    """Kutunun derece kare cinsinden alanı; antimeridyeni geçen kutuda parçalar toplanır."""
+    return sum(
+        (box_max_lng - box_min_lng) * (box_max_lat - box_min_lat)
+        for box_min_lng, box_min_lat, box_max_lng, box_max_lat in split_bbox(min_lng, min_lat, max_lng, max_lat)
+    )
+
+def _wrap_lng(lng):
+    return (lng + 180.0) % 360.0 - 180.0
+
+def radius_bbox(lng, lat, radius_km):
+    """
+    Merkez ve yarıçaptan (km) onu içine alan bbox'ı hesaplar. Antimeridyeni
+    geçen kutuda min_lng > max_lng olur (bkz. split_bbox).
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlng = radius_km / (KM_PER_DEGREE * cos_lat)
+    if dlng >= 180.0:
+        return -180.0, lat - dlat, 180.0, lat + dlat
+    return _wrap_lng(lng - dlng), lat - dlat, _wrap_lng(lng + dlng), lat + dlat
+
+def haversine_km(lng1, lat1, lng2, lat2):
+    """İki nokta arasındaki büyük daire mesafesi (km)."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+def geohash_filter(field, cells):
+    """
+    Önek eşleşmesini indeksli aralık sorgusuna çevirir.
+    SQLite'ta LIKE indeks kullanmadığı için startswith yerine >= / < kullanılır.
+    """
+    condition = Q()
+    for cell in cells:
+        condition |= Q(**{f'{field}__gte': cell, f'{field}__lt': cell + '~'})
+    return condition
+
+def _scan(cells, measure):
+    """
+    Aday hücrelerdeki rota ve durak noktalarını tarar.
+    measure None dönmeyen rotalar için en küçük ölçüyü {route_id: değer} olarak döndürür.
+    """
+    from .models import Route, Waypoint
+
+    found = {}
+
+    def consider(route_id, point):
+        value = measure(point)
+        if value is not None and (route_id not in found or value < found[route_id]):
+            found[route_id] = value
+
+    routes = Route.objects.filter(
+        geohash_filter('start_geohash', cells) | geohash_filter('destination_geohash', cells)
+    ).values_list('pk', 'start_point', 'destination')
+    for pk, start, destination in routes:
+        consider(pk, start)
+        consider(pk, destination)
+
+    waypoints = Waypoint.objects.filter(geohash_filter('geohash', cells)).values_list('route_id', 'location')
+    for route_id, location in waypoints:
+        consider(route_id, location)
+
+    return found
+
+def _cover_boxes(boxes):
+    cells = set()
+    for box in boxes:
+        cells |= cover_bbox(*box)
+    return cells
+
+def route_ids_in_bbox(min_lng, min_lat, max_lng, max_lat):
+    """
+    Başlangıç, varış veya herhangi bir durağı bbox içinde kalan rota id'leri.
+    min_lng > max_lng ise kutu antimeridyeni geçer.
+    """
+    boxes = split_bbox(min_lng, min_lat, max_lng, max_lat)
+
+    def measure(point):
+        for box_min_lng, box_min_lat, box_max_lng, box_max_lat in boxes:
+            if box_min_lng <= point.x <= box_max_lng and box_min_lat <= point.y <= box_max_lat:
+                return 0
+        return None
+
+    return set(_scan(_cover_boxes(boxes), measure))
+
+def route_distances_near(lng, lat, radius_km):
+    """Yarıçap içindeki rotaları en yakın noktalarının mesafesiyle {route_id: km} olarak döndürür."""
+    def measure(point):
+        distance = haversine_km(lng, lat, point.x, point.y)
+        return distance if distance <= radius_km else None
+
+    return _scan(_cover_boxes(split_bbox(*radius_bbox(lng, lat, radius_km))), measure)
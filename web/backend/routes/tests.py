@@ -0,0 +1,328 @@
+import datetime
+import io
+from unittest import mock
+
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from plan_go.testing import assert_max_queries, query_counts
+from users.models import User
+from routes.fields import LazyPoint
+from routes import optimization, tracks
+from routes.models import Route, Waypoint
+from routes.services import WaypointSyncService, WaypointsChanged
+from routes.views import RouteListView
+
+START = timezone.make_aware(datetime.datetime(2025, 5, 1, 8, 0))
+
+def create_route(user, lng=28.97, lat=41.0, waypoints=1, **fields):
+    route = Route.objects.create(
+        user=user, title=fields.pop('title', 'Rota'),
+        start_point=LazyPoint(lng, lat), destination=LazyPoint(lng + 1, lat - 0.5),
+        start_date=START, end_date=START + datetime.timedelta(days=2), **fields,
+    )
+    Waypoint.objects.bulk_create([
+        Waypoint(route=route, name=f'Durak {order}', order=order, location=LazyPoint(lng + order * 0.1, lat))
+        for order in range(1, waypoints + 1)
+    ])
+    return route
+
+class ItineraryParamsTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('route-itinerary', args=[create_route(self.user).pk])
+
+    def test_valid_params(self):
+        response = self.client.get(self.url, {'speed': 80, 'stop_minutes': 30})
+        self.assertEqual(response.status_code, 200)
+
+    def test_rejects_non_finite_and_out_of_range_values(self):
+        for params in (
+            {'speed': 'nan'}, {'speed': 'inf'}, {'speed': '-inf'}, {'speed': 0}, {'speed': 5000},
+            {'stop_minutes': 'inf'}, {'stop_minutes': 'nan'}, {'stop_minutes': -1}, {'stop_minutes': 1e12},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+class ItineraryCacheTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        self.route = create_route(user, waypoints=2)
+        self.url = reverse('route-itinerary', args=[self.route.pk])
+
+    def total_km(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['total_distance_km']
+
+    def test_waypoint_save_without_version_bump_invalidates(self):
+        before = self.total_km()
+        waypoint = self.route.waypoints.get(order=2)
+        waypoint.location = LazyPoint(30.5, 41.0)
+        waypoint.save()
+        self.assertNotEqual(self.total_km(), before)
+
+    def test_route_save_without_version_bump_invalidates(self):
+        before = self.total_km()
+        self.route.destination = LazyPoint(33.0, 39.9)
+        self.route.save()
+        self.route.refresh_from_db()
+        self.assertEqual(self.route.version, 0)
+        self.assertNotEqual(self.total_km(), before)
+
+class SpatialQueryTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.istanbul = create_route(self.user, title='İstanbul', waypoints=0)
+        self.fiji = create_route(self.user, lng=179.9, lat=-17.0, title='Fiji', waypoints=0)
+
+    def titles(self, response):
+        self.assertEqual(response.status_code, 200)
+        return {item['title'] for item in response.json()}
+
+    def test_rejects_invalid_params(self):
+        for params in (
+            {'lat': 'nan', 'lng': 28.97}, {'lat': 41, 'lng': 'inf'}, {'lat': 41, 'lng': 28.97, 'radius': 'nan'},
+            {'lat': 41, 'lng': 28.97, 'radius': 0}, {'lat': 91, 'lng': 28.97}, {'lat': 41, 'lng': 181},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(reverse('routes-nearby'), params).status_code, 400)
+        for bbox in ('nan,0,1,1', '0,0,inf,1', '0,-91,1,1', '0,2,1,1', '-181,0,1,1'):
+            with self.subTest(bbox=bbox):
+                self.assertEqual(self.client.get(reverse('routes-bbox'), {'bbox': bbox}).status_code, 400)
+
+    def test_bbox_crossing_antimeridian(self):
+        response = self.client.get(reverse('routes-bbox'), {'bbox': '179,-18,-179,-17'})
+        self.assertEqual(self.titles(response), {'Fiji'})
+
+    def test_nearby_crossing_antimeridian(self):
+        response = self.client.get(reverse('routes-nearby'), {'lat': -17.0, 'lng': -179.95, 'radius': 50})
+        self.assertEqual(self.titles(response), {'Fiji'})
+
+    @override_settings(NEARBY_MAX_RADIUS_KM=100, BBOX_MAX_AREA_DEG2=4)
+    def test_rejects_oversized_queries(self):
+        response = self.client.get(reverse('routes-nearby'), {'lat': 41, 'lng': 28.97, 'radius': 101})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('radius', response.json())
+        for bbox in ('28,40,31,42', '179,-18,-178,-16'):
+            with self.subTest(bbox=bbox):
+                response = self.client.get(reverse('routes-bbox'), {'bbox': bbox})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('bbox', response.json())
+
+    @override_settings(SPATIAL_MAX_RESULTS=2)
+    def test_results_are_capped(self):
+        for offset in (0.3, 0.2, 0.1):
+            create_route(self.user, lng=28.97 + offset, title=f'Yakın {offset}', waypoints=0)
+
+        response = self.client.get(reverse('routes-nearby'), {'lat': 41.0, 'lng': 28.97, 'radius': 50})
+        self.assertEqual([item['title'] for item in response.json()], ['İstanbul', 'Yakın 0.1'])
+        self.assertEqual(response['X-Results-Truncated'], 'true')
+
+        response = self.client.get(reverse('routes-bbox'), {'bbox': '28,40,30,42'})
+        self.assertEqual(len(response.json()), 2)
+        self.assertEqual(response['X-Results-Truncated'], 'true')
+
+        response = self.client.get(reverse('routes-bbox'), {'bbox': '179,-18,-179,-17'})
+        self.assertNotIn('X-Results-Truncated', response)
+
+class WaypointReorderTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.route = create_route(self.user, waypoints=0)
+        # Zikzak sıra: optimizasyon mesafeyi kısaltır
+        Waypoint.objects.bulk_create([
+            Waypoint(route=self.route, name=f'Durak {order}', order=order, location=LazyPoint(lng, 41.0))
+            for order, lng in enumerate((29.8, 29.1, 29.6, 29.3), start=1)
+        ])
+
+    def test_reorder_rejects_stale_ids(self):
+        ids = list(self.route.waypoints.order_by('order').values_list('pk', flat=True))
+        self.route.waypoints.filter(pk=ids[-1]).delete()
+        with self.assertRaises(WaypointsChanged):
+            WaypointSyncService.reorder(self.route, list(reversed(ids)))
+
+    def test_optimize_conflicts_when_waypoint_deleted_concurrently(self):
+        optimize_route = optimization.optimize_route
+
+        def optimize_then_delete(route, *args):
+            result = optimize_route(route, *args)
+            route.waypoints.order_by('order').last().delete()
+            return result
+
+        url = reverse('route-optimize', args=[self.route.pk])
+        with mock.patch.object(optimization, 'optimize_route', side_effect=optimize_then_delete):
+            response = self.client.post(url, {}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.route.refresh_from_db()
+        self.assertEqual(self.route.version, 0)
+
+    def test_optimize_rejects_invalid_version(self):
+        url = reverse('route-optimize', args=[self.route.pk])
+        for version in ('abc', None, True):
+            with self.subTest(version=version):
+                response = self.client.post(url, {'version': version}, format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('version', response.json())
+        self.assertEqual(self.client.post(url, {'version': '0', 'dry_run': True}, format='json').status_code, 200)
+
+class GeoJSONStreamTests(TestCase):
+
+    def parse(self, text):
+        return list(tracks.parse_geojson(io.BytesIO(text.encode())))
+
+    def test_parses_features_one_by_one(self):
+        points = self.parse(
+            '{"type": "FeatureCollection", "features": ['
+            '{"type": "Feature", "geometry": {"type": "Point", "coordinates": [28.9, 41.0]}},'
+            '{"type": "Feature", "geometry": {"type": "LineString", "coordinates": [[29, 41], [29.1, 41.1]]}}]}'
+        )
+        self.assertEqual(len(points), 3)
+
+    @override_settings(ROUTE_IMPORT_MAX_VALUE_SIZE=200 * 1024)
+    def test_truncated_value_fails_before_reading_whole_file(self):
+        # Kapanmayan koordinat dizisi: tampon sınırı aşılınca dosyanın sonu okunmadan hata
+        body = b'{"type": "LineString", "coordinates": [' + b'[28.9, 41.0],' * 500000
+        file = io.BytesIO(body)
+        with self.assertRaisesMessage(tracks.TrackImportError, "204800"):
+            list(tracks.parse_geojson(file))
+        self.assertLess(file.tell(), len(body) // 2)
+
+    def test_import_rejects_oversized_value(self):
+        user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        client = APIClient()
+        client.force_authenticate(user)
+        upload = io.BytesIO(b'{"type": "LineString", "coordinates": [' + b'[28.9, 41.0],' * 10000)
+        upload.name = 'iz.geojson'
+        with self.settings(ROUTE_IMPORT_MAX_VALUE_SIZE=32 * 1024):
+            response = client.post(reverse('route-import-track', args=[create_route(user).pk]), {'file': upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('file', response.json())
+
+    def test_import_rejects_invalid_version(self):
+        user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        client = APIClient()
+        client.force_authenticate(user)
+        route = create_route(user, waypoints=0)
+        upload = io.BytesIO(b'{"type": "LineString", "coordinates": [[28.9, 41.0], [29.0, 41.1]]}')
+        upload.name = 'iz.geojson'
+        response = client.post(reverse('route-import-track', args=[route.pk]), {'file': upload, 'version': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('version', response.json())
+        self.assertFalse(route.waypoints.exists())
+
+class RouteListViewTests(TestCase):
+
+    def test_cursor_reaches_next_page(self):
+        user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        for index in range(12):
+            create_route(user, title=f'Rota {index}', waypoints=0)
+
+        def page(**params):
+            request = RequestFactory().get('/routes/web/', params)
+            request.user = user
+            return RouteListView.as_view()(request).context_data
+
+        first = page()
+        self.assertEqual(len(first['routes']), 10)
+        self.assertIsNotNone(first['next_cursor'])
+        second = page(cursor=first['next_cursor'])
+        self.assertEqual(len(second['routes']), 2)
+        self.assertIsNone(second['next_cursor'])
+        self.assertFalse({route.pk for route in first['routes']} & {route.pk for route in second['routes']})
+
+class RouteCreateTests(TestCase):
+
+    def test_create_with_collaborators(self):
+        user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        friend = User.objects.create_user(username='arkadas', email='arkadas@example.com', password='x')
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post(reverse('route-list'), {
+            'title': 'Ege turu',
+            'start_point': 'POINT(27.14 38.42)',
+            'destination': 'POINT(27.43 37.86)',
+            'start_date': '2025-06-01T08:00:00Z',
+            'end_date': '2025-06-03T08:00:00Z',
+            'collaborators': [friend.email],
+            'waypoints': [{'name': 'Efes', 'order': 1, 'latitude': 37.94, 'longitude': 27.34}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        route = Route.objects.get(pk=response.json()['id'])
+        self.assertEqual(list(route.collaborators.all()), [friend])
+        self.assertEqual(route.waypoints.count(), 1)
+
+class RouteListQueryTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        self.friends = [
+            User.objects.create_user(username=f'arkadas{index}', email=f'arkadas{index}@example.com', password='x')
+            for index in range(2)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def setup_routes(self, count):
+        Route.objects.filter(user=self.user).delete()
+        for index in range(count):
+            create_route(self.user, title=f'Rota {index}', waypoints=3).collaborators.set(self.friends)
+
+    def test_route_list_query_count_is_constant(self):
+        for fast in (True, False):
+            for params in ({}, {'waypoints': 'polyline'}):
+                with self.subTest(fast=fast, params=params), self.settings(FAST_SERIALIZERS_ENABLED=fast):
+                    def get():
+                        response = self.client.get(reverse('route-list'), params)
+                        self.assertEqual(response.status_code, 200)
+
+                    counts = query_counts(get, (1, 20), self.setup_routes)
+                    self.assertEqual(counts[1], counts[20], counts)
+                    with assert_max_queries(counts[1]):
+                        get()
+
+class RouteValuesSerializerParityTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        friend = User.objects.create_user(username='arkadas', email='arkadas@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        planned = create_route(self.user, title='Planlı', waypoints=3)
+        planned.collaborators.set([friend])
+        # Bir durağın varış saati var, diğerleri null
+        planned.waypoints.filter(order=2).update(arrival_time=START + datetime.timedelta(hours=5))
+        create_route(self.user, title='Boş', waypoints=0)
+        shared = create_route(self.user, lng=32.85, lat=39.93, title='Paylaşılan', waypoints=2)
+        # Sinyaller QR üretmesin diye update() ile
+        Route.objects.filter(pk=shared.pk).update(is_shared=True, qr_code='qr_codes/paylasilan.png')
+
+    def test_list_matches_drf_serializer(self):
+        for params in ({}, {'waypoints': 'polyline'}, {'waypoints': 'delta', 'precision': 6}):
+            with self.subTest(params=params):
+                responses = {}
+                for fast in (True, False):
+                    with self.settings(FAST_SERIALIZERS_ENABLED=fast):
+                        responses[fast] = self.client.get(reverse('route-list'), params)
+                    self.assertEqual(responses[fast].status_code, 200)
+                self.assertEqual(responses[True].content, responses[False].content)
+
+        data = self.client.get(reverse('route-list')).json()
+        arrival_times = [waypoint['arrival_time'] for route in data for waypoint in route['waypoints']]
+        self.assertIn(None, arrival_times)
+        self.assertTrue(any(arrival_times))
+        self.assertTrue(any(route['qr_code'] for route in data))
@@ -0,0 +1,328 @@
+# routes/tracks.py
+
+import codecs
+import json
+import os
+from itertools import compress, islice
+from xml.etree.ElementTree import ParseError
+from xml.sax.saxutils import escape
+
+import numpy as np
+from defusedxml.ElementTree import iterparse
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils.dateparse import parse_datetime
+
+from . import polyline
+from .fields import LazyPoint
+from .models import Waypoint
+
+FORMATS = ('gpx', 'geojson')
+EXTENSIONS = {'.gpx': 'gpx', '.geojson': 'geojson', '.json': 'geojson'}
+GPX_POINT_TAGS = {'trkpt', 'rtept', 'wpt'}
+JSON_CHUNK_SIZE = 64 * 1024
+EXPORT_CHUNK_SIZE = 2000  # Yanıta tek seferde yazılan nokta sayısı
+
+class TrackImportError(ValueError):
+    """İz dosyası okunamadı ya da sınırları aşıyor."""
+
+def detect_format(upload, requested=None):
+    """Açıkça istenen biçimi, yoksa dosya uzantısını, o da yoksa ilk karakteri esas alır."""
+    if requested:
+        if requested not in FORMATS:
+            raise TrackImportError(f"Biçim şunlardan biri olmalıdır: {', '.join(FORMATS)}")
+        return requested
+    extension = os.path.splitext(upload.name or '')[1].lower()
+    if extension in EXTENSIONS:
+        return EXTENSIONS[extension]
+    head = upload.read(512).lstrip(codecs.BOM_UTF8).lstrip()
+    upload.seek(0)
+    if head.startswith(b'<'):
+        return 'gpx'
+    if head.startswith(b'{'):
+        return 'geojson'
+    raise TrackImportError("Dosya biçimi anlaşılamadı; format alanını belirtin")
+
+def _local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+def parse_gpx(file):
+    """
+    GPX'teki trkpt/rtept/wpt noktalarını (lng, lat, ad, zaman) olarak üretir.
+    iterparse ile okunur; her nokta işlendikten sonra ebeveyninden koparılır,
+    bellek kullanımı dosya boyutundan bağımsız kalır.
+    """
+    parents = []
+    try:
+        for event, element in iterparse(file, events=('start', 'end')):
+            if event == 'start':
+                parents.append(element)
+                continue
+            parents.pop()
+            if _local_name(element.tag) not in GPX_POINT_TAGS:
+                continue
+            fields = {_local_name(child.tag): child.text for child in element}
+            yield float(element.get('lon')), float(element.get('lat')), fields.get('name'), fields.get('time')
+            if parents:
+                parents[-1].remove(element)
+    except (ParseError, TypeError, ValueError) as e:
+        raise TrackImportError(f"Geçersiz GPX: {e}")
+
+class _JSONStream:
+    """
+    Dosyayı parça parça okuyup JSON değerlerini tek tek çözen okuyucu.
+    Tek bir değer max_value_size karakteri aşarsa (bozuk/kesik dosya ya da
+    dev tek feature) dosya sonuna kadar okunmadan hata verilir.
+    """
+
+    def __init__(self, file, max_value_size=None):
+        self.file = file
+        self.max_value_size = max_value_size or getattr(
+            settings, 'ROUTE_IMPORT_MAX_VALUE_SIZE', settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        )
+        self.text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size=JSON_CHUNK_SIZE):
+        if self.eof:
+            return False
+        if len(self.buffer) - self.pos > self.max_value_size:
+            raise TrackImportError(
+                f"Geçersiz GeoJSON: tek bir değer {self.max_value_size} karakteri aşıyor; "
+                "izi birden çok feature'a bölün"
+            )
+        chunk = self.file.read(size)
+        self.eof = not chunk
+        # Tüketilmiş kısım atılır; tampon en fazla bir değerin boyutu kadar büyür
+        self.buffer = self.buffer[self.pos:] + self.text_decoder.decode(chunk, final=self.eof)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Boşlukları atlayıp sıradaki karakteri döndürür; dosya sonunda ''."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise TrackImportError(f"Geçersiz GeoJSON: '{char}' bekleniyordu")
+        self.pos += 1
+
+    def skip(self, char):
+        if self.peek() == char:
+            self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # Değer tamponda bitmiyor olabilir; tamponu ikiye katlayarak doldur
+                if not self._fill(max(JSON_CHUNK_SIZE, len(self.buffer))):
+                    raise TrackImportError(f"Geçersiz GeoJSON: {e}")
+                continue
+            if end == len(self.buffer) and self._fill():
+                continue  # Sayı parça sınırında bölünmüş olabilir
+            self.pos = end
+            return value
+
+def _geojson_objects(file):
+    """FeatureCollection'daki feature'ları birer birer, diğer belgeleri tek nesne olarak üretir."""
+    stream = _JSONStream(file)
+    stream.expect('{')
+    header = {}
+    while stream.peek() != '}':
+        key = stream.value()
+        stream.expect(':')
+        if key == 'features' and stream.peek() == '[':
+            stream.expect('[')
+            while stream.peek() != ']':
+                yield stream.value()
+                stream.skip(',')
+            stream.expect(']')
+        else:
+            header[key] = stream.value()
+        stream.skip(',')
+    if header.get('type') != 'FeatureCollection':
+        yield header
+
+def _geometry_points(geometry, properties):
+    kind = geometry.get('type')
+    if kind == 'GeometryCollection':
+        for child in geometry.get('geometries') or []:
+            yield from _geometry_points(child, properties)
+        return
+    coordinates = geometry.get('coordinates') or []
+    lines = {
+        'Point': [[coordinates]],
+        'MultiPoint': [coordinates],
+        'LineString': [coordinates],
+        'MultiLineString': coordinates,
+    }.get(kind, [])
+    # togeojson kuralı: coordinateProperties.times ya da coordTimes
+    times = (properties.get('coordinateProperties') or {}).get('times') or properties.get('coordTimes')
+    name = properties.get('name') if kind in ('Point', 'MultiPoint') else None
+    for index, line in enumerate(lines):
+        line_times = times[index] if kind == 'MultiLineString' and times else times
+        if kind == 'Point':
+            line_times = [properties.get('time')]
+        for position, coords in enumerate(line):
+            time = line_times[position] if line_times and position < len(line_times) else None
+            yield float(coords[0]), float(coords[1]), name, time
+
+def parse_geojson(file):
+    """GeoJSON'daki Point/MultiPoint/LineString/MultiLineString noktalarını üretir."""
+    try:
+        for obj in _geojson_objects(file):
+            if obj.get('type') == 'Feature':
+                if obj.get('geometry'):
+                    yield from _geometry_points(obj['geometry'], obj.get('properties') or {})
+            else:
+                yield from _geometry_points(obj, {})
+    except TrackImportError:
+        raise
+    except (AttributeError, IndexError, TypeError, ValueError) as e:
+        raise TrackImportError(f"Geçersiz GeoJSON: {e}")
+
+PARSERS = {'gpx': parse_gpx, 'geojson': parse_geojson}
+
+def _limited(points, max_points):
+    for count, point in enumerate(points, start=1):
+        if count > max_points:
+            raise TrackImportError(f"İz en fazla {max_points} nokta içerebilir")
+        yield point
+
+def _parse_time(value):
+    try:
+        return parse_datetime(value) if value else None
+    except ValueError:
+        return None
+
+def _waypoints(route, points, first_order):
+    for order, (lng, lat, name, time) in enumerate(points, start=first_order):
+        if not (-180 <= lng <= 180 and -90 <= lat <= 90):
+            raise TrackImportError(f"Geçersiz koordinat: ({lng}, {lat})")
+        yield Waypoint(
+            route=route,
+            name=(name or f"Nokta {order}")[:255],
+            order=order,
+            location=LazyPoint(lng, lat),
+            arrival_time=_parse_time(time),
+        )
+
+@transaction.atomic
+def import_track(route, points, replace=False, method=None, tolerance=None):
+    """
+    Noktaları rotanın mevcut duraklarından sonra ekler (replace ise önce siler).
+    Sadeleştirme yoksa noktalar dosyadan okundukça ROUTE_IMPORT_BATCH_SIZE'lık
+    bulk_create'lerle yazılır; hepsi tek transaction'dadır. (eklenen, okunan) döner.
+    """
+    batch_size = getattr(settings, 'ROUTE_IMPORT_BATCH_SIZE', 1000)
+    points = _limited(points, getattr(settings, 'ROUTE_IMPORT_MAX_POINTS', 200000))
+
+    if replace:
+        route.waypoints.all().delete()
+        first_order = 1
+    else:
+        first_order = (route.waypoints.aggregate(top=Max('order'))['top'] or 0) + 1
+
+    if method:
+        # Sadeleştirme tüm izi gerektirir; koordinatlar NumPy dizisinde tutulur
+        points = list(points)
+        read = len(points)
+        mask = polyline.simplify(np.array([point[:2] for point in points]).reshape(-1, 2), method, tolerance)
+        points = compress(points, mask)
+    else:
+        read = None
+
+    created = 0
+    waypoints = _waypoints(route, points, first_order)
+    while batch := list(islice(waypoints, batch_size)):
+        Waypoint.objects.bulk_create(batch)
+        created += len(batch)
+
+    if created or replace:
+        route.version += 1
+        route.save(update_fields=['version', 'last_updated'])
+    return created, created if read is None else read
+
+def _export_points(route):
+    """start_point, duraklar ve destination'ı (rol, ad, sıra, zaman, lng, lat) olarak sırayla üretir."""
+    yield 'start', 'Başlangıç', None, None, *route.start_point.coords
+    rows = (
+        route.waypoints.order_by('order')
+        .values_list('name', 'order', 'arrival_time', 'location')
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    for name, order, arrival_time, location in rows:
+        yield 'waypoint', name, order, arrival_time, location.x, location.y
+    yield 'destination', 'Varış', None, None, *route.destination.coords
+
+def _chunked(parts):
+    """Parçaları EXPORT_CHUNK_SIZE'lık gruplar halinde birleştirir; her satır ayrı yazılmaz."""
+    while chunk := ''.join(islice(parts, EXPORT_CHUNK_SIZE)):
+        yield chunk
+
+def _isoformat(value):
+    return value.isoformat().replace('+00:00', 'Z')
+
+def _gpx_parts(route):
+    title = escape(route.title)
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<gpx version="1.1" creator="Plan&amp;Go" xmlns="http://www.topografix.com/GPX/1/1">\n'
+        f'<metadata><name>{title}</name><time>{_isoformat(route.last_updated)}</time></metadata>\n'
+        f'<rte><name>{title}</name>\n'
+    )
+    for role, name, order, time, lng, lat in _export_points(route):
+        time = f'<time>{_isoformat(time)}</time>' if time else ''
+        yield f'<rtept lat="{lat:.7f}" lon="{lng:.7f}">{time}<name>{escape(name)}</name><type>{role}</type></rtept>\n'
+    yield '</rte>\n</gpx>\n'
+
+def _geojson_parts(route):
+    yield f'{{"type":"FeatureCollection","name":{json.dumps(route.title, ensure_ascii=False)},"features":[\n'
+    separator = ''
+    for role, name, order, time, lng, lat in _export_points(route):
+        feature = {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [lng, lat]},
+            'properties': {'name': name, 'role': role, 'order': order, 'time': _isoformat(time) if time else None},
+        }
+        yield separator + json.dumps(feature, ensure_ascii=False, separators=(',', ':'))
+        separator = ',\n'
+    yield '\n]}\n'
+
+def _kml_parts(route):
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<kml xmlns="http://www.opengis.net/kml/2.2"><Document>\n'
+        f'<name>{escape(route.title)}</name>\n'
+    )
+    for role, name, order, time, lng, lat in _export_points(route):
+        time = f'<TimeStamp><when>{_isoformat(time)}</when></TimeStamp>' if time else ''
+        yield (
+            f'<Placemark><name>{escape(name)}</name>{time}'
+            f'<Point><coordinates>{lng:.7f},{lat:.7f}</coordinates></Point></Placemark>\n'
+        )
+    yield '</Document></kml>\n'
+
+EXPORTERS = {
+    'gpx': (_gpx_parts, 'application/gpx+xml'),
+    'geojson': (_geojson_parts, 'application/geo+json'),
+    'kml': (_kml_parts, 'application/vnd.google-earth.kml+xml'),
+}
+
+def export_track(route, file_format):
+    """Rotayı verilen biçimde parça parça üretir; (parça üreteci, içerik tipi) döner."""
+    parts, content_type = EXPORTERS[file_format]
+    return _chunked(parts(route)), content_type
@@ -2,7 +2,7 @@
 
 from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import RouteViewSet
+from .views import AsyncSharedRouteView, RouteViewSet
 
 router = DefaultRouter()
 router.register(r'routes', RouteViewSet, basename='route')
@@ -11,6 +11,18 @@ urlpatterns = [
     path('api/routes/shared/<uuid:share_token>/', 
          RouteViewSet.as_view({'get': 'shared_route_detail'}), 
          name='shared-route-detail'),
+    path('api/routes/shared/<uuid:share_token>/export/<str:file_format>/', 
+         RouteViewSet.as_view({'get': 'shared_export'}), 
+         name='shared-route-export'),
+    path('api/async/routes/shared/<uuid:share_token>/', 
+         AsyncSharedRouteView.as_view(), 
+         name='shared-route-detail-async'),
+    path('api/routes/nearby/', 
+         RouteViewSet.as_view({'get': 'nearby'}), 
+         name='routes-nearby'),
+    path('api/routes/bbox/', 
+         RouteViewSet.as_view({'get': 'bbox'}), 
+         name='routes-bbox'),
 ] 
 
 urlpatterns += router.urls
\ No newline at end of file
@@ -1,25 +1,46 @@
 # routes/views.py
 
+import math
+
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.exceptions import PermissionDenied, NotFound
+from rest_framework.exceptions import PermissionDenied, NotFound, ValidationError
+from rest_framework.renderers import JSONRenderer
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from .models import Route, Waypoint
-from .serializers import RouteSerializer
+from .serializers import RouteSerializer, RouteValuesSerializer
 from .permissions import IsRouteOwnerOrReadOnly, IsCollaboratorOrOwner
 from .mixins import OwnerEditMixin, CollaborativeEditMixin
 from django.views.generic import CreateView, ListView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from .forms import RouteCreateForm
+from plan_go.async_views import AsyncAPIView
+from plan_go.pagination import KeysetListMixin
+from plan_go.fast_serializers import FastListMixin
+from plan_go.metrics import timed
+from plan_go.query_optimizer import QueryOptimizerMixin
+from . import itinerary, optimization, polyline, spatial, tracks
+from .services import WaypointSyncService, WaypointsChanged
+from .qr import qr_code_url
+from .shared_cache import route_stamp, shared_route_cache
 
 User = get_user_model()
 
-class RouteViewSet(OwnerEditMixin, CollaborativeEditMixin, ModelViewSet):
-    queryset = Route.objects.all().prefetch_related('collaborators')
+class RouteViewSet(FastListMixin, QueryOptimizerMixin, OwnerEditMixin, CollaborativeEditMixin, ModelViewSet):
+    queryset = Route.objects.all()
     serializer_class = RouteSerializer
+    fast_serializer_class = RouteValuesSerializer  # Liste çıktısı .values() ile üretilir
     permission_classes = [IsCollaboratorOrOwner]
+    # İlişkiler yalnızca serileştiren okuma action'larında ön yüklenir;
+    # itinerary/optimize/export gibi action'lar durakları kendileri okur
+    optimized_actions = ('list', 'retrieve', 'nearby', 'bbox')
     
     # Versiyon çakışması için atomic transaction
     from django.db import transaction
@@ -29,7 +50,7 @@ class RouteViewSet(OwnerEditMixin, CollaborativeEditMixin, ModelViewSet):
         if 'version' not in request.data:
             raise PermissionDenied("Versiyon bilgisi gereklidir")
             
-        if instance.version != int(request.data['version']):
+        if instance.version != self._version_param(request.data):
             raise PermissionDenied("Bu kayıt başkası tarafından güncellenmiş. Lütfen yeniden deneyin.")
         
         return super().update(request, *args, **kwargs)
@@ -40,19 +61,13 @@ class RouteViewSet(OwnerEditMixin, CollaborativeEditMixin, ModelViewSet):
         route = self.get_object()
         route.is_shared = not route.is_shared
         
-        if route.is_shared:
-            if not route.share_token:
-                route.generate_share_token()
-            route.generate_qr_code()  # QR kodunu yeniden oluştur
-        else:
-            route.share_token = None
-            route.qr_code.delete(save=False)
-        
-        route.save()
+        # QR kodu post_save sinyali gerektiğinde arka planda üretir;
+        # paylaşım kapatılsa da dosya aynı link için tekrar kullanılmak üzere saklanır
+        route.save(update_fields=['is_shared', 'last_updated'])
         return Response({
             'status': 'shared' if route.is_shared else 'private',
-            'share_link': route.get_absolute_share_url(),
-            'qr_code': route.qr_code.url if route.is_shared else None
+            'share_link': request.build_absolute_uri(route.share_link),
+            'qr_code': qr_code_url(route, request) if route.is_shared else None
         })
 
     @action(detail=True, methods=['get', 'post', 'delete'], url_path='collaborators', permission_classes=[IsRouteOwnerOrReadOnly])
@@ -88,16 +103,322 @@ class RouteViewSet(OwnerEditMixin, CollaborativeEditMixin, ModelViewSet):
             'total': route.collaborators.count()
         })
     
+    DEFAULT_NEARBY_RADIUS_KM = 10
+
+    @staticmethod
+    def _float_param(params, name, default=None):
+        try:
+            value = float(params.get(name, default))
+        except (TypeError, ValueError):
+            raise ValidationError({name: "Geçerli bir sayı gereklidir"})
+        if not math.isfinite(value):  # float() 'nan' ve 'inf' kabul eder
+            raise ValidationError({name: "Geçerli bir sayı gereklidir"})
+        return value
+
+    @staticmethod
+    def _version_param(data):
+        """İstekteki `version` değeri; tamsayı değilse (ör. "abc", null) 400 döner."""
+        value = data.get('version')
+        try:
+            if isinstance(value, bool):
+                raise TypeError
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValidationError({"version": "Geçerli bir tamsayı gereklidir"})
+
+    @staticmethod
+    def _check_coordinates(lng, lat, name):
+        if not (-180 <= lng <= 180 and -90 <= lat <= 90):
+            raise ValidationError({name: "Boylam -180 ile 180, enlem -90 ile 90 arasında olmalıdır"})
+
+    def _waypoint_shape_options(self):
+        """
+        ?waypoints=full|polyline|delta, ?precision=5|6,
+        ?simplify=dp|vw ile birlikte ?tolerance=<metre> veya ?zoom=<0-22>
+        """
+        params = self.request.query_params
+        encoding = params.get('waypoints', 'full')
+        method = params.get('simplify')
+        if encoding not in polyline.ENCODINGS:
+            raise ValidationError({"waypoints": f"Şunlardan biri olmalıdır: {', '.join(polyline.ENCODINGS)}"})
+        if method is not None and method not in polyline.SIMPLIFIERS:
+            raise ValidationError({"simplify": f"Şunlardan biri olmalıdır: {', '.join(polyline.SIMPLIFIERS)}"})
+        if encoding == 'full':
+            if method:
+                raise ValidationError({"simplify": "Sadeleştirme yalnızca waypoints=polyline|delta ile kullanılabilir"})
+            return None
+
+        precision = self._float_param(params, 'precision', polyline.DEFAULT_PRECISION)
+        if precision not in (5, 6):
+            raise ValidationError({"precision": "5 veya 6 olmalıdır"})
+        tolerance = None
+        if method:
+            if 'zoom' in params:
+                zoom = self._float_param(params, 'zoom')
+                if not 0 <= zoom <= polyline.MAX_ZOOM:
+                    raise ValidationError({"zoom": f"0 ile {polyline.MAX_ZOOM} arasında olmalıdır"})
+                tolerance = polyline.zoom_tolerance(zoom)
+            else:
+                tolerance = self._float_param(params, 'tolerance')
+                if tolerance <= 0:
+                    raise ValidationError({"tolerance": "Pozitif bir sayı olmalıdır"})
+        return {'encoding': encoding, 'precision': int(precision), 'method': method, 'tolerance': tolerance}
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        options = self._waypoint_shape_options() if self.request and self.request.method == 'GET' else None
+        if options:
+            # waypoints alanı sıkıştırılmış şekle döner; Waypoint nesneleri ön yüklenmez
+            context['waypoint_shape_options'] = options
+            context['waypoint_shapes'] = {}
+        return context
+
+    def get_serializer(self, *args, **kwargs):
+        """GET isteklerinde ?waypoints=polyline|delta ise duraklar sıkıştırılmış şekil olarak döner."""
+        context = kwargs.setdefault('context', self.get_serializer_context())
+        options = context.get('waypoint_shape_options')
+        if options and args:
+            routes = args[0] if kwargs.get('many') else [args[0]]
+            context['waypoint_shapes'] = polyline.waypoint_shapes([route.pk for route in routes], **options)
+        return super().get_serializer(*args, **kwargs)
+
+    @action(detail=False, methods=['get'], url_path='nearby')
+    def nearby(self, request):
+        """lat/lng çevresinde radius (km) içindeki rotaları en yakından uzağa döndürür."""
+        lat = self._float_param(request.query_params, 'lat')
+        lng = self._float_param(request.query_params, 'lng')
+        radius = self._float_param(request.query_params, 'radius', self.DEFAULT_NEARBY_RADIUS_KM)
+        self._check_coordinates(lng, lat, 'lat')
+        max_radius = getattr(settings, 'NEARBY_MAX_RADIUS_KM', 500)
+        if not 0 < radius <= max_radius:
+            raise ValidationError({"radius": f"0'dan büyük, en fazla {max_radius:g} olmalıdır"})
+
+        distances = spatial.route_distances_near(lng, lat, radius)
+        # Erişilebilir rotalardan yalnızca en yakın SPATIAL_MAX_RESULTS tanesi serileştirilir
+        visible = self.get_queryset().filter(pk__in=distances).values_list('pk', flat=True)
+        nearest = sorted(visible, key=distances.__getitem__)
+        limit = self._spatial_limit()
+        routes = sorted(self.get_queryset().filter(pk__in=nearest[:limit]), key=lambda route: distances[route.pk])
+        data = self.get_serializer(routes, many=True).data
+        for item in data:
+            item['distance_km'] = round(distances[item['id']], 3)
+        return self._limited_response(data, len(nearest) > limit)
+
+    @staticmethod
+    def _spatial_limit():
+        return getattr(settings, 'SPATIAL_MAX_RESULTS', 200)
+
+    @staticmethod
+    def _limited_response(data, truncated):
+        """Sınıra takılan nearby/bbox yanıtları X-Results-Truncated başlığıyla işaretlenir."""
+        response = Response(data)
+        if truncated:
+            response['X-Results-Truncated'] = 'true'
+        return response
+
+    @action(detail=True, methods=['get'], url_path='itinerary')
+    def itinerary(self, request, pk=None):
+        """
+        Bacak mesafeleri, kümülatif mesafe ve durak başına tahmini varış zamanı.
+        ?profile=walking|cycling|driving veya ?speed=<km/sa>, ?stop_minutes=<dk>
+        """
+        route = self.get_object()
+        profile = request.query_params.get('profile', itinerary.DEFAULT_PROFILE)
+        if profile not in itinerary.SPEED_PROFILES:
+            raise ValidationError({"profile": f"Şunlardan biri olmalıdır: {', '.join(itinerary.SPEED_PROFILES)}"})
+        speed = self._float_param(request.query_params, 'speed', itinerary.SPEED_PROFILES[profile])
+        stop_minutes = self._float_param(request.query_params, 'stop_minutes', 0)
+        if not 0 < speed <= itinerary.MAX_SPEED_KMH:
+            raise ValidationError({"speed": f"0'dan büyük, en fazla {itinerary.MAX_SPEED_KMH:g} olmalıdır"})
+        if not 0 <= stop_minutes <= itinerary.MAX_STOP_MINUTES:
+            raise ValidationError({"stop_minutes": f"0 ile {itinerary.MAX_STOP_MINUTES} arasında olmalıdır"})
+        return Response(itinerary.get_itinerary(route, speed, stop_minutes * 60))
+
+    @action(detail=True, methods=['post'], url_path='optimize')
+    def optimize(self, request, pk=None):
+        """
+        Başlangıç ve varış sabit kalacak şekilde ara durakları toplam mesafeyi
+        en aza indirecek sırayla yeniden numaralar.
+        Gövde: {"version": <int>, "time_budget_ms": <int>, "dry_run": <bool>}
+        """
+        route = self.get_object()
+        if 'version' in request.data and route.version != self._version_param(request.data):
+            raise PermissionDenied("Bu kayıt başkası tarafından güncellenmiş. Lütfen yeniden deneyin.")
+
+        budget = self._float_param(request.data, 'time_budget_ms', optimization.DEFAULT_TIME_BUDGET_MS)
+        budget = min(max(budget, 1), optimization.MAX_TIME_BUDGET_MS)
+        try:
+            waypoints, summary = optimization.optimize_route(route, budget)
+        except ValueError as e:
+            raise ValidationError({"error": str(e)})
+
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        if not dry_run and summary['saved_km'] > 0:
+            try:
+                with transaction.atomic():
+                    WaypointSyncService.reorder(route, [waypoint_id for waypoint_id, _, _ in waypoints])
+                    route.version += 1
+                    route.save(update_fields=['version', 'last_updated'])
+            except WaypointsChanged:
+                raise ValidationError({"error": "Duraklar başkası tarafından değiştirilmiş. Lütfen yeniden deneyin."})
+
+        orders = sorted(order for _, order, _ in waypoints)
+        return Response({
+            **summary,
+            'applied': not dry_run and summary['saved_km'] > 0,
+            'version': route.version,
+            'waypoints': [
+                {'id': waypoint_id, 'order': order, 'name': name}
+                for (waypoint_id, _, name), order in zip(waypoints, orders)
+            ],
+        })
+
+    @action(detail=True, methods=['post'], url_path='import')
+    def import_track(self, request, pk=None):
+        """
+        GPX/GeoJSON izini rotaya durak olarak ekler (multipart 'file').
+        Alanlar: format=gpx|geojson, replace=true, simplify=dp|vw + tolerance=<metre>, version
+        """
+        route = self.get_object()
+        if 'version' in request.data and route.version != self._version_param(request.data):
+            raise PermissionDenied("Bu kayıt başkası tarafından güncellenmiş. Lütfen yeniden deneyin.")
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({"file": "İz dosyası gereklidir"})
+
+        method = request.data.get('simplify') or None
+        tolerance = None
+        if method:
+            if method not in polyline.SIMPLIFIERS:
+                raise ValidationError({"simplify": f"Şunlardan biri olmalıdır: {', '.join(polyline.SIMPLIFIERS)}"})
+            tolerance = self._float_param(request.data, 'tolerance')
+            if tolerance <= 0:
+                raise ValidationError({"tolerance": "Pozitif bir sayı olmalıdır"})
+
+        replace = str(request.data.get('replace', '')).lower() in ('1', 'true', 'yes')
+        try:
+            file_format = tracks.detect_format(upload, request.data.get('format'))
+            created, read = tracks.import_track(
+                route, tracks.PARSERS[file_format](upload), replace, method, tolerance
+            )
+        except tracks.TrackImportError as e:
+            raise ValidationError({"file": str(e)})
+
+        return Response({
+            'format': file_format,
+            'read': read,
+            'imported': created,
+            'version': route.version,
+        }, status=201)
+
+    @staticmethod
+    def _export_response(request, route, file_format):
+        """
+        Rotayı GPX/GeoJSON/KML olarak akış halinde döndürür. ETag rota versiyonundan,
+        Last-Modified last_updated'dan türetilir; değişmemişse 304 döner.
+        """
+        if file_format not in tracks.EXPORTERS:
+            raise NotFound(f"Desteklenen biçimler: {', '.join(tracks.EXPORTERS)}")
+        last_modified = int(route.last_updated.timestamp())
+        etag = f'"route-{route.pk}-v{route.version}-{route_stamp(route)}-{file_format}"'
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            content, content_type = tracks.export_track(route, file_format)
+            response = StreamingHttpResponse(content, content_type=f'{content_type}; charset=utf-8')
+            response['Content-Disposition'] = f'attachment; filename="route-{route.pk}.{file_format}"'
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    @action(detail=True, methods=['get'], url_path=r'export/(?P<file_format>[a-z]+)')
+    def export(self, request, pk=None, file_format=None):
+        """/routes/<id>/export/gpx|geojson|kml/"""
+        return self._export_response(request, self.get_object(), file_format)
+
+    @action(detail=False, methods=['get'], url_path='bbox')
+    def bbox(self, request):
+        """
+        min_lng,min_lat,max_lng,max_lat kutusuyla kesişen rotaları döndürür.
+        min_lng > max_lng ise kutu antimeridyeni geçer ve iki parça olarak aranır.
+        """
+        try:
+            min_lng, min_lat, max_lng, max_lat = (float(v) for v in request.query_params['bbox'].split(','))
+        except (KeyError, ValueError):
+            raise ValidationError({"error": "bbox=min_lng,min_lat,max_lng,max_lat formatında olmalıdır"})
+        if not all(math.isfinite(value) for value in (min_lng, min_lat, max_lng, max_lat)):
+            raise ValidationError({"bbox": "Geçerli sayılar gereklidir"})
+        self._check_coordinates(min_lng, min_lat, 'bbox')
+        self._check_coordinates(max_lng, max_lat, 'bbox')
+        if min_lat > max_lat:
+            raise ValidationError({"bbox": "min_lat, max_lat'ten büyük olamaz"})
+        max_area = getattr(settings, 'BBOX_MAX_AREA_DEG2', 400)
+        if spatial.bbox_area(min_lng, min_lat, max_lng, max_lat) > max_area:
+            raise ValidationError({"bbox": f"Kutu alanı en fazla {max_area:g} derece² olabilir"})
+
+        route_ids = spatial.route_ids_in_bbox(min_lng, min_lat, max_lng, max_lat)
+        limit = self._spatial_limit()
+        routes = list(self.get_queryset().filter(pk__in=route_ids).order_by('-last_updated', '-id')[:limit + 1])
+        serializer = self.get_serializer(routes[:limit], many=True)
+        return self._limited_response(serializer.data, len(routes) > limit)
+
     @action(detail=True, methods=['get'], url_path='shared')
-    def shared_route_detail(self, request, pk=None):
-        """Paylaşılan rotanın detayını döndürür (QR veya token ile erişim)."""
-        share_token = self.kwargs.get('share_token')
+    def shared_route_detail(self, request, pk=None, share_token=None):
+        """
+        Paylaşılan rotanın detayını döndürür (QR veya token ile erişim).
+        Yanıt (token, versiyon) anahtarıyla önbelleklenir; tekrar taramalar
+        sorgu ve serileştirme yapmaz, If-None-Match eşleşirse 304 döner.
+        """
+        origin = request.build_absolute_uri('/')
+        pointer, body = shared_route_cache.get(share_token, origin)
+        response = pointer and shared_route_cache.response(request, pointer, body, origin)
+        if response:
+            response['X-Cache'] = 'HIT'
+            return response
+
+        route = self._shared_route()
+        with timed('serialization'):
+            body = JSONRenderer().render(RouteSerializer(route, context={'request': request}).data)
+        pointer = shared_route_cache.store(route, origin, body)
+        response = shared_route_cache.response(request, pointer, body, origin)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def shared_export(self, request, share_token=None, file_format=None):
+        """Paylaşılan rotanın GPX/GeoJSON/KML dışa aktarımı (token ile erişim)."""
+        return self._export_response(request, self._shared_route(), file_format)
+
+    def _shared_route(self):
         try:
-            route = Route.objects.get(share_token=share_token, is_shared=True)
+            return Route.objects.get(share_token=self.kwargs.get('share_token'), is_shared=True)
         except Route.DoesNotExist:
             raise NotFound("Rota bulunamadı veya paylaşım kapalı.")
-        serializer = self.get_serializer(route)
-        return Response(serializer.data)
+
+class AsyncSharedRouteView(AsyncAPIView):
+    """
+    shared_route_detail'in ASGI eşdeğeri; rota ve ilişkileri async ORM ile
+    tek seferde okunur, serileştirme sırasında ek sorgu yapılmaz.
+    """
+
+    async def get(self, request, share_token):
+        origin = request.build_absolute_uri('/')
+        pointer, body = await shared_route_cache.aget(share_token, origin)
+        response = pointer and shared_route_cache.response(request, pointer, body, origin)
+        if response:
+            response['X-Cache'] = 'HIT'
+            return response
+
+        queryset = Route.objects.prefetch_related('collaborators', 'waypoints')
+        try:
+            route = await queryset.aget(share_token=share_token, is_shared=True)
+        except Route.DoesNotExist:
+            return self.error("Rota bulunamadı veya paylaşım kapalı.", 404)
+        with timed('serialization'):
+            body = JSONRenderer().render(RouteSerializer(route, context={'request': request}).data)
+        pointer = await shared_route_cache.astore(route, origin, body)
+        response = shared_route_cache.response(request, pointer, body, origin)
+        response['X-Cache'] = 'MISS'
+        return response
 
 # Web UI Views
 class RouteCreateView(LoginRequiredMixin, CreateView):
@@ -111,11 +432,10 @@ class RouteCreateView(LoginRequiredMixin, CreateView):
         form.instance.version += 1  # Versiyon artırımı
         return super().form_valid(form)
 
-class RouteListView(LoginRequiredMixin, ListView):
+class RouteListView(LoginRequiredMixin, KeysetListMixin, ListView):
     model = Route
     template_name = 'routes/route_list.html'
     context_object_name = 'routes'
-    paginate_by = 10
 
     def get_queryset(self):
         return Route.objects.filter(user=self.request.user).prefetch_related('waypoints')
@@ -0,0 +1,36 @@
+# users/management/commands/backfill_activity_counters.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from users.models import Activity, UserActivityCounter
+
+class Command(BaseCommand):
+    help = "UserActivityCounter tablosunu mevcut Activity kayıtlarından yeniden hesaplar."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help="Yalnızca bu kullanıcı id'si için hesapla")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        activities = Activity.objects.all()
+        counters = UserActivityCounter.objects.all()
+        if options['user']:
+            activities = activities.filter(user_id=options['user'])
+            counters = counters.filter(user_id=options['user'])
+
+        rows = (
+            activities.order_by()
+            .values('user_id', 'activity_type')
+            .annotate(total=Count('id'))
+        )
+        entries = [
+            UserActivityCounter(user_id=row['user_id'], activity_type=row['activity_type'], count=row['total'])
+            for row in rows
+        ]
+
+        counters.delete()
+        UserActivityCounter.objects.bulk_create(entries, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{len(entries)} sayaç yeniden hesaplandı."))
@@ -1,6 +1,7 @@
 # users/models.py
 
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from model_utils.models import TimeStampedModel
 from django.contrib.auth.models import AbstractUser
 from django.utils.translation import gettext_lazy as _
@@ -10,6 +11,7 @@ from django.core.files import File
 import uuid
 from django.conf import settings
 from django.utils import timezone
+from plan_go.tracking import FieldTrackerMixin
 
 # Custom User Model
 class User(AbstractUser):
@@ -29,7 +31,9 @@ class User(AbstractUser):
     class Meta:
         swappable = 'AUTH_USER_MODEL'
 
-class Profile(models.Model):
+class Profile(FieldTrackerMixin, models.Model):
+    tracked_fields = ('avatar', 'bio', 'social_media')
+
     user = models.OneToOneField(
         User, 
         on_delete=models.CASCADE,
@@ -95,7 +99,8 @@ class Activity(models.Model):
         max_length=20,
         choices=ActivityType.choices
     )
-    timestamp = models.DateTimeField(_('occurred at'), auto_now_add=True)
+    # auto_now_add yerine default: toplu yazımda olay anı korunur
+    timestamp = models.DateTimeField(_('occurred at'), default=timezone.now, editable=False)
     metadata = models.JSONField(
         _('additional data'),
         default=dict,
@@ -111,10 +116,59 @@ class Activity(models.Model):
     class Meta:
         verbose_name_plural = _('Activities')
         ordering = ['-timestamp']
+        indexes = [
+            # Keyset sayfalama: (timestamp, id)
+            models.Index(fields=['user', 'timestamp', 'id']),
+            models.Index(fields=['timestamp', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.user}: {self.get_activity_type_display()}"
 
+class UserActivityCounter(models.Model):
+    """
+    Kullanıcı ve aktivite türü başına sürekli güncel tutulan sayaç.
+    Rozet kontrolleri tüm geçmişi saymak yerine bu tabloyu okur.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='activity_counters'
+    )
+    activity_type = models.CharField(
+        _('activity type'),
+        max_length=20,
+        choices=Activity.ActivityType.choices
+    )
+    count = models.PositiveIntegerField(_('count'), default=0)
+
+    class Meta:
+        unique_together = ('user', 'activity_type')
+
+    def __str__(self):
+        return f"{self.user}: {self.activity_type} × {self.count}"
+
+    @classmethod
+    def increment(cls, user_id, activity_type, by=1):
+        """Sayacı F ifadesiyle atomik olarak artırır; yoksa oluşturur."""
+        if cls.objects.filter(user_id=user_id, activity_type=activity_type).update(count=F('count') + by):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(user_id=user_id, activity_type=activity_type, count=by)
+        except IntegrityError:
+            # Aynı anda başka bir istek oluşturduysa artırmaya dön
+            cls.objects.filter(user_id=user_id, activity_type=activity_type).update(count=F('count') + by)
+
+    @classmethod
+    def decrement(cls, user_id, activity_type, by=1):
+        cls.objects.filter(user_id=user_id, activity_type=activity_type, count__gte=by).update(count=F('count') - by)
+
+    @classmethod
+    def counts_for(cls, user):
+        """Kullanıcının tüm sayaçlarını tek sorguda {activity_type: count} olarak döndürür."""
+        return dict(cls.objects.filter(user=user).values_list('activity_type', 'count'))
+
 class PasswordResetToken(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     token = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
@@ -5,6 +5,7 @@ from rest_framework.validators import UniqueValidator
 from django.contrib.auth.password_validation import validate_password
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from .models import User, Profile, Activity
+from plan_go.fast_serializers import ValuesSerializer
 import re
 
 class PasswordResetRequestSerializer(serializers.Serializer):
@@ -92,6 +93,20 @@ class ActivitySerializer(serializers.ModelSerializer):
         model = Activity
         fields = ('user', 'activity_type', 'activity_type_display', 'formatted_timestamp', 'ip_address')
 
+class ActivityValuesSerializer(ValuesSerializer):
+    """ActivitySerializer'ın liste uçları için .values() ile çalışan hızlı hâli."""
+    serializer_class = ActivitySerializer
+    method_fields = ('activity_type_display',)
+    choices = dict(Activity.ActivityType.choices)
+
+    def extra_lookups(self):
+        return ('activity_type',)
+
+    def get_activity_type_display(self, row):
+        # Model.get_activity_type_display ile aynı: tanımsız değer olduğu gibi döner
+        value = row['activity_type']
+        return str(self.choices.get(value, value))
+
 class CustomTokenSerializer(serializers.Serializer):
     access = serializers.CharField()
     refresh = serializers.CharField()
@@ -0,0 +1,135 @@
+# users/services.py
+
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Activity, UserActivityCounter
+from .signals import activities_recorded
+
+logger = logging.getLogger(__name__)
+
+class ActivityBuffer:
+    """
+    Aktivite kayıtlarını bellekte biriktirip toplu olarak yazar.
+    Tampon ACTIVITY_BUFFER_SIZE'a ulaştığında ya da ilk kayıttan
+    ACTIVITY_BUFFER_MAX_DELAY saniye sonra bulk_create ile boşaltılır.
+    Her boşaltmada kullanıcı başına tek bir `activities_recorded` sinyali gider.
+    Yazma başarısız olursa kayıtlar tamponun başına geri konur ve sonraki
+    boşaltmada yeniden denenir (en fazla ACTIVITY_BUFFER_MAX_PENDING kayıt).
+    """
+
+    def __init__(self):
+        self._events = []
+        self._lock = threading.Lock()
+        self._timer = None
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'ACTIVITY_BUFFER_ENABLED', True)
+
+    @property
+    def max_size(self):
+        return getattr(settings, 'ACTIVITY_BUFFER_SIZE', 100)
+
+    @property
+    def max_delay(self):
+        return getattr(settings, 'ACTIVITY_BUFFER_MAX_DELAY', 2.0)
+
+    @property
+    def max_pending(self):
+        return getattr(settings, 'ACTIVITY_BUFFER_MAX_PENDING', 10000)
+
+    def record(self, user, activity_type, metadata=None, ip_address=None):
+        """Aktiviteyi transaction tamamlandıktan sonra tampona ekler."""
+        activity = Activity(
+            user_id=user.pk,
+            activity_type=activity_type,
+            metadata=metadata or {},
+            ip_address=ip_address,
+            timestamp=timezone.now(),  # Olay anı, yazma anı değil
+        )
+        transaction.on_commit(lambda: self._append(activity))
+
+    def _append(self, activity):
+        with self._lock:
+            self._events.append(activity)
+            flush_now = not self.enabled or len(self._events) >= self.max_size
+            if not flush_now:
+                self._schedule_locked()
+        if flush_now:
+            self.flush()
+
+    def _schedule_locked(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.max_delay, self._flush_from_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _requeue(self, events):
+        """Yazılamayan kayıtları sıraları korunarak tamponun başına geri koyar."""
+        for activity in events:
+            # bulk_create geri alınan insert'te pk atamış olabilir
+            activity.pk = None
+            activity._state.adding = True
+        with self._lock:
+            self._events[:0] = events
+            dropped = len(self._events) - self.max_pending
+            if dropped > 0:
+                del self._events[:dropped]  # En eski kayıtlar feda edilir
+                logger.error("Aktivite tamponu dolu; %d aktivite kayboldu", dropped)
+            self._schedule_locked()
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+
+    def flush(self):
+        """Tampondaki tüm aktiviteleri tek bulk_create ile yazar."""
+        with self._lock:
+            events, self._events = self._events, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        if not events:
+            return []
+
+        counts = defaultdict(int)
+        for activity in events:
+            counts[(activity.user_id, activity.activity_type)] += 1
+
+        # bulk_create post_save göndermez; sayaçlar aynı transaction'da güncellenir
+        try:
+            with transaction.atomic():
+                Activity.objects.bulk_create(events)
+                for (user_id, activity_type), count in counts.items():
+                    UserActivityCounter.increment(user_id, activity_type, by=count)
+        except DatabaseError:
+            logger.exception("%d aktivite yazılamadı; yeniden denenecek", len(events))
+            self._requeue(events)
+            return []
+
+        types_by_user = defaultdict(set)
+        for user_id, activity_type in counts:
+            types_by_user[user_id].add(activity_type)
+
+        for receiver, response in activities_recorded.send_robust(
+            sender=Activity, activities=events, types_by_user=dict(types_by_user)
+        ):
+            if isinstance(response, Exception):
+                logger.error("activities_recorded alıcısı başarısız: %s", receiver, exc_info=response)
+        return events
+
+activity_buffer = ActivityBuffer()
+atexit.register(activity_buffer.flush)  # Süreç kapanırken bekleyenleri yaz
+
+def record_activity(user, activity_type, metadata=None, ip_address=None):
+    activity_buffer.record(user, activity_type, metadata=metadata, ip_address=ip_address)
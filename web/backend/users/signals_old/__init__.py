@@ -1,2 +0,0 @@
-from .user_signals import *
-from .activity_signals import *
\ No newline at end of file
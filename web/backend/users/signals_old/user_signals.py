@@ -1,19 +0,0 @@
-# users/signals/user_signals.py
-
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-from django.contrib.auth import get_user_model
-from ..models import Profile
-
-User = get_user_model()
-
-@receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    """Yeni kullanıcı oluşturulduğunda profil yarat"""
-    if created:
-        Profile.objects.create(user=instance)
-
-@receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    """Kullanıcı kaydedildiğinde profili güncelle"""
-    instance.profile.save()
\ No newline at end of file
@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+
+from users.models import Activity, User, UserActivityCounter
+from users.serializers import ActivitySerializer, ActivityValuesSerializer
+from users.services import ActivityBuffer
+
+@override_settings(ACTIVITY_BUFFER_MAX_DELAY=60)
+class ActivityBufferTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        self.buffer = ActivityBuffer()
+        self.addCleanup(lambda: self.buffer._timer and self.buffer._timer.cancel())
+
+    def activity(self, activity_type='travel'):
+        return Activity(user_id=self.user.pk, activity_type=activity_type)
+
+    def test_failed_write_is_requeued_and_retried(self):
+        self.buffer._events = [self.activity(), self.activity('like')]
+        failing = mock.patch.object(UserActivityCounter, 'increment', side_effect=OperationalError('database is locked'))
+        with failing, self.assertLogs('users.services', 'ERROR'):
+            self.assertEqual(self.buffer.flush(), [])
+
+        self.assertEqual(len(self.buffer._events), 2)
+        self.assertIsNotNone(self.buffer._timer)
+        self.assertFalse(Activity.objects.filter(user=self.user).exists())
+
+        self.buffer._events.append(self.activity())
+        self.assertEqual(len(self.buffer.flush()), 3)
+        self.assertEqual(Activity.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(UserActivityCounter.objects.get(user=self.user, activity_type='travel').count, 2)
+
+    @override_settings(ACTIVITY_BUFFER_MAX_PENDING=3)
+    def test_requeue_is_bounded(self):
+        self.buffer._events = [self.activity('like')]
+        with self.assertLogs('users.services', 'ERROR'):
+            self.buffer._requeue([self.activity() for _ in range(3)])
+        self.assertEqual([activity.activity_type for activity in self.buffer._events], ['travel', 'travel', 'like'])
+
+class ActivityValuesSerializerParityTests(TestCase):
+
+    def test_matches_drf_serializer(self):
+        user = User.objects.create_user(username='gezgin', email='gezgin@example.com', password='x')
+        Activity.objects.bulk_create([
+            Activity(user=user, activity_type=activity_type, ip_address=ip_address)
+            for activity_type in [*Activity.ActivityType.values, 'eski_tur']  # Tanımsız değer de
+            for ip_address in (None, '10.0.0.1', '2001:db8::1')
+        ])
+        queryset = Activity.objects.filter(user=user)
+        fast = ActivityValuesSerializer()
+        self.assertEqual(
+            JSONRenderer().render(fast.serialize(fast.values(queryset))),
+            JSONRenderer().render(ActivitySerializer(queryset, many=True).data),
+        )
@@ -22,10 +22,13 @@ from .serializers import (
     UserSerializer, 
     ProfileSerializer, 
     ActivitySerializer, 
+    ActivityValuesSerializer,
     CustomTokenObtainPairSerializer,
     PasswordResetRequestSerializer,
     PasswordResetConfirmSerializer)
 from .permissions import ActivityAccessPermission
+from plan_go.fast_serializers import FastListMixin
+from plan_go.pagination import KeysetPagination
 from .models import Activity, User, Profile, PasswordResetToken
 
 
@@ -182,10 +185,15 @@ class ProfileAPIView(generics.RetrieveUpdateAPIView):
             'profile': serializer.data
         })
 
+class ActivityPagination(KeysetPagination):
+    ordering = ('-timestamp', '-id')
+
 # API Activity View
-class ActivityAPIView(generics.ListAPIView):
+class ActivityAPIView(FastListMixin, generics.ListAPIView):
     serializer_class = ActivitySerializer
+    fast_serializer_class = ActivityValuesSerializer
     permission_classes = [ActivityAccessPermission]  # Özel izin sınıfı
+    pagination_class = ActivityPagination
 
     def get_queryset(self):
         # Admin ise tüm aktiviteleri döndür